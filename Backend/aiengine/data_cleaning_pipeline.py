@@ -2,11 +2,44 @@ import pandas as pd
 import numpy as np
 import re
 import json
+import os
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from aiengine.fx_rates import FxRateStore
+    from aiengine.loss_trends import loss_trend_frame
+    from aiengine.pipeline_profile import PipelineProfile
+    from aiengine.segment_imputer import SegmentImputer
+except ImportError:  # run as a script from aiengine/
+    from fx_rates import FxRateStore
+    from loss_trends import loss_trend_frame
+    from pipeline_profile import PipelineProfile
+    from segment_imputer import SegmentImputer
+
+# Sum insured buckets (USD) of RiskSizeCategory and score buckets of RiskCategory
+RISK_SIZE_BINS = [0, 1_000_000, 10_000_000, 50_000_000, 200_000_000, 1_000_000_000, float('inf')]
+RISK_SIZE_LABELS = ['Micro (<$1M)', 'Small ($1M-$10M)', 'Medium ($10M-$50M)',
+                    'Large ($50M-$200M)', 'Very Large ($200M-$1B)', 'Mega (>$1B)']
+RISK_CATEGORY_BINS = [0, 3, 6, 8, 10]
+RISK_CATEGORY_LABELS = ['Low Risk', 'Medium Risk', 'High Risk', 'Very High Risk']
+
+# Fields counted by DataCompletenessScore and the values that count as empty
+COMPLETENESS_FIELDS = ['Cedant', 'Insured', 'Geography', 'Peril', 'SumInsured',
+                       'BusinessType', 'PastPremium', 'ClaimRatio']
+EMPTY_VALUE_TOKENS = ['', '0', 'unknown', 'other', 'nan', 'not found', 'none']
+
+# Business types where a sum insured above $500M is not flagged as unusual
+LARGE_RISK_BUSINESS_TYPES = ['Energy', 'Oil & Gas', 'Chemical']
+
+# Order in which explicit currency codes are looked for in an amount string, so
+# 'USD 1,000,000 (approx EUR 920,000)' is read as USD; codes only found in the
+# rate file are tried after these
+CURRENCY_CODE_PRECEDENCE = ['USD', 'EUR', 'GBP', 'KES', 'CAD', 'AUD', 'JPY', 'CHF',
+                            'ZAR', 'NGN', 'INR', 'SGD', 'HKD', 'CNY']
+
 class EnhancedDataCleaningPipeline:
     """
     Enhanced data cleaning and transformation pipeline for facultative reinsurance submissions
@@ -16,23 +49,14 @@ class EnhancedDataCleaningPipeline:
     def __init__(self):
         """Initialize the enhanced cleaning pipeline with updated mappings and configurations"""
         
-        # Updated currency conversion rates to USD (September 2025 - current rates)
-        self.currency_rates = {
-            'USD': 1.0,
-            'EUR': 1.1739,    # Updated based on current EUR/USD rate
-            'GBP': 1.3245,    # British Pound
-            'KES': 0.0077,    # Kenyan Shilling  
-            'CAD': 0.7425,    # Canadian Dollar
-            'AUD': 0.6789,    # Australian Dollar
-            'JPY': 0.00687,   # Japanese Yen (per JPY)
-            'CHF': 1.1234,    # Swiss Franc
-            'ZAR': 0.0554,    # South African Rand
-            'NGN': 0.00062,   # Nigerian Naira
-            'INR': 0.01199,   # Indian Rupee
-            'SGD': 0.7653,    # Singapore Dollar
-            'HKD': 0.1282,    # Hong Kong Dollar
-            'CNY': 0.1405,    # Chinese Yuan
-        }
+        # Dated exchange rates to USD shared with the message parser (data/fx_rates.csv).
+        # Amounts are converted at the latest rate on or before the submission's date,
+        # taken from the first of fx_date_columns present; without one the latest rates apply
+        self.fx_rates = FxRateStore.load()
+        self.fx_date_columns = ['SubmissionDate', 'InceptionDate', 'EmailDate']
+        self.currency_rates = self.fx_rates.latest_rates()
+        self.currency_codes = CURRENCY_CODE_PRECEDENCE + sorted(
+            code for code in self.currency_rates if code not in CURRENCY_CODE_PRECEDENCE)
         
         # Enhanced geography standardization mapping
         self.geography_mappings = {
@@ -184,122 +208,535 @@ class EnhancedDataCleaningPipeline:
                 'Retail': 0.7, 'Agriculture': 0.9, 'DEFAULT': 1.0
             }
         }
-    
-    def clean_and_transform_data(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
+        
+        # Columns used to detect duplicate submissions
+        self.duplicate_key_columns = ['Cedant', 'Insured', 'SumInsured', 'Peril']
+        
+        # Column identifying a submission across batches (changed rows keep their ID)
+        self.record_id_column = 'SubmissionID'
+        
+        # NearDuplicateDetector parameters; None disables fuzzy duplicate matching
+        # on cedant/insured names and amounts (exact key matching always runs)
+        self.near_duplicate_settings: Optional[Dict[str, Any]] = None
+        
+        # Constant fills for missing values, per column; numeric gaps without a
+        # constant are imputed with segment medians
+        self.missing_value_defaults = {
+            # Text fields
+            'Cedant': 'Unknown Cedant',
+            'Insured': 'Unknown Insured', 
+            'Broker': 'Unknown Broker',
+            'Geography': 'Unknown Location',
+            'State': 'Unknown',
+            'Country': 'Unknown',
+            'Location': 'Unknown',
+            'Territory': 'Unknown',
+            
+            # Classification fields
+            'Peril': 'Unknown',
+            'BusinessType': 'Other',
+            'Occupation': 'Other',
+            'Industry': 'Other',
+            'Sector': 'Other',
+            
+            # Financial fields
+            'SumInsured': 0.0,
+            'PastPremium': 0.0,
+            'Retention': 0.0,
+            'Deductible': 0.0,
+            'Limit': 0.0,
+            'Currency': 'USD',
+            
+            # Risk metrics
+            'ClaimRatio': 0.0,
+            'LossRatio': 0.0,
+            
+            # Loss history (JSON field)
+            'LossHistory': '[]',
+        }
+        
+        # Numeric gaps are filled with medians per segment, falling back from
+        # business type × state to business type and then the whole book;
+        # segments with fewer observed values than the minimum fall back too
+        self.imputation_segments = ['BusinessType', 'State']
+        self.imputation_min_segment_size = 5
+        
+        # State learned from the historical book by fit(); None means every
+        # batch derives its own medians, risk score bounds and duplicate keys
+        self.fitted_state: Optional[Dict[str, Any]] = None
+        self._seen_fingerprints: Optional[set] = None
+        self._fit_stats: Optional[Dict[str, Any]] = None
+
+        # Pipeline stages in execution order. Each stage declares the columns it
+        # reads, which the profiler reports as the columns it touched, and the
+        # attributes that configure it, which key its checkpoint together with
+        # the frame it receives (see _run_stages_with_checkpoints). Row-local
+        # stages only look at one record at a time and can run on partitions;
+        # the others need the whole book (medians, score bounds, duplicates).
+        self.stages = [
+            {'name': 'currency', 'row_local': True, 'method': 'convert_currency_values',
+             'description': '💰 Step 1: Converting currency values to USD...',
+             'inputs': ['SumInsured', 'PastPremium', 'Retention', 'Deductible', 'Limit',
+                        'SubmissionDate', 'InceptionDate', 'EmailDate'],
+             'config': ['fx_rates', 'fx_date_columns', 'currency_codes']},
+            {'name': 'geography', 'row_local': True, 'method': 'normalize_geography',
+             'description': '🌍 Step 2: Normalizing geography data...',
+             'inputs': ['Geography', 'State', 'Country', 'Location', 'Territory'],
+             'config': ['geography_mappings']},
+            {'name': 'perils', 'row_local': True, 'method': 'standardize_perils',
+             'description': '⚡ Step 3: Standardizing peril types...',
+             'inputs': ['Peril', 'Perils', 'PerilsCovered', 'Coverage', 'Risk'],
+             'config': ['peril_mappings']},
+            {'name': 'business_types', 'row_local': True, 'method': 'normalize_business_types',
+             'description': '🏢 Step 4: Normalizing business types...',
+             'inputs': ['BusinessType', 'Occupation', 'Industry', 'Sector', 'Business'],
+             'config': ['business_type_mappings']},
+            {'name': 'missing_values', 'row_local': False, 'method': 'handle_missing_values',
+             'description': '🔧 Step 5: Handling missing values...',
+             'inputs': ['*'],
+             'config': ['missing_value_defaults', 'imputation_segments', 'imputation_min_segment_size',
+                        'fitted_state']},
+            {'name': 'features', 'row_local': True, 'method': 'create_features',
+             'description': '🔬 Step 6: Creating engineered features...',
+             'inputs': ['SumInsured', 'PastPremium', 'Retention', 'ClaimRatio', 'LossHistory',
+                        'LossRatio', 'ESGScore', 'CatastropheExposure'],
+             'config': []},
+            {'name': 'loss_trends', 'row_local': True, 'method': 'add_loss_trend_features',
+             'description': '📉 Step 7: Computing loss trend features...',
+             'inputs': ['LossHistory'],
+             'config': []},
+            {'name': 'risk_scores', 'row_local': False, 'method': 'compute_risk_scores',
+             'description': '🎯 Step 8: Computing advanced risk scores...',
+             'inputs': ['State', 'BusinessType', 'Peril', 'LossSeverity', 'LossFrequency',
+                        'LossRatio', 'ESGScore', 'CatastropheExposure'],
+             'config': ['risk_multipliers', 'fitted_state']},
+            {'name': 'validation', 'row_local': False, 'method': 'validate_records',
+             'description': '✅ Step 9: Validating cleaned data...',
+             'inputs': ['*'],
+             'config': ['duplicate_key_columns', 'record_id_column', 'near_duplicate_settings',
+                        'fitted_state']},
+            {'name': 'quality_flags', 'row_local': True, 'method': 'add_quality_columns',
+             'description': '🏷️  Step 10: Flagging record quality...',
+             'inputs': ['SumInsured', 'PastPremium', 'Peril', 'Geography', 'BusinessType', 'PremiumRate',
+                        'NormalizedRiskScore', 'DataCompletenessScore', 'IsDuplicate'],
+             'config': []},
+        ]
+
+        # Cache status of each stage in the last checkpointed run
+        self.last_checkpoint_report: List[Dict[str, Any]] = []
+
+        # Bytes per row and peak RSS after each stage of the last memory-optimized run
+        self.last_memory_report: List[Dict[str, Any]] = []
+
+        # Smallest partition worth shipping to a worker process when n_jobs > 1
+        self.min_partition_rows = 10_000
+
+        # Per-stage profile of the last clean_and_transform_data run
+        self.last_profile: Optional[PipelineProfile] = None
+        self._profile: Optional[PipelineProfile] = None
+
+    def clean_and_transform_data(self, df: pd.DataFrame, verbose: bool = True,
+                                 checkpoint_dir: Optional[str] = None,
+                                 memory_optimized: bool = False, n_jobs: int = 1,
+                                 return_profile: bool = False, engine: str = 'pandas'):
         """
         Main function to clean and transform the structured data
-        
+
         Args:
             df: DataFrame with structured submission data
             verbose: Whether to print detailed progress information
-            
+            checkpoint_dir: Directory for stage checkpoints; when given, stages whose
+                input data and config are unchanged are loaded instead of recomputed
+            memory_optimized: Clean the input frame in place instead of copying it,
+                downcast numerics losslessly, dictionary-encode low-cardinality text
+                and record bytes per row and peak RSS per stage in last_memory_report
+            n_jobs: Number of worker processes; above 1, row-local stages run on
+                partitions of at least min_partition_rows rows and the book-level
+                stages run on the merged frame, giving the same result as n_jobs=1
+            return_profile: Also return the run's PipelineProfile (always kept in last_profile)
+            engine: 'pandas', or 'polars' to run all stages as one lazy multi-threaded Polars
+                query (requires polars; not combinable with checkpoints, n_jobs or memory_optimized)
+
         Returns:
-            Cleaned and transformed DataFrame
+            Cleaned and transformed DataFrame, or (DataFrame, PipelineProfile) with return_profile
         """
+        if engine not in ('pandas', 'polars'):
+            raise ValueError(f"Unknown engine {engine!r}; expected 'pandas' or 'polars'")
+        if engine == 'polars' and (checkpoint_dir or memory_optimized or n_jobs > 1 or self._fit_stats is not None):
+            raise ValueError("engine='polars' runs the pipeline as one query and cannot be combined with "
+                             "checkpoint_dir, memory_optimized, n_jobs or fit()")
+
         if verbose:
             print("🧹 STARTING ENHANCED DATA CLEANING & TRANSFORMATION")
             print("=" * 60)
-        
-        # Create a copy to avoid modifying original
-        cleaned_df = df.copy()
-        
+
+        # Create a copy to avoid modifying original (memory-optimized runs clean in place)
+        cleaned_df = df if memory_optimized else df.copy()
+        self.last_memory_report = []
+        self._profile = PipelineProfile(len(cleaned_df))
+
         if verbose:
             print(f"📊 Input data shape: {cleaned_df.shape}")
             print(f"📋 Columns: {list(cleaned_df.columns)}")
-        
+
+        executor = None
+        if n_jobs > 1:
+            from aiengine.partitioned_execution import PartitionedExecutor
+            executor = PartitionedExecutor(self, n_jobs, self.min_partition_rows)
+
         # Data cleaning steps
         try:
-            # Step 1: Clean and convert currency values
-            if verbose: print("\n💰 Step 1: Converting currency values to USD...")
-            cleaned_df = self.convert_currency_values(cleaned_df, verbose)
-            
-            # Step 2: Normalize geography
-            if verbose: print("\n🌍 Step 2: Normalizing geography data...")
-            cleaned_df = self.normalize_geography(cleaned_df, verbose)
-            
-            # Step 3: Standardize perils
-            if verbose: print("\n⚡ Step 3: Standardizing peril types...")
-            cleaned_df = self.standardize_perils(cleaned_df, verbose)
-            
-            # Step 4: Normalize business types
-            if verbose: print("\n🏢 Step 4: Normalizing business types...")
-            cleaned_df = self.normalize_business_types(cleaned_df, verbose)
-            
-            # Step 5: Handle missing values intelligently
-            if verbose: print("\n🔧 Step 5: Handling missing values...")
-            cleaned_df = self.handle_missing_values(cleaned_df, verbose)
-            
-            # Step 6: Create engineered features
-            if verbose: print("\n🔬 Step 6: Creating engineered features...")
-            cleaned_df = self.create_features(cleaned_df, verbose)
-            
-            # Step 7: Advanced risk scoring
-            if verbose: print("\n🎯 Step 7: Computing advanced risk scores...")
-            cleaned_df = self.compute_risk_scores(cleaned_df, verbose)
-            
-            # Step 8: Data validation and quality checks
-            if verbose: print("\n✅ Step 8: Validating cleaned data...")
-            cleaned_df = self.validate_data(cleaned_df, verbose)
-            
+            # Checkpoints are bypassed while fitting so every stage records its statistics
+            if engine == 'polars':
+                cleaned_df = self._run_polars(cleaned_df, verbose)
+            elif checkpoint_dir and self._fit_stats is None:
+                cleaned_df = self._run_stages_with_checkpoints(
+                    cleaned_df, checkpoint_dir, verbose, memory_optimized, executor
+                )
+            else:
+                for group in self._stage_groups(executor is not None):
+                    cleaned_df = self._run_stage_group(group, cleaned_df, verbose, memory_optimized, executor)
+
+            if memory_optimized:
+                from aiengine.memory_utils import optimize_dtypes
+                cleaned_df = optimize_dtypes(cleaned_df)
+
+            profile = self._profile
+            profile.memory_report = self.last_memory_report
+            profile.checkpoint_report = self.last_checkpoint_report if checkpoint_dir else []
+            self.last_profile = profile
+
             if verbose:
                 print(f"\n📊 Output data shape: {cleaned_df.shape}")
+                print(f"⏱️  Total stage time: {profile.total_seconds:.3f}s")
                 print("🎉 DATA CLEANING COMPLETE!")
                 print("=" * 60)
             
-            return cleaned_df
+            return (cleaned_df, profile) if return_profile else cleaned_df
             
         except Exception as e:
             if verbose:
                 print(f"❌ Error during data cleaning: {e}")
             raise
-    
+
+        finally:
+            self._profile = None
+            if executor is not None:
+                executor.shutdown()
+
+    def _run_polars(self, df: pd.DataFrame, verbose: bool) -> pd.DataFrame:
+        """Run every stage as one lazy Polars query, profiled as a single stage"""
+        try:
+            from aiengine.polars_engine import PolarsCleaningEngine
+        except ImportError as e:
+            raise ImportError("engine='polars' requires polars: pip install polars") from e
+
+        if verbose:
+            print("\n🐻‍❄️ Building a lazy Polars query for all stages...")
+        rows_in, columns_in = len(df), list(df.columns)
+        start = self._profile.start_stage()
+        df, validation_results = PolarsCleaningEngine(self).run(df, verbose)
+        self._profile.validation_results = validation_results
+        self._profile_stage('polars', start, rows_in, columns_in, df, ['*'], verbose)
+        return df
+
+    def _stage_groups(self, partitioned: bool) -> List[List[Dict[str, Any]]]:
+        """Group consecutive row-local stages so partitions make one trip through the pool"""
+        if not partitioned:
+            return [[stage] for stage in self.stages]
+
+        groups = []
+        for stage in self.stages:
+            if groups and stage['row_local'] and groups[-1][-1]['row_local']:
+                groups[-1].append(stage)
+            else:
+                groups.append([stage])
+        return groups
+
+    def _run_stage_group(self, stages: List[Dict[str, Any]], df: pd.DataFrame, verbose: bool,
+                         memory_optimized: bool = False, executor=None) -> pd.DataFrame:
+        """Run a group of stages, on partitions when they are row-local and a pool is available"""
+        if executor is None or not stages[0]['row_local'] or executor.partition_count(len(df)) < 2:
+            for stage in stages:
+                df = self._run_stage(stage, df, verbose, memory_optimized)
+            return df
+
+        if verbose:
+            for stage in stages:
+                print(f"\n{stage['description']}")
+            print(f"   🧩 Running on {executor.partition_count(len(df))} partitions...")
+
+        rows_in, columns_in = len(df), list(df.columns)
+        start = self._profile.start_stage() if self._profile is not None else None
+        df = executor.run(df, stages, memory_optimized)
+        self._profile_stage('+'.join(stage['name'] for stage in stages), start, rows_in, columns_in, df,
+                            [col for stage in stages for col in stage['inputs']], verbose)
+
+        if memory_optimized:
+            self._record_memory('+'.join(stage['name'] for stage in stages), df, verbose)
+
+        return df
+
+    def _run_stage(self, stage: Dict[str, Any], df: pd.DataFrame, verbose: bool,
+                   memory_optimized: bool = False) -> pd.DataFrame:
+        """Run a single pipeline stage, tracking its memory footprint in memory-optimized mode"""
+        if verbose: print(f"\n{stage['description']}")
+        rows_in, columns_in = len(df), list(df.columns)
+        start = self._profile.start_stage() if self._profile is not None else None
+        df = getattr(self, stage['method'])(df, verbose)
+        self._profile_stage(stage['name'], start, rows_in, columns_in, df, stage['inputs'], verbose)
+
+        if memory_optimized:
+            from aiengine.memory_utils import downcast_integers
+            # Integer downcasts are safe between stages; floats and text wait until the end
+            # because later stages compute on them
+            df = downcast_integers(df)
+            self._record_memory(stage['name'], df, verbose)
+
+        return df
+
+    def _profile_stage(self, name: str, start: Optional[Dict[str, Any]], rows_in: int, columns_in: List[str],
+                       df: pd.DataFrame, inputs: List[str], verbose: bool, cache_hit: bool = False) -> None:
+        """Add a finished stage to the active profile (a no-op outside clean_and_transform_data)"""
+        if self._profile is None or start is None:
+            return
+        entry = self._profile.end_stage(name, start, rows_in, columns_in, df, inputs, cache_hit)
+        if verbose:
+            print(self._profile.summary_line(entry))
+
+    def _record_memory(self, stage_name: str, df: pd.DataFrame, verbose: bool) -> None:
+        """Append bytes per row and peak RSS after a stage to last_memory_report"""
+        from aiengine.memory_utils import frame_bytes, peak_rss_mb
+
+        total_bytes = frame_bytes(df)
+        self.last_memory_report.append({
+            'stage': stage_name,
+            'frame_bytes': total_bytes,
+            'bytes_per_row': total_bytes / len(df) if len(df) else 0.0,
+            'peak_rss_mb': peak_rss_mb()
+        })
+        if verbose:
+            report = self.last_memory_report[-1]
+            print(f"   🧠 {report['bytes_per_row']:,.0f} bytes/row | peak RSS {report['peak_rss_mb']} MB")
+
+    def _run_stages_with_checkpoints(self, df: pd.DataFrame, checkpoint_dir: str, verbose: bool,
+                                     memory_optimized: bool = False, executor=None) -> pd.DataFrame:
+        """Run the stages, resuming from the latest valid checkpoint and checkpointing the rest"""
+        from aiengine.pipeline_checkpoint import StageCheckpointStore
+
+        store = StageCheckpointStore(checkpoint_dir)
+
+        # Keys depend only on the input data and configs, so they are known up front
+        keys = []
+        key = store.input_key(df)
+        for stage in self.stages:
+            config = {attr: getattr(self, attr) for attr in stage['config']}
+            config['memory_optimized'] = memory_optimized  # changes the stored dtypes
+            key = store.stage_key(key, stage['name'], config)
+            keys.append(key)
+
+        # The latest stage with a checkpoint covers every stage before it
+        resume_from = -1
+        for i in reversed(range(len(self.stages))):
+            if store.exists(self.stages[i]['name'], keys[i]):
+                resume_from = i
+                break
+
+        if resume_from >= 0:
+            rows_in, columns_in = len(df), list(df.columns)
+            start = self._profile.start_stage() if self._profile is not None else None
+            df = store.load(self.stages[resume_from]['name'], keys[resume_from])
+            self._profile_stage(self.stages[resume_from]['name'], start, rows_in, columns_in, df,
+                                self.stages[resume_from]['inputs'], False, cache_hit=True)
+
+        report = []
+        for i, stage in enumerate(self.stages):
+            if i <= resume_from:
+                report.append({'stage': stage['name'], 'cache_hit': True, 'key': keys[i]})
+                if verbose: print(f"\n♻️  {stage['description']} (checkpoint hit)")
+                continue
+
+            df = self._run_stage_group([stage], df, verbose, memory_optimized, executor)
+            store.save(stage['name'], keys[i], df)
+            report.append({'stage': stage['name'], 'cache_hit': False, 'key': keys[i]})
+
+        self.last_checkpoint_report = report
+        if verbose:
+            hits = [r['stage'] for r in report if r['cache_hit']]
+            print(f"\n♻️  Checkpoint hits: {hits if hits else 'none'}")
+
+        return df
+
+    def fit(self, df: pd.DataFrame, verbose: bool = False) -> 'EnhancedDataCleaningPipeline':
+        """
+        Learn normalization bounds, imputation medians and duplicate keys from the historical book
+
+        Args:
+            df: DataFrame with the full history of structured submissions
+            verbose: Whether to print detailed progress information
+
+        Returns:
+            The fitted pipeline
+        """
+        self.fitted_state = None
+        self._fit_stats = {}
+        try:
+            self.clean_and_transform_data(df, verbose)
+            stats = self._fit_stats
+        finally:
+            self._fit_stats = None
+
+        self.fitted_state = {
+            'fitted_at': datetime.now().isoformat(),
+            'records_fitted': len(df),
+            'medians': stats.get('medians', {}),
+            'segment_medians': stats.get('segment_medians'),
+            'risk_score_bounds': stats.get('risk_score_bounds'),
+            'duplicate_key_columns': stats.get('duplicate_key_columns', []),
+            'duplicate_keys': stats.get('duplicate_keys', {}),
+            'row_fingerprints': [int(h) for h in self._row_fingerprints(df)],
+        }
+        self._seen_fingerprints = None
+
+        if verbose:
+            print(f"📐 Pipeline fitted on {len(df)} records")
+
+        return self
+
+    def transform(self, df: pd.DataFrame, verbose: bool = False, update_state: bool = True) -> pd.DataFrame:
+        """
+        Clean only the new or changed rows of a batch using the fitted state
+
+        Args:
+            df: DataFrame with incoming structured submissions
+            verbose: Whether to print detailed progress information
+            update_state: Whether to remember the cleaned rows as seen for later batches
+
+        Returns:
+            Cleaned and transformed DataFrame containing only new or changed rows
+        """
+        if self.fitted_state is None:
+            raise ValueError("Pipeline is not fitted. Call fit() or load_state() first.")
+
+        if self._seen_fingerprints is None:
+            self._seen_fingerprints = set(self.fitted_state['row_fingerprints'])
+
+        fingerprints = self._row_fingerprints(df)
+        new_mask = ~fingerprints.isin(self._seen_fingerprints)
+        new_rows = df[new_mask.values]
+
+        if verbose:
+            print(f"🆕 {len(new_rows)} new or changed records out of {len(df)}")
+
+        if new_rows.empty:
+            return new_rows.copy()
+
+        cleaned_df = self.clean_and_transform_data(new_rows, verbose)
+
+        if update_state:
+            new_fingerprints = [int(h) for h in fingerprints[new_mask]]
+            self.fitted_state['row_fingerprints'].extend(new_fingerprints)
+            self._seen_fingerprints.update(new_fingerprints)
+
+            key_columns = self.fitted_state['duplicate_key_columns']
+            if key_columns and all(col in cleaned_df.columns for col in key_columns):
+                new_keys = self._duplicate_key_map(cleaned_df, key_columns)
+                for key, record_id in new_keys.items():
+                    self.fitted_state['duplicate_keys'].setdefault(key, record_id)
+
+        return cleaned_df
+
+    def save_state(self, path: str) -> None:
+        """Save the fitted state as JSON so it can be reused at serving time"""
+        if self.fitted_state is None:
+            raise ValueError("No fitted state to save. Call fit() first.")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.fitted_state, f)
+
+    def load_state(self, path: str) -> 'EnhancedDataCleaningPipeline':
+        """Load a fitted state previously saved with save_state()"""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found. Fit the pipeline first.")
+
+        with open(path, encoding='utf-8') as f:
+            self.fitted_state = json.load(f)
+        self._seen_fingerprints = None
+        return self
+
+    def _fitted_imputer(self) -> Optional[SegmentImputer]:
+        """Imputer restored from the fitted state; states saved before segment medians use the book medians"""
+        if not self.fitted_state:
+            return None
+        if self.fitted_state.get('segment_medians'):
+            return SegmentImputer.from_dict(self.fitted_state['segment_medians'])
+        imputer = SegmentImputer()
+        imputer.global_medians = dict(self.fitted_state.get('medians', {}))
+        return imputer
+
+    def _row_fingerprints(self, df: pd.DataFrame) -> pd.Series:
+        """Hash every raw input row so unchanged rows can be skipped"""
+        return pd.util.hash_pandas_object(df[sorted(df.columns)], index=False)
+
+    def _duplicate_key_map(self, df: pd.DataFrame, key_columns: List[str]) -> Dict[str, Any]:
+        """Map duplicate key hashes to the submission that first used them"""
+        keys = pd.util.hash_pandas_object(df[key_columns], index=False).astype(str)
+        if self.record_id_column in df.columns:
+            record_ids = df[self.record_id_column].astype(str).tolist()
+        else:
+            record_ids = [None] * len(df)
+
+        key_map = {}
+        for key, record_id in zip(keys, record_ids):
+            key_map.setdefault(key, record_id)
+        return key_map
+
+    def _matches_fitted_duplicate_keys(self, df: pd.DataFrame, key_columns: List[str]) -> pd.Series:
+        """Flag rows whose duplicate key was already seen in the fitted book"""
+        known_keys = self.fitted_state.get('duplicate_keys', {})
+        if not known_keys or key_columns != self.fitted_state.get('duplicate_key_columns'):
+            return pd.Series(False, index=df.index)
+
+        keys = pd.util.hash_pandas_object(df[key_columns], index=False).astype(str)
+        keys.index = df.index
+        matched = keys.isin(known_keys.keys())
+
+        # A changed submission is not a duplicate of its own earlier version
+        if self.record_id_column in df.columns:
+            owners = keys.map(known_keys)
+            matched &= owners != df[self.record_id_column].astype(str)
+
+        return matched
+
     def convert_currency_values(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
         """Convert all currency values to USD numeric format with improved error handling"""
         
-        # Auto-detect currency columns
-        currency_columns = []
-        for col in df.columns:
-            if any(keyword in col.lower() for keyword in ['sum', 'premium', 'amount', 'value', 'limit']):
-                currency_columns.append(col)
+        currency_columns, rate_date_column = self._currency_columns(df.columns)
         
-        # Common currency column names
-        standard_currency_cols = ['SumInsured', 'PastPremium', 'Retention', 'Deductible', 'Limit']
-        currency_columns.extend([col for col in standard_currency_cols if col in df.columns])
-        
-        # Remove duplicates
-        currency_columns = list(set(currency_columns))
+        # Value every amount of a submission at the same date
+        date_column = next((col for col in self.fx_date_columns if col in df.columns), None)
+        valuation_dates = df[date_column] if date_column else None
+        if verbose:
+            print(f"   📅 FX valuation date: {date_column or 'latest rates'}")
         
         for col in currency_columns:
             if verbose:
                 print(f"   💵 Converting {col} to USD...")
             
             try:
-                # Convert to string first
-                df[col] = df[col].astype(str)
-                
-                # Apply currency conversion with error tracking
-                conversion_results = []
-                errors = 0
-                
-                for idx, value in df[col].items():
-                    try:
-                        converted = self.parse_currency_to_usd(value)
-                        conversion_results.append(converted)
-                    except Exception as e:
-                        conversion_results.append(0.0)
-                        errors += 1
-                
-                df[col] = conversion_results
+                # Parse amounts and currency codes, then convert the whole column in one as-of join
+                amounts, currencies, errors = self._parse_currency_column(df[col])
+                converted = self.fx_rates.convert(amounts, currencies, valuation_dates)
                 
-                # Convert to numeric
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+                df[col] = converted['AmountUSD'].to_numpy()
+                if col == rate_date_column:
+                    df['FxRateDate'] = converted['FxRateDate'].to_numpy()
                 
-                if verbose:
-                    total_value = df[col].sum()
-                    non_zero_count = (df[col] > 0).sum()
-                    print(f"   ✅ {col}: Total value ${total_value:,.0f} USD ({non_zero_count} non-zero values)")
-                    if errors > 0:
-                        print(f"   ⚠️  {errors} conversion errors in {col}")
+                if verbose and errors > 0:
+                    print(f"   ⚠️  {errors} conversion errors in {col}")
                         
             except Exception as e:
                 if verbose:
@@ -308,17 +745,66 @@ class EnhancedDataCleaningPipeline:
         
         return df
     
-    def parse_currency_to_usd(self, value_str: str) -> float:
-        """Enhanced currency parsing with better error handling"""
+    def _currency_columns(self, columns) -> Tuple[List[str], Optional[str]]:
+        """Currency columns to convert, and the one whose rate date is recorded (SumInsured when present)"""
+        
+        # Auto-detect currency columns
+        currency_columns = []
+        for col in columns:
+            if any(keyword in col.lower() for keyword in ['sum', 'premium', 'amount', 'value', 'limit']):
+                currency_columns.append(col)
+        
+        # Common currency column names
+        standard_currency_cols = ['SumInsured', 'PastPremium', 'Retention', 'Deductible', 'Limit']
+        currency_columns.extend([col for col in standard_currency_cols if col in columns])
+        
+        # Remove duplicates
+        currency_columns = list(set(currency_columns))
+        
+        rate_date_column = 'SumInsured' if 'SumInsured' in currency_columns else (sorted(currency_columns) or [None])[0]
+        return currency_columns, rate_date_column
+
+    def _parse_currency_column(self, values: pd.Series) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Parse each distinct value of a currency column once, without a string copy of the column
+
+        Returns:
+            Amounts in their original currency, currency code per row and the error count
+        """
+        try:
+            codes, uniques = pd.factorize(values)
+        except TypeError:  # unhashable cells: parse row by row
+            codes, uniques = np.arange(len(values)), values.tolist()
+
+        parsed = np.zeros(len(uniques), dtype=np.float64)
+        parsed_currencies = np.full(len(uniques), 'USD', dtype=object)
+        failed = np.zeros(len(uniques), dtype=bool)
+        for i, value in enumerate(uniques):
+            try:
+                parsed[i], parsed_currencies[i] = self.parse_currency_amount(value)
+            except Exception:
+                failed[i] = True
+
+        # Missing values (code -1) parse to 0.0 USD
+        present = codes >= 0
+        amounts = np.zeros(len(values), dtype=np.float64)
+        amounts[present] = parsed[codes[present]]
+        currencies = np.full(len(values), 'USD', dtype=object)
+        currencies[present] = parsed_currencies[codes[present]]
+        errors = int(failed[codes[present]].sum())
+        return amounts, currencies, errors
+
+    def parse_currency_amount(self, value_str: str) -> Tuple[float, str]:
+        """Parse a currency string into its non-negative amount and currency code, e.g. '€5 M' -> (5e6, 'EUR')"""
         if pd.isna(value_str) or str(value_str).lower() in ['nan', 'none', '', '0', 'not found']:
-            return 0.0
+            return 0.0, 'USD'
         
         try:
             value_str = str(value_str).strip().upper()
             
             # Handle "Not Found" and similar
             if any(phrase in value_str.lower() for phrase in ['not found', 'unknown', 'n/a', 'nil']):
-                return 0.0
+                return 0.0, 'USD'
             
             # Extract currency code
             currency_code = self.extract_currency_code(value_str)
@@ -326,20 +812,21 @@ class EnhancedDataCleaningPipeline:
             # Extract numeric value with multiplier
             numeric_value = self.extract_numeric_value(value_str)
             
-            # Convert to USD
-            exchange_rate = self.currency_rates.get(currency_code, 1.0)
-            usd_value = numeric_value * exchange_rate
-            
-            return max(0.0, usd_value)  # Ensure non-negative
+            return max(0.0, numeric_value), currency_code  # Ensure non-negative
             
         except Exception as e:
-            return 0.0
+            return 0.0, 'USD'
+
+    def parse_currency_to_usd(self, value_str: str) -> float:
+        """Enhanced currency parsing with better error handling (converts at the latest rates)"""
+        amount, currency_code = self.parse_currency_amount(value_str)
+        return amount * self.currency_rates.get(currency_code, 1.0)
     
     def extract_currency_code(self, value_str: str) -> str:
         """Enhanced currency code extraction"""
         
-        # Look for explicit currency codes first
-        for currency in self.currency_rates.keys():
+        # Look for explicit currency codes first, in precedence order
+        for currency in self.currency_codes:
             if currency in value_str:
                 return currency
         
@@ -408,12 +895,6 @@ class EnhancedDataCleaningPipeline:
                 print(f"   🗺️  Normalizing {col}...")
             
             df[col] = df[col].apply(self.standardize_geography)
-            
-            if verbose:
-                unique_count = df[col].nunique()
-                top_locations = df[col].value_counts().head(5)
-                print(f"   ✅ {col}: {unique_count} unique locations")
-                print(f"      Top locations: {dict(top_locations)}")
         
         return df
     
@@ -460,12 +941,6 @@ class EnhancedDataCleaningPipeline:
                 print(f"   ⚡ Standardizing {col}...")
             
             df[col] = df[col].apply(self.standardize_peril)
-            
-            if verbose:
-                peril_counts = df[col].value_counts()
-                print(f"   ✅ {col} distribution (top 10):")
-                for peril, count in peril_counts.head(10).items():
-                    print(f"      {peril}: {count}")
         
         return df
     
@@ -527,12 +1002,6 @@ class EnhancedDataCleaningPipeline:
                 print(f"   🏢 Standardizing {col}...")
             
             df[col] = df[col].apply(self.standardize_business_type)
-            
-            if verbose:
-                business_counts = df[col].value_counts()
-                print(f"   ✅ {col} distribution (top 10):")
-                for business, count in business_counts.head(10).items():
-                    print(f"      {business}: {count}")
         
         return df
     
@@ -577,66 +1046,47 @@ class EnhancedDataCleaningPipeline:
     def handle_missing_values(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
         """Enhanced missing value handling with intelligent imputation strategies"""
         
-        # Define strategies for different types of columns
-        missing_strategies = {
-            # Text fields
-            'Cedant': 'Unknown Cedant',
-            'Insured': 'Unknown Insured', 
-            'Broker': 'Unknown Broker',
-            'Geography': 'Unknown Location',
-            'State': 'Unknown',
-            'Country': 'Unknown',
-            'Location': 'Unknown',
-            'Territory': 'Unknown',
-            
-            # Classification fields
-            'Peril': 'Unknown',
-            'BusinessType': 'Other',
-            'Occupation': 'Other',
-            'Industry': 'Other',
-            'Sector': 'Other',
-            
-            # Financial fields
-            'SumInsured': 0.0,
-            'PastPremium': 0.0,
-            'Retention': 0.0,
-            'Deductible': 0.0,
-            'Limit': 0.0,
-            'Currency': 'USD',
-            
-            # Risk metrics
-            'ClaimRatio': 0.0,
-            'LossRatio': 0.0,
-        }
-        
-        for col, fill_value in missing_strategies.items():
-            if col in df.columns:
-                missing_count = df[col].isna().sum()
-                if missing_count > 0:
-                    if verbose:
-                        print(f"   🔧 Filling {missing_count} missing values in {col}")
-                    df[col].fillna(fill_value, inplace=True)
-        
-        # Handle LossHistory (JSON field) specially
-        if 'LossHistory' in df.columns:
-            missing_loss = df['LossHistory'].isna().sum()
-            if missing_loss > 0:
-                if verbose:
-                    print(f"   📊 Creating empty loss history for {missing_loss} records")
-                df['LossHistory'].fillna('[]', inplace=True)
-        
-        # Advanced imputation for numeric columns based on business logic
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        
-        for col in numeric_cols:
-            if df[col].isna().sum() > 0:
-                # Use median imputation for most numeric fields
-                median_val = df[col].median()
-                if pd.notna(median_val):
-                    df[col].fillna(median_val, inplace=True)
-                    if verbose:
-                        print(f"   📈 Imputed {col} with median value: {median_val:.2f}")
         
+        # Constant fills for categorical and financial fields, one fillna call for all columns
+        present = [col for col in self.missing_value_defaults if col in df.columns]
+        missing_counts = df[present].isna().sum()
+        constant_fills = {col: self.missing_value_defaults[col] for col in present if missing_counts[col] > 0}
+        if constant_fills:
+            if verbose:
+                for col in constant_fills:
+                    print(f"   🔧 Filling {missing_counts[col]} missing values in {col}")
+            df.fillna(constant_fills, inplace=True)
+        
+        # Small batches can arrive with all-missing numeric columns typed as object
+        fitted_medians = self.fitted_state['medians'] if self.fitted_state else {}
+        for col in [c for c in fitted_medians if c in df.columns]:
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+
+        numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+
+        # Segment medians from the fitted book when available, otherwise learned from this batch
+        imputer = self._fitted_imputer()
+        if imputer is None:
+            imputer = SegmentImputer(self.imputation_segments, self.imputation_min_segment_size)
+            imputer.fit(df, numeric_cols)
+
+        if self._fit_stats is not None:
+            self._fit_stats['medians'] = dict(imputer.global_medians)
+            self._fit_stats['segment_medians'] = imputer.to_dict()
+
+        if verbose:
+            gaps = df[numeric_cols].isna().sum()
+            for col, count in gaps[gaps > 0].items():
+                print(f"   📈 Imputing {count} missing values in {col} with segment medians")
+
+        imputer.transform(df)
+
+        # Columns the fitted book never saw fall back to this batch's medians
+        unfitted = [col for col in numeric_cols if col not in imputer.global_medians and df[col].isna().any()]
+        if unfitted:
+            df.fillna(df[unfitted].median().dropna().to_dict(), inplace=True)
+
         return df
     
     def create_features(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
@@ -681,9 +1131,8 @@ class EnhancedDataCleaningPipeline:
         if 'SumInsured' in df.columns:
             df['RiskSizeCategory'] = pd.cut(
                 df['SumInsured'],
-                bins=[0, 1_000_000, 10_000_000, 50_000_000, 200_000_000, 1_000_000_000, float('inf')],
-                labels=['Micro (<$1M)', 'Small ($1M-$10M)', 'Medium ($10M-$50M)', 
-                       'Large ($50M-$200M)', 'Very Large ($200M-$1B)', 'Mega (>$1B)'],
+                bins=RISK_SIZE_BINS,
+                labels=RISK_SIZE_LABELS,
                 include_lowest=True
             )
             if verbose:
@@ -732,6 +1181,20 @@ class EnhancedDataCleaningPipeline:
         return df
 
     
+    def add_loss_trend_features(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
+        """Loss trend slope, volatility and worst loss year from LossHistory, computed for all rows at once"""
+        if 'LossHistory' not in df.columns:
+            return df
+        
+        trends = loss_trend_frame(df['LossHistory'])
+        for col in trends.columns:
+            df[col] = trends[col].to_numpy()
+        
+        if verbose:
+            print(f"   ✅ Created {', '.join(trends.columns)} features")
+        
+        return df
+    
     def compute_risk_scores(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
         """Compute advanced risk scores using the risk multipliers"""
         
@@ -760,7 +1223,24 @@ class EnhancedDataCleaningPipeline:
         ).round(2)
  
         # Normalized Combined Risk Score (0-10 scale)
-        if df['CombinedRiskScore'].max() > 0:
+        bounds = self.fitted_state.get('risk_score_bounds') if self.fitted_state else None
+
+        if self._fit_stats is not None:
+            self._fit_stats['risk_score_bounds'] = {
+                'min': float(df['CombinedRiskScore'].min()),
+                'max': float(df['CombinedRiskScore'].max())
+            }
+
+        if bounds is not None:
+            # Scale against the fitted book so new batches stay comparable
+            score_range = bounds['max'] - bounds['min']
+            if score_range > 0:
+                df['NormalizedRiskScore'] = (
+                    ((df['CombinedRiskScore'] - bounds['min']) / score_range * 10).clip(0, 10)
+                ).round(2)
+            else:
+                df['NormalizedRiskScore'] = 5.0
+        elif df['CombinedRiskScore'].max() > 0:
             df['NormalizedRiskScore'] = (
                 (df['CombinedRiskScore'] - df['CombinedRiskScore'].min()) / 
                 (df['CombinedRiskScore'].max() - df['CombinedRiskScore'].min()) * 10
@@ -771,16 +1251,11 @@ class EnhancedDataCleaningPipeline:
         # Risk Categories
         df['RiskCategory'] = pd.cut(
             df['NormalizedRiskScore'],
-            bins=[0, 3, 6, 8, 10],
-            labels=['Low Risk', 'Medium Risk', 'High Risk', 'Very High Risk'],
+            bins=RISK_CATEGORY_BINS,
+            labels=RISK_CATEGORY_LABELS,
             include_lowest=True
         )
         
-        if verbose:
-            print(f"   ✅ Risk score distribution:")
-            for category, count in df['RiskCategory'].value_counts().items():
-                print(f"      {category}: {count}")
-        
         return df
     
     def calculate_geo_risk_score(self, state: str) -> float:
@@ -835,23 +1310,22 @@ class EnhancedDataCleaningPipeline:
     
     def calculate_completeness_score(self, row: pd.Series) -> float:
         """Calculate enhanced data completeness score"""
-        important_fields = [
-            'Cedant', 'Insured', 'Geography', 'Peril', 'SumInsured',
-            'BusinessType', 'PastPremium', 'ClaimRatio'
-        ]
-        
         filled_count = 0
-        for field in important_fields:
+        for field in COMPLETENESS_FIELDS:
             if field in row:
                 value = str(row[field]).lower()
-                if (pd.notna(row[field]) and 
-                    value not in ['', '0', 'unknown', 'other', 'nan', 'not found', 'none']):
+                if pd.notna(row[field]) and value not in EMPTY_VALUE_TOKENS:
                     filled_count += 1
         
-        return filled_count / len(important_fields)
+        return filled_count / len(COMPLETENESS_FIELDS)
     
     def validate_data(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
         """Enhanced data validation with comprehensive quality checks"""
+        df = self.validate_records(df, verbose)
+        return self.add_quality_columns(df, verbose)
+
+    def validate_records(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
+        """Book-level checks: negative amounts, extreme premium rates, duplicates and anomalies"""
         
         if verbose:
             print("   ✅ Performing enhanced data validation...")
@@ -883,16 +1357,30 @@ class EnhancedDataCleaningPipeline:
                     print(f"   ⚠️  {extreme_rates} records with extreme premium rates")
         
         # Check 3: Check for potential duplicates
-        duplicate_cols = ['Cedant', 'Insured', 'SumInsured', 'Peril']
-        available_cols = [col for col in duplicate_cols if col in df.columns]
+        available_cols = [col for col in self.duplicate_key_columns if col in df.columns]
         if len(available_cols) >= 3:
-            duplicates = df.duplicated(subset=available_cols, keep='first').sum()
+            is_duplicate = df.duplicated(subset=available_cols, keep='first')
+            if self.fitted_state:
+                is_duplicate |= self._matches_fitted_duplicate_keys(df, available_cols)
+
+            if self._fit_stats is not None:
+                self._fit_stats['duplicate_key_columns'] = available_cols
+                self._fit_stats['duplicate_keys'] = self._duplicate_key_map(df, available_cols)
+
+            if self.near_duplicate_settings is not None:
+                clusters = self.find_near_duplicates(df)
+                df['DuplicateClusterID'] = clusters.set_index('RecordIndex')['ClusterID'].reindex(df.index)
+                df['DuplicateSimilarity'] = clusters.set_index('RecordIndex')['Similarity'].reindex(df.index)
+                near_duplicates = clusters.loc[~clusters['IsRepresentative'].astype(bool), 'RecordIndex']
+                is_duplicate |= df.index.isin(near_duplicates)
+
+            duplicates = is_duplicate.sum()
             if duplicates > 0:
                 validation_results['duplicates_found'] = duplicates
                 if verbose:
                     print(f"   ⚠️  {duplicates} potential duplicate submissions")
                 # Mark duplicates
-                df['IsDuplicate'] = df.duplicated(subset=available_cols, keep='first')
+                df['IsDuplicate'] = is_duplicate
         
         # Check 4: Data quality assessment
         if 'DataCompletenessScore' in df.columns:
@@ -917,6 +1405,25 @@ class EnhancedDataCleaningPipeline:
             anomalies += zero_si_pos_prem
         
         validation_results['data_anomalies'] = anomalies
+        if self._profile is not None:
+            self._profile.validation_results = {key: int(value) for key, value in validation_results.items()}
+        
+        if verbose:
+            print("   📊 Validation Summary:")
+            print(f"      Total records processed: {len(df)}")
+            print(f"      Records with issues fixed: {validation_results['negative_values_fixed']}")
+        
+        return df
+
+    def find_near_duplicates(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Cluster near-duplicate submissions by cedant/insured name and sum insured similarity"""
+        from aiengine.duplicate_detector import NearDuplicateDetector
+
+        detector = NearDuplicateDetector(**(self.near_duplicate_settings or {}))
+        return detector.find_clusters(df)
+
+    def add_quality_columns(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
+        """Row-level quality flags and validation summary (needs duplicate and risk score columns)"""
         
         # Create comprehensive quality flags
         df['QualityFlags'] = self.create_quality_flags(df)
@@ -924,13 +1431,6 @@ class EnhancedDataCleaningPipeline:
         # Create validation summary
         df['ValidationSummary'] = df.apply(lambda row: self.create_validation_summary(row), axis=1)
         
-        if verbose:
-            print("   📊 Validation Summary:")
-            print(f"      Total records processed: {len(df)}")
-            print(f"      Records with issues fixed: {validation_results['negative_values_fixed']}")
-            print(f"      High-quality records (>70% complete): {(df.get('DataCompletenessScore', 0) > 0.7).sum()}")
-            print(f"      Clean records (no flags): {(df.get('QualityFlags', '') == 'CLEAN').sum()}")
-        
         return df
     
     def create_quality_flags(self, df: pd.DataFrame) -> pd.Series:
@@ -969,7 +1469,7 @@ class EnhancedDataCleaningPipeline:
             
             # Business logic flags
             if (row.get('SumInsured', 0) > 500_000_000 and 
-                row.get('BusinessType', '') not in ['Energy', 'Oil & Gas', 'Chemical']):
+                row.get('BusinessType', '') not in LARGE_RISK_BUSINESS_TYPES):
                 row_flags.append('UNUSUAL_SIZE_FOR_BUSINESS')
             
             flags.append('|'.join(row_flags) if row_flags else 'CLEAN')
@@ -1008,8 +1508,10 @@ class EnhancedDataCleaningPipeline:
         
         return " | ".join(summary_parts)
     
-    def generate_cleaning_report(self, original_df: pd.DataFrame, cleaned_df: pd.DataFrame) -> Dict[str, Any]:
-        """Generate comprehensive cleaning and analysis report"""
+    def generate_cleaning_report(self, original_df: pd.DataFrame, cleaned_df: pd.DataFrame,
+                                 profile: Optional[PipelineProfile] = None) -> Dict[str, Any]:
+        """Generate comprehensive cleaning and analysis report (with the run's stage profile, last run by default)"""
+        profile = profile or self.last_profile
         
         report = {
             'processing_metadata': {
@@ -1045,6 +1547,12 @@ class EnhancedDataCleaningPipeline:
             'validation_results': {}
         }
         
+        # Stage timings, memory and column statistics recorded during the run
+        if profile is not None:
+            report['processing_metadata']['processing_seconds'] = round(profile.total_seconds, 6)
+            report['stage_profile'] = profile.to_dict()
+            report['validation_results'] = profile.validation_results
+        
         # Currency analysis
         currency_cols = ['SumInsured', 'PastPremium']
         for col in currency_cols:
@@ -0,0 +1,286 @@
+import re
+import zlib
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class NearDuplicateDetector:
+    """
+    Near-duplicate submission detection that scales roughly linearly with the book.
+
+    Instead of comparing every pair of submissions:
+    - names are normalized and each distinct (cedant, insured) name key is
+      handled once; records sharing a key form a block
+    - MinHash/LSH over the insured name shingles finds similar name keys,
+      whose records form a combined block
+    - inside a block, records are sorted by sum insured and only neighbours
+      are compared, so amounts within the tolerance chain into one cluster
+    """
+
+    # Legal-form and filler words that brokers add or drop freely
+    NAME_STOPWORDS = {
+        'the', 'co', 'company', 'cos', 'ltd', 'limited', 'inc', 'incorporated', 'llc', 'llp',
+        'plc', 'corp', 'corporation', 'group', 'holdings', 'holding', 'sa', 'ag', 'nv', 'bv',
+        'gmbh', 'pty', 'pvt', 'private', 'public', 'of', 'and'
+    }
+
+    def __init__(self, name_threshold: float = 0.7, amount_tolerance: float = 0.1,
+                 num_perm: int = 64, bands: int = 16, shingle_size: int = 3,
+                 max_bucket_size: int = 50, seed: int = 42):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.name_threshold = name_threshold
+        self.amount_tolerance = amount_tolerance
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.max_bucket_size = max_bucket_size
+
+        # Universal hash family h(x) = (a * x + b) mod p, with p the Mersenne prime 2^31 - 1
+        self._prime = np.uint64(2**31 - 1)
+        rng = np.random.default_rng(seed)
+        self._perm_a = rng.integers(1, 2**31 - 1, size=num_perm, dtype=np.uint64)
+        self._perm_b = rng.integers(0, 2**31 - 1, size=num_perm, dtype=np.uint64)
+        self._band_weights = rng.integers(1, 2**63 - 1, size=num_perm // bands, dtype=np.uint64)
+
+    def normalize_name(self, name) -> str:
+        """Lowercase, strip punctuation and drop legal-form words: 'ABC Insurance Co.' -> 'abc insurance'"""
+        if pd.isna(name):
+            return ''
+        text = str(name).lower().replace('&', ' and ')
+        tokens = re.sub(r'[^a-z0-9\s]', ' ', text).split()
+        return ' '.join(token for token in tokens if token not in self.NAME_STOPWORDS)
+
+    def _normalized_codes(self, values: pd.Series):
+        """Integer code per record and the distinct normalized names (each raw value normalized once)"""
+        raw_codes, raw_values = pd.factorize(values, use_na_sentinel=False)
+        codes, names = pd.factorize(pd.Series([self.normalize_name(v) for v in raw_values], dtype=object))
+        return codes[raw_codes], list(names)
+
+    def _shingles(self, text: str) -> set:
+        if len(text) <= self.shingle_size:
+            return {text} if text else set()
+        return {text[i:i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+
+    def _signatures(self, token_sets: List[set]) -> np.ndarray:
+        """MinHash signatures (one row per token set), hashing all tokens in one vectorized pass"""
+        sizes = np.array([len(tokens) for tokens in token_sets], dtype=np.int64)
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode()) for tokens in token_sets for token in tokens),
+            dtype=np.uint64, count=int(sizes.sum())
+        ) % self._prime
+
+        signatures = np.full((len(token_sets), self.num_perm), self._prime, dtype=np.uint64)
+        non_empty = sizes > 0
+        if non_empty.any():
+            starts = (np.cumsum(sizes) - sizes)[non_empty]
+            for perm in range(self.num_perm):
+                permuted = (self._perm_a[perm] * hashes + self._perm_b[perm]) % self._prime
+                signatures[non_empty, perm] = np.minimum.reduceat(permuted, starts)
+        return signatures
+
+    @staticmethod
+    def _jaccard(a: set, b: set) -> float:
+        if not a and not b:
+            return 1.0
+        return len(a & b) / len(a | b)
+
+    def _bucket_pairs(self, keys: np.ndarray) -> np.ndarray:
+        """
+        (left, right) positions of items sharing a bucket key. Oversized buckets
+        are linked to their first member only, keeping the count linear.
+        """
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(keys)])
+
+        left, right, triangles = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)], {}
+        for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+            members = order[start:start + size]  # ascending, since the sort is stable
+            if size > self.max_bucket_size:
+                left.append(np.repeat(members[0], size - 1))
+                right.append(members[1:])
+            else:
+                if size not in triangles:
+                    triangles[size] = np.triu_indices(size, k=1)
+                i, j = triangles[size]
+                left.append(members[i])
+                right.append(members[j])
+        return np.column_stack([np.concatenate(left), np.concatenate(right)]).astype(np.int64)
+
+    @staticmethod
+    def _expand_ranges(starts: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """Concatenate range(start, start + size) for each start/size pair"""
+        offsets = np.repeat(np.cumsum(sizes) - sizes, sizes)
+        return np.repeat(starts, sizes) + np.arange(sizes.sum()) - offsets
+
+    def similar_name_keys(self, cedant_names: List[str], insured_names: List[str],
+                          key_cedants: np.ndarray, key_insureds: np.ndarray) -> pd.DataFrame:
+        """
+        Pairs of distinct name keys whose cedant and insured names are both similar.
+
+        LSH runs on the insured names only: cedants are few and shared by many
+        insureds, so including them would make most keys of a cedant collide.
+
+        Returns:
+            DataFrame of key pairs (KeyA < KeyB) with their NameSimilarity
+            (mean of the cedant and insured shingle Jaccard similarities)
+        """
+        columns = ['KeyA', 'KeyB', 'NameSimilarity']
+        n_keys = len(key_cedants)
+        if n_keys < 2:
+            return pd.DataFrame(columns=columns)
+
+        insured_shingles = [self._shingles(name) for name in insured_names]
+        signatures = self._signatures(insured_shingles)[key_insureds]
+
+        rows_per_band = self.num_perm // self.bands
+        candidates = np.concatenate([
+            self._bucket_pairs((signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+                                * self._band_weights).sum(axis=1))  # band hashes wrap mod 2^64
+            for band in range(self.bands)
+        ])
+        pair_ids = np.unique(candidates[:, 0] * n_keys + candidates[:, 1])
+        key_a, key_b = pair_ids // n_keys, pair_ids % n_keys
+
+        # Cheap MinHash estimate first; exact Jaccard only for plausible pairs
+        estimate = np.concatenate([
+            (signatures[key_a[i:i + 100_000]] == signatures[key_b[i:i + 100_000]]).mean(axis=1)
+            for i in range(0, len(key_a), 100_000)
+        ]) if len(key_a) else np.empty(0)
+        plausible = estimate >= self.name_threshold - 0.15
+        key_a, key_b = key_a[plausible], key_b[plausible]
+
+        cedant_shingles = [self._shingles(name) for name in cedant_names]
+        cedant_sim = self._code_pair_similarity(cedant_shingles, key_cedants[key_a], key_cedants[key_b])
+        insured_sim = self._code_pair_similarity(insured_shingles, key_insureds[key_a], key_insureds[key_b])
+
+        keep = (cedant_sim >= self.name_threshold) & (insured_sim >= self.name_threshold)
+        return pd.DataFrame({
+            'KeyA': key_a[keep],
+            'KeyB': key_b[keep],
+            'NameSimilarity': (cedant_sim[keep] + insured_sim[keep]) / 2
+        })
+
+    def _code_pair_similarity(self, shingles: List[set], left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Jaccard similarity of name code pairs, computed once per distinct pair"""
+        n_names = max(len(shingles), 1)
+        pair_codes, unique_pairs = pd.factorize(left.astype(np.int64) * n_names + right)
+        similarity = np.array([
+            self._jaccard(shingles[pair // n_names], shingles[pair % n_names]) for pair in unique_pairs
+        ], dtype=float)
+        return similarity[pair_codes] if len(pair_codes) else np.empty(0)
+
+    def find_duplicate_pairs(self, df: pd.DataFrame, cedant_column: str = 'Cedant',
+                             insured_column: str = 'Insured',
+                             amount_column: Optional[str] = 'SumInsured') -> pd.DataFrame:
+        """
+        Find verified links between near-duplicate records
+
+        Only neighbouring records (by sum insured) of a block are linked, which
+        is enough to recover every cluster but not every pairwise match.
+
+        Returns:
+            DataFrame with positional indices Left/Right and NameSimilarity,
+            AmountSimilarity and Similarity scores for each link
+        """
+        n = len(df)
+        columns = ['Left', 'Right', 'NameSimilarity', 'AmountSimilarity', 'Similarity']
+        if n < 2:
+            return pd.DataFrame(columns=columns)
+
+        cedant_codes, cedant_names = self._normalized_codes(df[cedant_column])
+        insured_codes, insured_names = self._normalized_codes(df[insured_column])
+        key_codes, key_values = pd.factorize(cedant_codes.astype(np.int64) * len(insured_names) + insured_codes)
+        key_cedants, key_insureds = key_values // len(insured_names), key_values % len(insured_names)
+
+        if amount_column and amount_column in df.columns:
+            amounts = pd.to_numeric(df[amount_column], errors='coerce').fillna(0).to_numpy(dtype=float)
+        else:
+            amounts = np.zeros(n)
+
+        # Blocks: each name key on its own (blocking) plus each similar key pair (LSH)
+        key_pairs = self.similar_name_keys(cedant_names, insured_names, key_cedants, key_insureds)
+        records_by_key = np.argsort(key_codes, kind='stable')
+        key_starts = np.searchsorted(key_codes[records_by_key], np.arange(len(key_values) + 1))
+
+        pair_blocks = len(key_values) + np.arange(len(key_pairs))
+        block_ids, block_members = [key_codes], [np.arange(n)]
+        for side in ('KeyA', 'KeyB'):
+            keys = key_pairs[side].to_numpy(dtype=np.int64)
+            sizes = key_starts[keys + 1] - key_starts[keys]
+            block_ids.append(np.repeat(pair_blocks, sizes))
+            block_members.append(records_by_key[self._expand_ranges(key_starts[keys], sizes)])
+        block_ids = np.concatenate(block_ids)
+        block_members = np.concatenate(block_members)
+        block_similarity = np.r_[np.ones(len(key_values)), key_pairs['NameSimilarity'].to_numpy(dtype=float)]
+
+        # Sorted neighbourhood: link consecutive records of a block by amount
+        order = np.lexsort((block_members, amounts[block_members], block_ids))
+        block_ids, block_members = block_ids[order], block_members[order]
+        same_block = block_ids[1:] == block_ids[:-1]
+        left, right = block_members[:-1][same_block], block_members[1:][same_block]
+        name_sim = block_similarity[block_ids[1:][same_block]]
+
+        high, low = np.maximum(amounts[left], amounts[right]), np.minimum(amounts[left], amounts[right])
+        amount_sim = np.where(high > 0, low / np.where(high > 0, high, 1), 1.0)
+        keep = amount_sim >= 1 - self.amount_tolerance
+
+        pairs = pd.DataFrame({
+            'Left': np.minimum(left, right)[keep],
+            'Right': np.maximum(left, right)[keep],
+            'NameSimilarity': name_sim[keep],
+            'AmountSimilarity': amount_sim[keep],
+        })
+        pairs['Similarity'] = 0.75 * pairs['NameSimilarity'] + 0.25 * pairs['AmountSimilarity']
+        pairs = pairs.sort_values('Similarity', ascending=False).drop_duplicates(['Left', 'Right'])
+        return pairs.sort_values(['Left', 'Right']).reset_index(drop=True)[columns]
+
+    def find_clusters(self, df: pd.DataFrame, **columns) -> pd.DataFrame:
+        """
+        Group near-duplicates into clusters
+
+        Returns:
+            DataFrame with one row per clustered record: RecordIndex (label in df),
+            ClusterID, ClusterSize, IsRepresentative (earliest record in the cluster)
+            and Similarity (best verified similarity to another cluster member)
+        """
+        pairs = self.find_duplicate_pairs(df, **columns)
+        output_columns = ['RecordIndex', 'ClusterID', 'ClusterSize', 'IsRepresentative', 'Similarity']
+        if pairs.empty:
+            return pd.DataFrame(columns=output_columns)
+
+        # Union-find over verified links, rooted at the earliest record
+        parent = {}
+
+        def find(x):
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for left, right in zip(pairs['Left'], pairs['Right']):
+            root_left, root_right = find(left), find(right)
+            if root_left != root_right:
+                parent[max(root_left, root_right)] = min(root_left, root_right)
+
+        best_similarity = pd.concat([
+            pairs[['Left', 'Similarity']].rename(columns={'Left': 'Position'}),
+            pairs[['Right', 'Similarity']].rename(columns={'Right': 'Position'})
+        ]).groupby('Position')['Similarity'].max()
+
+        positions = np.array(sorted(parent))
+        roots = np.array([find(p) for p in positions])
+        clusters = pd.DataFrame({
+            'RecordIndex': df.index[positions],
+            'ClusterID': pd.factorize(roots)[0],
+            'IsRepresentative': positions == roots,
+            'Similarity': best_similarity.loc[positions].to_numpy()
+        })
+        clusters['ClusterSize'] = clusters.groupby('ClusterID')['ClusterID'].transform('size')
+        return clusters[output_columns]
@@ -0,0 +1,26 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+def build_feature_matrix(submissions, columns: List[str]) -> np.ndarray:
+    """
+    Float matrix of the given feature columns for many submissions
+
+    Accepts a DataFrame, a list of submission dicts or a columnar dict of
+    lists. Missing, null or non-numeric features are 0.
+    """
+    if isinstance(submissions, list) and all(isinstance(s, dict) for s in submissions):
+        try:
+            # Plain numeric records skip building a DataFrame of every field
+            X = np.array([[s.get(c, 0) for c in columns] for s in submissions], dtype=np.float64)
+            X = X.reshape(len(submissions), len(columns))
+            X[np.isnan(X)] = 0
+            return X
+        except (TypeError, ValueError):
+            pass
+
+    frame = submissions if isinstance(submissions, pd.DataFrame) else pd.DataFrame(submissions)
+    frame = frame.reindex(columns=columns, fill_value=0)
+    return frame.apply(pd.to_numeric, errors='coerce').fillna(0).to_numpy(dtype=np.float64)
@@ -0,0 +1,283 @@
+from typing import Optional
+
+import numpy as np
+
+
+class CompiledForest:
+    """
+    Array-based inference for a trained sklearn random forest.
+
+    All trees are flattened into one set of contiguous node arrays, and every
+    (tree, row) pair is advanced one level per step with vectorized gathers.
+    Leaves point to themselves, so shallower trees can idle until the deepest
+    one finishes; batches drop finished pairs every few levels.
+
+    Node k is stored in slots 2k and 2k + 1 of feature, threshold and
+    children: feature[2k] and threshold[2k] hold its split, children[2k] the
+    slot of its right child and children[2k + 1] that of its left child, so
+    one step is slot = children[slot + (x <= threshold[slot])]. values holds
+    class fractions (classifiers) or means (regressors) of every node.
+    contributions() decomposes predictions along the decision paths
+    (Saabas): each split adds the change in node value to the feature it
+    splits on. Results match the sklearn model's predict and predict_proba up to
+    floating point summation order.
+    """
+
+    # Levels between removals of finished (tree, row) pairs in batches
+    COMPACT_EVERY = 4
+    # Arrays that fully describe a compiled forest, besides max_depth and n_features
+    ARRAY_FIELDS = ('feature', 'threshold', 'children', 'values', 'roots', 'classes', 'missing_go_to_left')
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 values: np.ndarray, roots: np.ndarray, max_depth: int, n_features: int,
+                 classes: Optional[np.ndarray] = None, missing_go_to_left: Optional[np.ndarray] = None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.values = values
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.classes = classes
+        self.missing_go_to_left = missing_go_to_left
+        self._root_slots = 2 * np.asarray(roots, dtype=np.int64)
+        # Per-node parent, parent split feature and value change, see prepare_explanations()
+        self._parent = self._parent_feature = self._delta = None
+
+    @property
+    def is_classifier(self) -> bool:
+        return self.classes is not None
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, model) -> 'CompiledForest':
+        """Flatten a fitted RandomForestClassifier or RandomForestRegressor"""
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        if trees[0].n_outputs != 1:
+            raise ValueError("Only single-output forests can be compiled")
+        classes = getattr(model, 'classes_', None)
+
+        sizes = np.array([tree.node_count for tree in trees])
+        roots = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int64)
+        feature, threshold, children, values, missing_left = [], [], [], [], []
+        for tree, root in zip(trees, roots):
+            nodes = np.arange(tree.node_count) + root
+            leaf = tree.children_left == -1
+            left = np.where(leaf, nodes, tree.children_left + root)
+            right = np.where(leaf, nodes, tree.children_right + root)
+
+            feature.append(np.repeat(np.where(leaf, 0, tree.feature), 2))
+            threshold.append(np.repeat(tree.threshold, 2))
+            children.append(2 * np.column_stack((right, left)).ravel())
+            value = tree.value[:, 0, :]
+            if classes is not None:
+                value = value / value.sum(axis=1, keepdims=True)
+            else:
+                value = value[:, 0]
+            values.append(value)
+            missing_left.append(np.repeat(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)), 2))
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.int64),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            children=np.concatenate(children).astype(np.int64),
+            values=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=roots,
+            max_depth=max(tree.max_depth for tree in trees),
+            n_features=model.n_features_in_,
+            classes=None if classes is None else np.asarray(classes),
+            missing_go_to_left=np.concatenate(missing_left).astype(bool),
+        )
+
+    def arrays(self) -> dict:
+        """Node arrays by name, leaving out those the forest does not have"""
+        return {name: getattr(self, name) for name in self.ARRAY_FIELDS if getattr(self, name) is not None}
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, max_depth: int, n_features: int) -> 'CompiledForest':
+        """Rebuild a forest from arrays(), e.g. memory-mapped from disk, without copying them"""
+        # Plain ndarray views index faster than np.memmap
+        return cls(max_depth=max_depth, n_features=n_features,
+                   **{name: np.asarray(array) for name, array in arrays.items()})
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf node of every tree for every row, shape (n_trees, n_rows)"""
+        X = self._check(X)
+        n_rows = X.shape[0]
+        flat = X.ravel()
+        has_missing = bool(np.isnan(flat).any())
+
+        if n_rows == 1:
+            slot = self._root_slots.copy()
+            for _ in range(self.max_depth):
+                slot = self._step(flat, 0, slot, has_missing)
+            return (slot >> 1).reshape(self.n_trees, 1)
+
+        slot = np.repeat(self._root_slots, n_rows)
+        offsets = np.tile(np.arange(n_rows, dtype=np.int64) * self.n_features, self.n_trees)
+        position = np.arange(len(slot))
+        leaves = np.empty(len(slot), dtype=np.int64)
+        for level in range(1, self.max_depth + 1):
+            slot = self._step(flat, offsets, slot, has_missing)
+            if level % self.COMPACT_EVERY == 0 and level < self.max_depth:
+                # Set aside pairs that reached a leaf
+                done = self.children[slot] == slot
+                leaves[position[done]] = slot[done]
+                running = ~done
+                slot, offsets, position = slot[running], offsets[running], position[running]
+                if not len(slot):
+                    break
+        leaves[position] = slot
+        return (leaves >> 1).reshape(self.n_trees, n_rows)
+
+    def predict_proba(self, X, batch_rows: int = 20000) -> np.ndarray:
+        """Class probabilities averaged over the trees, in classes order"""
+        if not self.is_classifier:
+            raise ValueError("predict_proba needs a classifier forest")
+        return self._mean_values(X, batch_rows)
+
+    def predict(self, X, batch_rows: int = 20000) -> np.ndarray:
+        """Predicted class labels (classifiers) or mean predictions (regressors)"""
+        if self.is_classifier:
+            return self.classes[self.predict_proba(X, batch_rows).argmax(axis=1)]
+        return self._mean_values(X, batch_rows)
+
+    def _mean_values(self, X, batch_rows: int) -> np.ndarray:
+        # Rows go batch_rows at a time, as in predict_quantiles, so the
+        # (n_trees, rows, n_classes) leaf values and traversal index arrays
+        # stay bounded whatever the input size
+        X = self._check(X)
+        result = np.empty((len(X),) + self.values.shape[1:])
+        for start in range(0, len(X), batch_rows):
+            result[start:start + batch_rows] = self.values[self.apply(X[start:start + batch_rows])].sum(axis=0)
+        result /= self.n_trees
+        return result
+
+    def predict_quantiles(self, X, quantiles, batch_rows: int = 20000, return_mean: bool = False):
+        """
+        Quantiles of the per-tree predictions, shape (n_rows, len(quantiles))
+
+        Every tree's leaf value is gathered for all rows at once, sorted
+        across trees and linearly interpolated (as np.quantile); rows are
+        processed batch_rows at a time to bound the (n_trees, batch_rows)
+        leaf matrix. With return_mean, also returns predict(X) from the same
+        leaves, so a point prediction and its range cost one traversal.
+        """
+        if self.is_classifier:
+            raise ValueError("predict_quantiles needs a regressor forest")
+        quantiles = np.asarray(quantiles, dtype=np.float64)
+        if quantiles.ndim != 1 or not len(quantiles) or ((quantiles < 0) | (quantiles > 1)).any():
+            raise ValueError("quantiles must be a non-empty list of values between 0 and 1")
+        X = self._check(X)
+
+        position = quantiles * (self.n_trees - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, self.n_trees - 1)
+        fraction = (position - lower)[:, None]
+
+        result = np.empty((len(X), len(quantiles)))
+        mean = np.empty(len(X))
+        for start in range(0, len(X), batch_rows):
+            per_tree = self.values[self.apply(X[start:start + batch_rows])]
+            mean[start:start + batch_rows] = per_tree.sum(axis=0) / self.n_trees
+            per_tree.sort(axis=0)
+            result[start:start + batch_rows] = (per_tree[lower] * (1 - fraction) + per_tree[upper] * fraction).T
+        return (result, mean) if return_mean else result
+
+    def prepare_explanations(self):
+        """Precompute, per node, its parent, the feature its parent splits on and its value change"""
+        if self._delta is not None:
+            return
+        nodes = np.arange(len(self.values))
+        split = nodes[self.children[2 * nodes] != 2 * nodes]
+        parent = np.full(len(nodes), -1, dtype=np.int64)
+        parent[self.children[2 * split] >> 1] = split
+        parent[self.children[2 * split + 1] >> 1] = split
+        # Roots are their own parents, with no value change
+        parent = np.where(parent >= 0, parent, nodes)
+
+        delta = np.asarray(self.values) - np.asarray(self.values)[parent]
+        self._parent_feature = np.asarray(self.feature)[2 * parent]
+        self._parent = parent
+        self._delta = delta.reshape(len(nodes), -1)
+
+    def contributions(self, X, batch_rows: int = 20000):
+        """
+        Per-feature contributions to every prediction, from the decision paths
+
+        Returns:
+            bias: Mean root value over the trees, shape (n_classes,) or scalar
+            contributions: Shape (n_rows, n_features, n_classes) for
+                classifiers, (n_rows, n_features) for regressors; bias plus
+                the sum over features equals predict_proba / predict
+        """
+        self.prepare_explanations()
+        X = self._check(X)
+        n_rows, n_outputs = len(X), self._delta.shape[1]
+        result = np.empty((n_rows, self.n_features, n_outputs))
+        for start in range(0, n_rows, batch_rows):
+            chunk = X[start:start + batch_rows]
+            result[start:start + len(chunk)] = self._path_sums(chunk)
+        result /= self.n_trees
+
+        bias = np.asarray(self.values)[self.roots].mean(axis=0)
+        if not self.is_classifier:
+            return float(bias), result[:, :, 0]
+        return bias, result
+
+    def _path_sums(self, X: np.ndarray) -> np.ndarray:
+        # Walk every (tree, row) leaf back up to its root, adding each node's
+        # value change to the feature its parent split on. Roots are their
+        # own parents with no change, so finished walks idle harmlessly until
+        # they are dropped every few levels, as in apply()
+        n_rows, n_outputs = len(X), self._delta.shape[1]
+        node = self.apply(X).ravel()
+        row_offset = np.tile(np.arange(n_rows, dtype=np.int64) * self.n_features, self.n_trees)
+        targets, nodes = [], []
+        for level in range(1, self.max_depth + 1):
+            targets.append(row_offset + self._parent_feature[node])
+            nodes.append(node)
+            node = self._parent[node]
+            if level % self.COMPACT_EVERY == 0:
+                moving = self._parent[node] != node
+                node, row_offset = node[moving], row_offset[moving]
+                if not len(node):
+                    break
+        node = np.concatenate(nodes)
+        target = np.concatenate(targets)
+        size = n_rows * self.n_features
+        delta = self._delta[node]
+        totals = np.empty((n_rows, self.n_features, n_outputs))
+        for k in range(n_outputs):
+            totals[:, :, k] = np.bincount(target, weights=delta[:, k], minlength=size).reshape(n_rows, -1)
+        return totals
+
+    def _step(self, flat: np.ndarray, offsets, slot: np.ndarray, has_missing: bool) -> np.ndarray:
+        value = flat[offsets + self.feature[slot]]
+        go_left = value <= self.threshold[slot]
+        if has_missing:
+            # Same routing as sklearn: missing values follow missing_go_to_left
+            go_left = np.where(np.isnan(value), self.missing_go_to_left[slot], go_left)
+        return self.children[slot + go_left]
+
+    def _check(self, X) -> np.ndarray:
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        return X
+
+
+def compile_forest(model) -> Optional[CompiledForest]:
+    """CompiledForest for a fitted sklearn forest, or None for other models"""
+    if not hasattr(model, 'estimators_') or not all(hasattr(e, 'tree_') for e in model.estimators_):
+        return None
+    try:
+        return CompiledForest.from_sklearn(model)
+    except ValueError:
+        return None
@@ -0,0 +1,116 @@
+import hashlib
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Daily rates to USD shared by the cleaning pipeline and the message parser
+DEFAULT_RATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'fx_rates.csv')
+
+
+class FxRateStore:
+    """
+    Dated exchange rates to USD, loaded from a CSV with Date, Currency and
+    RateToUSD columns (one row per currency per day).
+
+    Amounts are converted at the latest rate on or before their valuation
+    date; dates before a currency's first rate use that first rate. Stores
+    are cached per file and reloaded when the file changes.
+    """
+
+    _cache: Dict[str, Tuple[float, 'FxRateStore']] = {}
+
+    def __init__(self, rates: pd.DataFrame, source: Optional[str] = None):
+        rates = rates[['Date', 'Currency', 'RateToUSD']].copy()
+        rates['Date'] = pd.to_datetime(rates['Date']).astype('datetime64[ns]')
+        rates['Currency'] = rates['Currency'].astype(str).str.upper()
+        rates['RateToUSD'] = rates['RateToUSD'].astype(float)
+        self.rates = rates.sort_values(['Date', 'Currency']).reset_index(drop=True)
+        self.source = source
+        self.fingerprint = hashlib.sha256(
+            pd.util.hash_pandas_object(self.rates, index=False).values.tobytes()
+        ).hexdigest()[:16]
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'FxRateStore':
+        """Load a rate file, reusing the in-memory store while the file is unchanged"""
+        path = os.path.abspath(path or DEFAULT_RATES_PATH)
+        mtime = os.path.getmtime(path)
+        cached = cls._cache.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, cls(pd.read_csv(path), source=path))
+            cls._cache[path] = cached
+        return cached[1]
+
+    def __repr__(self) -> str:
+        # Identifies the rate table's content, e.g. in checkpoint keys
+        name = os.path.basename(self.source) if self.source else None
+        return f"FxRateStore(source={name!r}, fingerprint={self.fingerprint})"
+
+    @property
+    def currencies(self) -> list:
+        return list(dict.fromkeys(self.rates['Currency']))
+
+    def latest_rates(self, as_of=None) -> Dict[str, float]:
+        """Rate per currency on or before as_of (default: the most recent rates)"""
+        rates = self.rates
+        if as_of is not None:
+            rates = rates[rates['Date'] <= pd.Timestamp(as_of)]
+        return rates.groupby('Currency', sort=False)['RateToUSD'].last().to_dict()
+
+    def rate(self, currency: str, as_of=None) -> Tuple[float, Optional[pd.Timestamp]]:
+        """Rate and rate date for one currency; unknown currencies convert at 1.0"""
+        converted = self.convert(np.ones(1), np.array([currency], dtype=object),
+                                 None if as_of is None else [as_of])
+        return float(converted['FxRate'].iloc[0]), converted['FxRateDate'].iloc[0]
+
+    def valuation_dates(self, dates, n: int) -> np.ndarray:
+        """Day each of n amounts is valued at; None or missing dates use the latest rate date"""
+        latest = self.rates['Date'].max() if len(self.rates) else pd.Timestamp.now()
+        if dates is None:
+            valuation = pd.Series(latest, index=range(n))
+        else:
+            valuation = pd.Series(pd.to_datetime(pd.Series(dates).to_numpy(), errors='coerce'))
+            valuation = valuation.dt.tz_localize(None) if valuation.dt.tz is not None else valuation
+            valuation = valuation.fillna(latest).dt.normalize()
+        return valuation.astype('datetime64[ns]').to_numpy()
+
+    def convert(self, amounts, currencies, dates=None) -> pd.DataFrame:
+        """
+        Convert amounts to USD with an as-of join on each row's date
+
+        Args:
+            amounts: Amounts in their original currency
+            currencies: Currency code per amount
+            dates: Valuation date per amount; None or missing dates use the latest rates
+
+        Returns:
+            DataFrame aligned with the inputs with AmountUSD, FxRate and FxRateDate
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        n = len(amounts)
+
+        rows = pd.DataFrame({
+            '_row': np.arange(n),
+            'Currency': pd.Series(currencies, dtype=object).str.upper().to_numpy(),
+            'ValuationDate': self.valuation_dates(dates, n),
+        }).sort_values('ValuationDate', kind='stable')
+        table = self.rates.rename(columns={'Date': 'FxRateDate'})
+
+        merged = pd.merge_asof(rows, table, left_on='ValuationDate', right_on='FxRateDate',
+                               by='Currency', direction='backward')
+        missing = merged['RateToUSD'].isna()
+        if missing.any():
+            # Valued before the first rate of the currency: fall back to that first rate
+            first_rates = pd.merge_asof(rows[missing.to_numpy()], table, left_on='ValuationDate',
+                                        right_on='FxRateDate', by='Currency', direction='forward')
+            merged.loc[missing, ['FxRateDate', 'RateToUSD']] = first_rates[['FxRateDate', 'RateToUSD']].to_numpy()
+
+        merged = merged.sort_values('_row')
+        rate = merged['RateToUSD'].astype(float).fillna(1.0).to_numpy()
+        return pd.DataFrame({
+            'AmountUSD': amounts * rate,
+            'FxRate': rate,
+            'FxRateDate': pd.to_datetime(merged['FxRateDate'].to_numpy()),
+        })
@@ -0,0 +1,274 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from aiengine.feature_matrix import build_feature_matrix
+    from aiengine.inference_pipeline import InferencePipeline
+    from aiengine.model_registry import ModelRegistry, get_registry
+    from aiengine.pricing_model import REJECT_CLAIM_RATIO
+except ImportError:  # run as a script from aiengine/
+    from feature_matrix import build_feature_matrix
+    from inference_pipeline import InferencePipeline
+    from model_registry import ModelRegistry, get_registry
+    from pricing_model import REJECT_CLAIM_RATIO
+
+# Requests gathered into one model call: at most this many rows...
+DEFAULT_MAX_BATCH_SIZE = 64
+# ...waiting at most this long after the first one arrived
+DEFAULT_MAX_WAIT_MS = 2.0
+# Environment overrides for the process-wide dispatchers: INFERENCE_MAX_BATCH_SIZE
+# and INFERENCE_MAX_WAIT_MS for all of them, INFERENCE_RISK_MAX_WAIT_MS etc. for one
+ENV_PREFIX = 'INFERENCE'
+
+_STOP = object()
+
+
+class InferenceDispatcher:
+    """
+    Micro-batches concurrent single-row predictions into vectorized model calls.
+
+    Callers submit one submission dict and get a future. A worker thread
+    takes the first queued request, keeps collecting until max_batch_size
+    requests or max_wait_ms have passed, scores them with one score_batch
+    call and resolves every future with its row of the result. If the call
+    fails, every caller in the batch gets the exception.
+
+    With a lookup (e.g. risk_lookup), submissions whose prediction is
+    already cached are answered on submit, without queueing or waiting for
+    a batch.
+    """
+
+    def __init__(self, score_batch: Callable[[List[Dict]], List[Any]],
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, name: str = 'model',
+                 lookup: Optional[Callable[[Dict], Optional[Any]]] = None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.score_batch = score_batch
+        self.lookup = lookup
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'batches': 0, 'rows': 0, 'errors': 0, 'cache_hits': 0,
+            'largest_batch': 0, 'queue_wait_ms': 0.0, 'max_queue_wait_ms': 0.0, 'model_ms': 0.0,
+        }
+
+    def submit(self, item: Dict) -> Future:
+        """Queue one submission; the future resolves to its prediction"""
+        future = Future()
+        if self.lookup is not None:
+            try:
+                cached = self.lookup(item)
+            except Exception:
+                cached = None  # the batch call reports the error
+            if cached is not None:
+                with self._metrics_lock:
+                    self._metrics['cache_hits'] += 1
+                future.set_result(cached)
+                return future
+        self._ensure_worker()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def predict(self, item: Dict, timeout: Optional[float] = None) -> Any:
+        """Prediction for one submission, blocking until its batch is scored"""
+        return self.submit(item).result(timeout)
+
+    async def apredict(self, item: Dict) -> Any:
+        """Prediction for one submission, awaited from an async endpoint"""
+        return await asyncio.wrap_future(self.submit(item))
+
+    def metrics(self) -> Dict[str, Any]:
+        """Batch size, queue wait and model time so far"""
+        with self._metrics_lock:
+            m = dict(self._metrics)
+        batches = max(m['batches'], 1)
+        return {
+            'name': self.name,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'batches': m['batches'],
+            'rows': m['rows'],
+            'errors': m['errors'],
+            'cache_hits': m['cache_hits'],
+            'queued': self._queue.qsize(),
+            'avg_batch_size': m['rows'] / batches,
+            'largest_batch': m['largest_batch'],
+            'avg_queue_wait_ms': m['queue_wait_ms'] / max(m['rows'], 1),
+            'max_queue_wait_ms': m['max_queue_wait_ms'],
+            'avg_model_ms': m['model_ms'] / batches,
+        }
+
+    def close(self):
+        """Stop the worker after the queued requests are scored"""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(_STOP)
+            self._worker.join()
+        self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._start_lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name=f"{self.name}-dispatcher", daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            stopping = False
+            deadline = first[2] + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is _STOP:
+                    stopping = True
+                    break
+                batch.append(request)
+            self._score(batch)
+            if stopping:
+                return
+
+    def _score(self, batch: List):
+        started = time.perf_counter()
+        waits = [(started - enqueued) * 1000 for _, _, enqueued in batch]
+        try:
+            results = self.score_batch([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name} scorer returned {len(results)} results for {len(batch)} rows")
+            error = None
+        except Exception as e:
+            results, error = None, e
+        model_ms = (time.perf_counter() - started) * 1000
+
+        with self._metrics_lock:
+            m = self._metrics
+            m['batches'] += 1
+            m['rows'] += len(batch)
+            m['errors'] += error is not None
+            m['largest_batch'] = max(m['largest_batch'], len(batch))
+            m['queue_wait_ms'] += sum(waits)
+            m['max_queue_wait_ms'] = max(m['max_queue_wait_ms'], max(waits))
+            m['model_ms'] += model_ms
+
+        for i, (_, future, _) in enumerate(batch):
+            if future.set_running_or_notify_cancel():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[i])
+
+
+def risk_scorer(registry: ModelRegistry) -> Callable[[List[Dict]], List[Dict]]:
+    """Batch scorer returning predicted_risk and probabilities per submission"""
+    def score(submissions: List[Dict]) -> List[Dict]:
+        result = registry.get('risk').predict_batch(submissions)
+        labels = [column for column in result.columns if column != 'predicted_risk']
+        return [
+            {'predicted_risk': risk, 'probabilities': dict(zip(labels, row))}
+            for risk, row in zip(result['predicted_risk'].tolist(), result[labels].to_numpy().tolist())
+        ]
+    return score
+
+
+def pricing_scorer(registry: ModelRegistry) -> Callable[[List[Dict]], List[Dict]]:
+    """Batch scorer returning the suggested Premium and Decision per submission"""
+    def score(submissions: List[Dict]) -> List[Dict]:
+        return registry.get('pricing').suggest_batch(submissions).to_dict('records')
+    return score
+
+
+def analysis_scorer(registry: ModelRegistry) -> Callable[[List[Dict]], List[Dict]]:
+    """Batch scorer returning risk category, probabilities, premium and decision per submission"""
+    return InferencePipeline(registry).run
+
+
+def risk_lookup(registry: ModelRegistry) -> Callable[[Dict], Optional[Dict]]:
+    """risk_scorer's result for one submission when its probabilities are cached, else None"""
+    def lookup(submission: Dict) -> Optional[Dict]:
+        model = registry.get('risk')
+        probabilities = model.cached_proba_matrix(model.feature_matrix([submission]))
+        if probabilities is None:
+            return None
+        labels = [model.label_mapping[c] for c in model.classes_]
+        return {'predicted_risk': labels[int(probabilities[0].argmax())],
+                'probabilities': dict(zip(labels, probabilities[0].tolist()))}
+    return lookup
+
+
+def pricing_lookup(registry: ModelRegistry) -> Callable[[Dict], Optional[Dict]]:
+    """pricing_scorer's result for one submission when its premium is cached, else None"""
+    def lookup(submission: Dict) -> Optional[Dict]:
+        model = registry.get('pricing')
+        premiums = model.cached_matrix(build_feature_matrix([submission], model.feature_columns))
+        if premiums is None:
+            return None
+        claim_ratio = build_feature_matrix([submission], ['ClaimRatio'])[0, 0]
+        return {'Premium': float(premiums[0]), 'Decision': 'REJECT' if claim_ratio > REJECT_CLAIM_RATIO else 'ACCEPT'}
+    return lookup
+
+
+def analysis_lookup(registry: ModelRegistry) -> Callable[[Dict], Optional[Dict]]:
+    """analysis_scorer's result for one submission when both models' outputs are cached, else None"""
+    return InferencePipeline(registry).cached
+
+
+_dispatchers: Dict[str, InferenceDispatcher] = {}
+_dispatchers_lock = threading.Lock()
+
+
+def dispatcher_settings(name: str) -> Dict[str, Any]:
+    """max_batch_size and max_wait_ms of a process-wide dispatcher, from the environment or the defaults"""
+    def setting(key: str, default, parse):
+        for variable in (f"{ENV_PREFIX}_{name.upper()}_{key}", f"{ENV_PREFIX}_{key}"):
+            if os.environ.get(variable):
+                try:
+                    return parse(os.environ[variable])
+                except ValueError:
+                    raise ValueError(f"{variable} must be a number, got {os.environ[variable]!r}")
+        return default
+    return {'max_batch_size': setting('MAX_BATCH_SIZE', DEFAULT_MAX_BATCH_SIZE, int),
+            'max_wait_ms': setting('MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS, float)}
+
+
+def get_dispatcher(name: str, max_batch_size: Optional[int] = None,
+                   max_wait_ms: Optional[float] = None) -> InferenceDispatcher:
+    """
+    Process-wide dispatcher for 'risk', 'pricing' or combined 'analysis' scoring over the shared registry
+
+    Batching limits come from dispatcher_settings() when the dispatcher is
+    created; limits passed explicitly override those and also retune an
+    existing dispatcher, whose worker picks them up with its next batch.
+    """
+    scorers = {'risk': (risk_scorer, risk_lookup), 'pricing': (pricing_scorer, pricing_lookup),
+               'analysis': (analysis_scorer, analysis_lookup)}
+    with _dispatchers_lock:
+        if name not in _dispatchers:
+            scorer, lookup = scorers[name]
+            registry = get_registry()
+            _dispatchers[name] = InferenceDispatcher(scorer(registry), name=name, lookup=lookup(registry),
+                                                     **dispatcher_settings(name))
+        dispatcher = _dispatchers[name]
+        if max_batch_size is not None:
+            if max_batch_size < 1:
+                raise ValueError("max_batch_size must be at least 1")
+            dispatcher.max_batch_size = max_batch_size
+        if max_wait_ms is not None:
+            dispatcher.max_wait_ms = max_wait_ms
+        return dispatcher
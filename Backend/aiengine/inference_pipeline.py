@@ -0,0 +1,114 @@
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    from aiengine.feature_matrix import build_feature_matrix
+    from aiengine.model_registry import ModelRegistry, get_registry
+    from aiengine.pricing_model import REJECT_CLAIM_RATIO
+except ImportError:  # run as a script from aiengine/
+    from feature_matrix import build_feature_matrix
+    from model_registry import ModelRegistry, get_registry
+    from pricing_model import REJECT_CLAIM_RATIO
+
+
+class InferencePipeline:
+    """
+    Risk category and premium for submissions from one shared feature pass.
+
+    The input is checked once, one feature matrix is built over the union of
+    both models' feature columns (plus ClaimRatio for the decision) and each
+    model scores its columns of it in a single call, whether one submission
+    or thousands are passed. Models come from the registry, so hot reloads
+    and the prediction cache apply.
+    """
+
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        self.registry = registry or get_registry()
+
+    def score(self, submissions: Union[pd.DataFrame, List[Dict], Dict]) -> pd.DataFrame:
+        """
+        Score submissions given as a DataFrame, a list of dicts or one dict
+
+        Returns:
+            One row per submission with RiskCategory, SuggestedPremium,
+            PricingDecision and a probability column per risk level
+        """
+        records = self._validate(submissions)
+        risk = self.registry.get('risk')
+        pricing = self.registry.get('pricing')
+        if len(risk.feature_columns) == 0:
+            raise ValueError("Risk model has no feature columns. Retrain the model to save them.")
+
+        risk_X, pricing_X, claim_ratio = self._features(records, risk, pricing)
+        probabilities = risk.predict_proba_matrix(risk_X)
+        premiums = pricing.predict_matrix(pricing_X)
+
+        labels = [risk.label_mapping[c] for c in risk.classes_]
+        result = pd.DataFrame(probabilities, columns=labels,
+                              index=records.index if isinstance(records, pd.DataFrame) else None)
+        result['RiskCategory'] = np.asarray(labels, dtype=object)[probabilities.argmax(axis=1)]
+        result['SuggestedPremium'] = np.asarray(premiums, dtype=np.float64)
+        result['PricingDecision'] = np.where(claim_ratio > REJECT_CLAIM_RATIO, 'REJECT', 'ACCEPT')
+        return result
+
+    def cached(self, submission: Dict) -> Optional[Dict]:
+        """run() result for one submission when both models' outputs are cached, else None"""
+        risk = self.registry.get('risk')
+        pricing = self.registry.get('pricing')
+        if len(risk.feature_columns) == 0:
+            return None
+        risk_X, pricing_X, claim_ratio = self._features([submission], risk, pricing)
+        probabilities = risk.cached_proba_matrix(risk_X)
+        premiums = pricing.cached_matrix(pricing_X) if probabilities is not None else None
+        if premiums is None:
+            return None
+        labels = [risk.label_mapping[c] for c in risk.classes_]
+        return {
+            'RiskCategory': labels[int(probabilities[0].argmax())],
+            'RiskProbabilities': dict(zip(labels, probabilities[0].tolist())),
+            'SuggestedPremium': float(premiums[0]),
+            'Decision': 'REJECT' if claim_ratio[0] > REJECT_CLAIM_RATIO else 'ACCEPT',
+        }
+
+    def run(self, submissions: Union[List[Dict], Dict]) -> Union[List[Dict], Dict]:
+        """
+        Category, probabilities, premium and decision per submission
+
+        Returns a list of results for a list of submissions, one result for one submission.
+        """
+        result = self.score(submissions)
+        labels = [column for column in result.columns
+                  if column not in ('RiskCategory', 'SuggestedPremium', 'PricingDecision')]
+        records = [
+            {
+                'RiskCategory': category,
+                'RiskProbabilities': dict(zip(labels, probabilities)),
+                'SuggestedPremium': premium,
+                'Decision': decision,
+            }
+            for category, probabilities, premium, decision in zip(
+                result['RiskCategory'].tolist(), result[labels].to_numpy().tolist(),
+                result['SuggestedPremium'].tolist(), result['PricingDecision'].tolist())
+        ]
+        return records[0] if isinstance(submissions, dict) else records
+
+    @staticmethod
+    def _features(records, risk, pricing):
+        # One matrix over both models' columns, sliced per model
+        columns = list(dict.fromkeys(risk.feature_columns + pricing.feature_columns + ['ClaimRatio']))
+        position = {column: i for i, column in enumerate(columns)}
+        X = build_feature_matrix(records, columns)
+        return (X[:, [position[c] for c in risk.feature_columns]],
+                X[:, [position[c] for c in pricing.feature_columns]], X[:, position['ClaimRatio']])
+
+    @staticmethod
+    def _validate(submissions) -> Union[pd.DataFrame, List[Dict]]:
+        if isinstance(submissions, pd.DataFrame):
+            return submissions
+        if isinstance(submissions, dict):
+            return [submissions]
+        if isinstance(submissions, list) and all(isinstance(s, dict) for s in submissions):
+            return submissions
+        raise ValueError("Submissions must be a dict, a list of dicts or a DataFrame")
@@ -0,0 +1,115 @@
+import json
+from typing import Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Columns added by loss_trend_frame
+LOSS_TREND_COLUMNS = ['LossTrendSlope', 'LossVolatility', 'WorstLossYear']
+
+
+def _decode(value) -> Any:
+    try:
+        return json.loads(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _decode_all(values) -> List[Any]:
+    """Decode many JSON arrays with one json.loads call, falling back to one call per value"""
+    texts = [str(value).strip() for value in values]
+    if all(text.startswith('[') and text.endswith(']') for text in texts):
+        try:
+            decoded = json.loads('[' + ','.join(texts) + ']')
+            if len(decoded) == len(texts):
+                return decoded
+        except ValueError:
+            pass
+    return [_decode(text) for text in texts]
+
+
+def parse_loss_history(values: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flatten a LossHistory column into loss records, parsing each distinct JSON value once
+
+    Returns:
+        Row position, year and amount of every loss record
+    """
+    codes, uniques = pd.factorize(pd.Series(values).reset_index(drop=True))
+
+    # Loss records of the distinct values; records without a numeric year are skipped
+    lists = [losses if isinstance(losses, list) else [] for losses in _decode_all(uniques)]
+    records = [loss if isinstance(loss, dict) else {} for losses in lists for loss in losses]
+    record_years = pd.to_numeric(pd.Series([loss.get('year') for loss in records], dtype=object),
+                                 errors='coerce').to_numpy(dtype=np.float64)
+    record_amounts = pd.to_numeric(pd.Series([loss.get('amount') for loss in records], dtype=object),
+                                   errors='coerce').to_numpy(dtype=np.float64)
+    valid = ~np.isnan(record_years)
+    owners = np.repeat(np.arange(len(lists)), [len(losses) for losses in lists])[valid]
+    counts = np.bincount(owners, minlength=len(lists)).astype(np.int64)
+    unique_years = record_years[valid].astype(np.int64)
+    unique_amounts = np.nan_to_num(record_amounts[valid])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])) if len(counts) else counts
+
+    # Expand the distinct values' records to every row using them (missing values have code -1)
+    row_counts = np.where(codes >= 0, counts[np.maximum(codes, 0)] if len(counts) else 0, 0)
+    rows = np.repeat(np.arange(len(codes)), row_counts)
+    within = np.arange(len(rows)) - np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+    positions = starts[codes[rows]] + within if len(rows) else np.zeros(0, dtype=np.int64)
+
+    return rows, unique_years[positions], unique_amounts[positions]
+
+
+def loss_trend_features(rows: np.ndarray, years: np.ndarray, amounts: np.ndarray, n_rows: int) -> pd.DataFrame:
+    """
+    Trend features per row from long-format loss records, with grouped least squares
+
+    Losses are first totalled per row and year. For rows with two or more
+    loss years, LossTrendSlope is the least-squares change in annual loss per
+    year divided by the mean annual loss (so +0.1 means losses grow by about
+    10% of their average each year) and LossVolatility is the coefficient of
+    variation of the annual losses. Both are 0 otherwise. WorstLossYear is
+    the year with the largest total loss (earliest on ties), 0 without losses.
+    """
+    # Annual totals per (row, year)
+    order = np.lexsort((years, rows))
+    rows, years, amounts = rows[order], years[order], amounts[order]
+    starts = np.flatnonzero(np.r_[True, (rows[1:] != rows[:-1]) | (years[1:] != years[:-1])]) \
+        if len(rows) else np.zeros(0, dtype=np.int64)
+    row_ids = rows[starts]
+    year_values = years[starts].astype(np.float64)
+    annual = np.add.reduceat(amounts, starts) if len(starts) else np.zeros(0)
+
+    # Centered sums per row, so slopes stay exact for calendar years
+    count = np.bincount(row_ids, minlength=n_rows).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_year = np.bincount(row_ids, year_values, minlength=n_rows) / count
+        mean_loss = np.bincount(row_ids, annual, minlength=n_rows) / count
+        dx = year_values - mean_year[row_ids]
+        dy = annual - mean_loss[row_ids]
+        sxx = np.bincount(row_ids, dx * dx, minlength=n_rows)
+        sxy = np.bincount(row_ids, dx * dy, minlength=n_rows)
+        syy = np.bincount(row_ids, dy * dy, minlength=n_rows)
+
+        trending = (count > 1) & (sxx > 0) & (mean_loss > 0)
+        slope = np.where(trending, sxy / sxx / mean_loss, 0.0)
+        volatility = np.where(trending, np.sqrt(syy / (count - 1)) / mean_loss, 0.0)
+
+    worst_year = np.zeros(n_rows, dtype=np.int64)
+    if len(row_ids):
+        # Largest annual loss first within each row, earliest year on ties
+        worst = np.lexsort((year_values, -annual, row_ids))
+        first = worst[np.r_[True, row_ids[worst][1:] != row_ids[worst][:-1]]]
+        worst_year[row_ids[first]] = year_values[first].astype(np.int64)
+
+    return pd.DataFrame({
+        'LossTrendSlope': slope,
+        'LossVolatility': volatility,
+        'WorstLossYear': worst_year,
+    })
+
+
+def loss_trend_frame(values: pd.Series) -> pd.DataFrame:
+    """LossTrendSlope, LossVolatility and WorstLossYear for every value of a LossHistory column"""
+    rows, years, amounts = parse_loss_history(values)
+    return loss_trend_features(rows, years, amounts, len(values))
@@ -0,0 +1,74 @@
+import os
+import sys
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """Total memory held by a DataFrame, including the strings of object columns"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MB, read from /proc (None where unsupported)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def downcast_integers(df: pd.DataFrame) -> pd.DataFrame:
+    """Shrink integer columns to the smallest type that holds their values"""
+    for col in df.select_dtypes(include=['int64', 'int32', 'int16']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+def downcast_floats(df: pd.DataFrame) -> pd.DataFrame:
+    """Store float64 columns as float32 only where every value survives the round trip"""
+    for col in df.select_dtypes(include=['float64']).columns:
+        values = df[col].to_numpy()
+        candidate = values.astype(np.float32)
+        if np.array_equal(candidate.astype(np.float64), values, equal_nan=True):
+            df[col] = candidate
+    return df
+
+
+def encode_low_cardinality_text(df: pd.DataFrame, max_unique_ratio: float = 0.5) -> pd.DataFrame:
+    """Dictionary-encode text columns with few distinct values as pandas categoricals"""
+    if len(df) == 0:
+        return df
+    for col in df.select_dtypes(include=['object']).columns:
+        try:
+            n_unique = df[col].nunique(dropna=False)
+        except TypeError:  # unhashable values such as lists
+            continue
+        if n_unique / len(df) <= max_unique_ratio:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def optimize_dtypes(df: pd.DataFrame, max_unique_ratio: float = 0.5) -> pd.DataFrame:
+    """Apply all lossless dtype reductions in place and return the frame"""
+    downcast_integers(df)
+    downcast_floats(df)
+    encode_low_cardinality_text(df, max_unique_ratio)
+    return df
@@ -0,0 +1,338 @@
+"""
+Memory-mapped, versioned model artifacts.
+
+An artifact is a small JSON manifest pointing at an immutable directory of
+.npy files holding the compiled forest's node arrays:
+
+    models/risk_model.json                           manifest, replaced atomically
+    models/versions/risk_model-<version>/*.npy       node arrays
+    models/versions/risk_model-<version>/manifest.json
+    models/versions/risk_model-<version>/estimator.joblib   optional, for retraining
+
+Loading memory-maps the arrays read-only instead of unpickling a forest, so
+every worker process serving the same version shares one page-cache copy.
+The manifest records the features, label mapping, training data hash and
+metrics, and is verified against the arrays when the artifact is loaded.
+
+Each save prunes the model's version directories down to the newest few,
+always keeping the one the live manifest points at.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+
+try:
+    from aiengine.forest_engine import CompiledForest
+except ImportError:  # run as a script from aiengine/
+    from forest_engine import CompiledForest
+
+ARTIFACT_FORMAT = 1
+ARTIFACT_EXTENSION = '.json'
+VERSIONS_DIR = 'versions'
+REQUIRED_ARRAYS = ('feature', 'threshold', 'children', 'values', 'roots')
+# Version directories kept per model after a save, besides the live one
+DEFAULT_KEEP_VERSIONS = 3
+
+
+def is_artifact_path(path: str) -> bool:
+    """Whether path names an artifact manifest rather than a legacy pickle"""
+    return path.endswith(ARTIFACT_EXTENSION)
+
+
+def data_hash(X, y, features: List[str]) -> str:
+    """Fingerprint of a training matrix, as the trees see it (float32 features)"""
+    digest = hashlib.sha256(','.join(features).encode())
+    digest.update(np.ascontiguousarray(X, dtype=np.float32).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def save_artifact(path: str, engine: CompiledForest, features: List[str],
+                  label_mapping: Optional[Dict] = None, feature_importances=None,
+                  metadata: Optional[Dict] = None, estimator=None,
+                  keep_versions: Optional[int] = DEFAULT_KEEP_VERSIONS) -> Dict:
+    """
+    Write the forest's arrays to a new version directory, then swap the manifest at path
+
+    Args:
+        path: Manifest path, e.g. models/risk_model.json
+        engine: Compiled forest to store
+        features: Feature columns in model input order
+        label_mapping: Class to risk label, for classifiers
+        feature_importances: Per-feature importances of the trained model
+        metadata: Training details (version, params, metrics, data hash)
+        estimator: The fitted sklearn model, kept for warm-start retraining;
+            serving never loads it
+        keep_versions: Newest version directories to keep; None keeps all
+
+    Returns:
+        The manifest written
+    """
+    if len(features) != engine.n_features:
+        raise ValueError(f"Forest expects {engine.n_features} features, got {len(features)} names")
+    metadata = dict(metadata or {})
+    version = metadata.get('version') or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    root = os.path.dirname(os.path.abspath(path))
+    stem = os.path.splitext(os.path.basename(path))[0]
+    directory = os.path.join(root, VERSIONS_DIR, f'{stem}-{version}')
+    os.makedirs(directory)
+
+    arrays = {}
+    for name, array in engine.arrays().items():
+        array = np.ascontiguousarray(array)
+        file = os.path.join(directory, f'{name}.npy')
+        np.save(file, array)
+        arrays[name] = {'file': f'{name}.npy', 'dtype': str(array.dtype), 'shape': list(array.shape),
+                        'sha256': _file_sha256(file)}
+
+    if estimator is not None:
+        joblib.dump(estimator, os.path.join(directory, 'estimator.joblib'))
+
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'version': version,
+        'kind': 'classifier' if engine.is_classifier else 'regressor',
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'arrays_dir': os.path.relpath(directory, root),
+        'arrays': arrays,
+        'n_trees': engine.n_trees,
+        'max_depth': engine.max_depth,
+        'n_features': engine.n_features,
+        'features': list(features),
+        # JSON keys are strings, so keep classes as they are in pairs
+        'label_mapping': [[_plain(c), label] for c, label in label_mapping.items()] if label_mapping else None,
+        'feature_importances': None if feature_importances is None else [float(v) for v in feature_importances],
+        'data_hash': metadata.get('data_hash'),
+        'metrics': metadata.get('cv_metrics', metadata.get('metrics', {})),
+        'metadata': metadata,
+        'estimator': 'estimator.joblib' if estimator is not None else None,
+    }
+    _write_json(os.path.join(directory, 'manifest.json'), manifest)
+    _write_json(path, manifest)
+    if keep_versions is not None:
+        prune_versions(path, keep_versions)
+    return manifest
+
+
+def prune_versions(path: str, keep: int = DEFAULT_KEEP_VERSIONS) -> List[str]:
+    """
+    Delete all but the newest keep version directories of the artifact at path
+
+    The directory the manifest at path points at is never deleted. Workers
+    still serving a deleted version keep their memory maps until they reload.
+
+    Returns:
+        The version directories removed
+    """
+    root = os.path.dirname(os.path.abspath(path))
+    stem = os.path.splitext(os.path.basename(path))[0]
+    versions_dir = os.path.join(root, VERSIONS_DIR)
+    if not os.path.isdir(versions_dir):
+        return []
+
+    live = None
+    if os.path.exists(path):
+        with open(path) as f:
+            live = os.path.normpath(os.path.join(root, json.load(f)['arrays_dir']))
+    directories = [os.path.join(versions_dir, name) for name in os.listdir(versions_dir)
+                   if name.startswith(f'{stem}-') and os.path.isdir(os.path.join(versions_dir, name))]
+    # Newest first, by when each version's manifest was written
+    directories.sort(key=_written_at, reverse=True)
+
+    removed = []
+    for directory in directories[max(keep, 0):]:
+        if os.path.normpath(directory) != live:
+            shutil.rmtree(directory, ignore_errors=True)
+            removed.append(directory)
+    return removed
+
+
+def load_artifact(path: str, kind: Optional[str] = None, verify: bool = True) -> Tuple[CompiledForest, Dict]:
+    """
+    Memory-map an artifact's forest and check it against its manifest
+
+    Raises ValueError when the manifest does not describe the arrays on disk:
+    unknown format, wrong kind, missing or altered files (checksums, with
+    verify), mismatched shapes or features, or out-of-range node links.
+
+    Returns:
+        The compiled forest over read-only mapped arrays, and the manifest
+    """
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"{path}: unsupported artifact format {manifest.get('format')!r}")
+    if kind is not None and manifest.get('kind') != kind:
+        raise ValueError(f"{path}: expected a {kind} artifact, found {manifest.get('kind')!r}")
+
+    directory = os.path.join(os.path.dirname(os.path.abspath(path)), manifest['arrays_dir'])
+    arrays = {}
+    for name, spec in manifest['arrays'].items():
+        file = os.path.join(directory, spec['file'])
+        if not os.path.exists(file):
+            raise ValueError(f"{path}: missing array file {file}")
+        if verify and _file_sha256(file) != spec['sha256']:
+            raise ValueError(f"{path}: {file} does not match its manifest checksum")
+        array = np.load(file, mmap_mode='r')
+        if str(array.dtype) != spec['dtype'] or list(array.shape) != spec['shape']:
+            raise ValueError(f"{path}: {name} is {array.dtype}{list(array.shape)}, "
+                             f"manifest says {spec['dtype']}{spec['shape']}")
+        arrays[name] = array
+
+    _check_manifest(path, manifest, arrays)
+    engine = CompiledForest.from_arrays(arrays, manifest['max_depth'], manifest['n_features'])
+    return engine, manifest
+
+
+def read_manifest(path: str) -> Dict:
+    """An artifact's manifest, without mapping its arrays"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_estimator(path: str):
+    """The sklearn model stored with an artifact, or None when it was saved without one"""
+    manifest = read_manifest(path)
+    if not manifest.get('estimator'):
+        return None
+    directory = os.path.join(os.path.dirname(os.path.abspath(path)), manifest['arrays_dir'])
+    return joblib.load(os.path.join(directory, manifest['estimator']))
+
+
+def label_mapping(manifest: Dict) -> Optional[Dict]:
+    """Class to label dict of a manifest, or None when it has none"""
+    pairs = manifest.get('label_mapping')
+    return {c: label for c, label in pairs} if pairs else None
+
+
+def _check_manifest(path: str, manifest: Dict, arrays: Dict[str, np.ndarray]):
+    missing = [name for name in REQUIRED_ARRAYS if name not in arrays]
+    if manifest['kind'] == 'classifier' and 'classes' not in arrays:
+        missing.append('classes')
+    if missing:
+        raise ValueError(f"{path}: manifest lacks arrays {missing}")
+    if not manifest['features'] or len(manifest['features']) != manifest['n_features']:
+        raise ValueError(f"{path}: {len(manifest['features'])} feature names for {manifest['n_features']} features")
+
+    n_nodes = len(arrays['values'])
+    slots = 2 * n_nodes
+    if any(len(arrays[name]) != slots for name in ('feature', 'threshold', 'children')):
+        raise ValueError(f"{path}: node arrays do not cover {n_nodes} nodes")
+    if len(arrays['roots']) != manifest['n_trees']:
+        raise ValueError(f"{path}: {len(arrays['roots'])} roots for {manifest['n_trees']} trees")
+    if n_nodes and (arrays['children'].min() < 0 or arrays['children'].max() >= slots
+                    or arrays['roots'].min() < 0 or arrays['roots'].max() >= n_nodes
+                    or arrays['feature'].min() < 0 or arrays['feature'].max() >= manifest['n_features']):
+        raise ValueError(f"{path}: node links out of range")
+
+    if manifest['kind'] == 'classifier':
+        classes = arrays['classes']
+        if arrays['values'].ndim != 2 or arrays['values'].shape[1] != len(classes):
+            raise ValueError(f"{path}: values do not have one column per class")
+        mapping = label_mapping(manifest)
+        if mapping is not None and any(_plain(c) not in mapping for c in classes):
+            raise ValueError(f"{path}: label mapping does not cover classes {classes.tolist()}")
+
+
+def _plain(value):
+    # numpy scalars to JSON-able Python values
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def artifact_lock(path: str):
+    """
+    Hold an exclusive lock on the artifact at path across processes
+
+    Workers converting or publishing the same artifact take turns, so one
+    never prunes a version directory another has written but not yet linked.
+    """
+    with open(f'{path}.lock', 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _written_at(directory: str) -> int:
+    manifest = os.path.join(directory, 'manifest.json')
+    return os.stat(manifest if os.path.exists(manifest) else directory).st_mtime_ns
+
+
+def _write_json(path: str, data: Dict):
+    # Write then rename, so readers and the registry never see a partial manifest;
+    # the staged name is per process so concurrent writers do not share it
+    staged = f'{path}.{os.getpid()}.tmp'
+    with open(staged, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(staged, path)
+
+
+def convert_pickle(model_class, source: str, target: str, features: Optional[List[str]] = None) -> Dict:
+    """
+    Convert a pickled RiskAnalyzer or PricingModel model into an artifact
+
+    Args:
+        model_class: RiskAnalyzer or PricingModel
+        source: Pickled model (.pkl)
+        target: Artifact manifest (.json)
+        features: Feature columns, for pickles saved without them
+
+    Returns:
+        The metadata stored with the artifact
+    """
+    model = model_class(model_path=source)
+    model.load_model()
+    if features:
+        model.feature_columns = list(features)
+    model.model_path = target
+    metadata = dict(model.metadata, converted_from=os.path.basename(source))
+    model.save_model(metadata=metadata)
+    return metadata
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Convert a pickled risk or pricing model into an artifact")
+    parser.add_argument('model', choices=['risk', 'pricing'])
+    parser.add_argument('source', help="Pickled model (.pkl)")
+    parser.add_argument('target', help="Artifact manifest (.json)")
+    parser.add_argument('--features', nargs='+', help="Feature columns, for pickles saved without them")
+    args = parser.parse_args(argv)
+
+    try:
+        from aiengine.pricing_model import PricingModel
+        from aiengine.risk_analyzer import RiskAnalyzer
+    except ImportError:  # run as a script from aiengine/
+        from pricing_model import PricingModel
+        from risk_analyzer import RiskAnalyzer
+
+    convert_pickle(RiskAnalyzer if args.model == 'risk' else PricingModel, args.source, args.target, args.features)
+    print(f"✅ Converted {args.source} to {args.target}")
+
+
+if __name__ == '__main__':
+    main()
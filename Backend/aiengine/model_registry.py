@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    from aiengine.model_artifacts import artifact_lock, convert_pickle
+    from aiengine.prediction_cache import PredictionCache
+    from aiengine.pricing_model import PricingModel
+    from aiengine.risk_analyzer import RiskAnalyzer
+except ImportError:  # run as a script from aiengine/
+    from model_artifacts import artifact_lock, convert_pickle
+    from prediction_cache import PredictionCache
+    from pricing_model import PricingModel
+    from risk_analyzer import RiskAnalyzer
+
+# Canonical model artifacts, independent of the working directory
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+MODEL_PATHS = {
+    'risk': os.path.join(MODELS_DIR, 'risk_model.json'),
+    'pricing': os.path.join(MODELS_DIR, 'pricing_model.json'),
+}
+# Shipped pickles the canonical artifacts are converted from when missing;
+# their estimators carry the feature names they were fitted with. To keep
+# serving from writing into the package, convert them at deploy time with
+# python -m aiengine.model_artifacts
+LEGACY_PICKLES = {
+    MODEL_PATHS['risk']: os.path.join(MODELS_DIR, 'risk_model.pkl'),
+    MODEL_PATHS['pricing']: os.path.join(MODELS_DIR, 'pricing_model.pkl'),
+}
+MODEL_LOADERS = {
+    'risk': RiskAnalyzer,
+    'pricing': PricingModel,
+}
+
+
+def _load(loader: Callable, path: str):
+    if not os.path.exists(path) and path in LEGACY_PICKLES:
+        # One worker converts; the others wait and load its artifact
+        with artifact_lock(path):
+            if not os.path.exists(path):
+                source = LEGACY_PICKLES[path]
+                convert_pickle(loader, source, path)
+                print(f"🔄 Converted {source} to {path}")
+    model = loader(model_path=path)
+    model.load_model()
+    return model
+
+
+class ModelRegistry:
+    """
+    Loads each model artifact once and shares it across the API.
+
+    Models are loaded on first use. When an artifact file changes, the next
+    lookup starts a background reload and keeps returning the current model
+    until the new one is ready, then swaps it in; requests already holding
+    the old model finish with it.
+
+    Models share one PredictionCache, keyed by model version and cleared of
+    a model's old entries when it is swapped.
+    """
+
+    def __init__(self, paths: Optional[Dict[str, str]] = None,
+                 loaders: Optional[Dict[str, Callable]] = None, check_interval: float = 1.0,
+                 cache: Optional[PredictionCache] = None):
+        self.paths = {name: os.path.abspath(path) for name, path in (paths or MODEL_PATHS).items()}
+        self.loaders = dict(MODEL_LOADERS, **(loaders or {}))
+        self.check_interval = check_interval
+        self.cache = cache if cache is not None else PredictionCache()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._reloads: Dict[str, threading.Thread] = {}
+
+    def get(self, name: str):
+        """Current model for name, loading it on first use"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return self.reload(name)
+        if self._changed(name, entry):
+            self._reload_in_background(name)
+        return entry['model']
+
+    def reload(self, name: str):
+        """Load the artifact now and swap it in"""
+        path = self.paths[name]
+        signature = self._signature(path)
+        model = _load(self.loaders[name], path)
+        with self._lock:
+            previous = self._entries.get(name)
+            version = previous['version'] + 1 if previous else 1
+            model.cache, model.cache_name, model.version = self.cache, name, version
+            self._entries[name] = {
+                'model': model,
+                'signature': signature,
+                'version': version,
+                'loaded_at': time.time(),
+                'checked': time.monotonic(),
+            }
+        self.cache.invalidate(name, keep_version=version)
+        print(f"📦 Registry loaded {name} model v{self._entries[name]['version']} from {path}")
+        return model
+
+    def wait(self, name: str, timeout: Optional[float] = None):
+        """Wait for a background reload of name to finish"""
+        thread = self._reloads.get(name)
+        if thread is not None:
+            thread.join(timeout)
+
+    def version(self, name: str) -> int:
+        """Number of times name has been loaded (0 before first use)"""
+        entry = self._entries.get(name)
+        return entry['version'] if entry else 0
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Path, version and load time of every model"""
+        return {
+            name: {
+                'path': path,
+                'loaded': name in self._entries,
+                'version': self.version(name),
+                'loaded_at': self._entries[name]['loaded_at'] if name in self._entries else None,
+            }
+            for name, path in self.paths.items()
+        }
+
+    def _changed(self, name: str, entry: Dict[str, Any]) -> bool:
+        now = time.monotonic()
+        if now - entry['checked'] < self.check_interval:
+            return False
+        entry['checked'] = now
+        return self._signature(self.paths[name]) != entry['signature']
+
+    def _reload_in_background(self, name: str):
+        with self._lock:
+            running = self._reloads.get(name)
+            if running is not None and running.is_alive():
+                return
+            thread = threading.Thread(target=self._safe_reload, args=(name,), daemon=True)
+            self._reloads[name] = thread
+        thread.start()
+
+    def _safe_reload(self, name: str):
+        try:
+            self.reload(name)
+        except Exception as e:
+            # Keep serving the current model, e.g. while the file is half written
+            print(f"⚠️ Could not reload {name} model: {e}")
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """Process-wide model registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
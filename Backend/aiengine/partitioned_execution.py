@@ -0,0 +1,105 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Pipeline instance of each worker process, installed by the pool initializer
+_worker_pipeline = None
+
+
+def _init_worker(pipeline) -> None:
+    global _worker_pipeline
+    _worker_pipeline = pipeline
+
+
+def write_shared_frame(df: pd.DataFrame, owned_by_caller: bool = True) -> Tuple[str, int]:
+    """
+    Serialize a DataFrame into a new shared memory block and return (name, size).
+
+    Blocks created in a worker are handed over to the parent, so they are
+    unregistered from the resource tracker to outlive the worker.
+    """
+    payload = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    block = shared_memory.SharedMemory(create=True, size=max(len(payload), 1))
+    block.buf[:len(payload)] = payload
+    name = block.name
+    if not owned_by_caller:
+        resource_tracker.unregister(block._name, 'shared_memory')
+    block.close()
+    return name, len(payload)
+
+
+def read_shared_frame(name: str, size: int, unlink: bool = False) -> pd.DataFrame:
+    """Load a DataFrame from a shared memory block, optionally freeing the block"""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        df = pickle.loads(block.buf[:size])
+    finally:
+        block.close()
+        if unlink:
+            block.unlink()
+    return df
+
+
+def _run_partition(name: str, size: int, methods: List[str], memory_optimized: bool) -> Tuple[str, int]:
+    """Worker entry point: run row-local stage methods on one partition"""
+    df = read_shared_frame(name, size)
+    for method in methods:
+        df = getattr(_worker_pipeline, method)(df, False)
+        if memory_optimized:
+            from aiengine.memory_utils import downcast_integers
+            df = downcast_integers(df)
+    return write_shared_frame(df, owned_by_caller=False)
+
+
+class PartitionedExecutor:
+    """
+    Runs row-local pipeline stages on DataFrame partitions across a process pool.
+
+    Partitions travel to and from the workers through shared memory blocks
+    instead of the pool's pipes. Partitions are contiguous and concatenated in
+    order, so the result is identical to running the stages serially.
+    """
+
+    def __init__(self, pipeline, n_jobs: int, min_partition_rows: int = 10_000):
+        self.n_jobs = n_jobs
+        self.min_partition_rows = min_partition_rows
+        self._pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(pipeline,))
+
+    def partition_count(self, n_rows: int) -> int:
+        return max(1, min(self.n_jobs, n_rows // max(self.min_partition_rows, 1)))
+
+    def run(self, df: pd.DataFrame, stages: List[Dict[str, Any]], memory_optimized: bool = False) -> pd.DataFrame:
+        """Apply consecutive row-local stages to every partition and reassemble the frame"""
+        methods = [stage['method'] for stage in stages]
+        bounds = np.array_split(np.arange(len(df)), self.partition_count(len(df)))
+
+        inputs = [write_shared_frame(df.iloc[rows[0]:rows[-1] + 1]) for rows in bounds if len(rows)]
+        try:
+            futures = [
+                self._pool.submit(_run_partition, name, size, methods, memory_optimized)
+                for name, size in inputs
+            ]
+            outputs, error = [], None
+            for future in futures:
+                try:
+                    outputs.append(future.result())
+                except Exception as e:
+                    error = error or e
+            # Read (and free) every output block even if another partition failed
+            parts = [read_shared_frame(name, size, unlink=True) for name, size in outputs]
+            if error is not None:
+                raise error
+        finally:
+            for name, _ in inputs:
+                block = shared_memory.SharedMemory(name=name)
+                block.close()
+                block.unlink()
+
+        return pd.concat(parts) if len(parts) > 1 else parts[0]
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
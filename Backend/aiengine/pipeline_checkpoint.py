@@ -0,0 +1,79 @@
+import hashlib
+import importlib.util
+import json
+import os
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+
+class StageCheckpointStore:
+    """
+    Columnar (Parquet) checkpoints for the stages of the cleaning pipeline.
+
+    A stage's key chains the key of the frame it receives with a fingerprint
+    of its declared config, so changing one stage's config invalidates that
+    stage and everything downstream while upstream checkpoints stay valid.
+    Checkpoints hold the whole frame a stage outputs, so the key covers the
+    whole input frame rather than only the columns the stage reads.
+
+    A store that cannot write (no Parquet engine, unwritable directory)
+    raises instead of silently running without checkpoints.
+    """
+
+    # Bump when stage logic changes so stale checkpoints are not reused
+    CHECKPOINT_VERSION = "1"
+
+    def __init__(self, directory: str):
+        if importlib.util.find_spec('pyarrow') is None and importlib.util.find_spec('fastparquet') is None:
+            raise ImportError("Stage checkpoints need a Parquet engine: install pyarrow")
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def input_key(self, df: pd.DataFrame) -> str:
+        """Fingerprint the raw input frame: values, index, column names and dtypes"""
+        digest = hashlib.sha256()
+        digest.update(self.CHECKPOINT_VERSION.encode())
+        digest.update(json.dumps([str(c) for c in df.columns]).encode())
+        digest.update(json.dumps([str(t) for t in df.dtypes]).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+        return digest.hexdigest()
+
+    def stage_key(self, input_key: str, stage_name: str, config: Dict[str, Any]) -> str:
+        """Derive a stage's key from its input key and its config values"""
+        digest = hashlib.sha256()
+        digest.update(input_key.encode())
+        digest.update(stage_name.encode())
+        digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def path(self, stage_name: str, key: str) -> str:
+        return os.path.join(self.directory, f"{stage_name}-{key[:20]}.parquet")
+
+    def exists(self, stage_name: str, key: str) -> bool:
+        return os.path.exists(self.path(stage_name, key))
+
+    def load(self, stage_name: str, key: str) -> pd.DataFrame:
+        return pd.read_parquet(self.path(stage_name, key))
+
+    def save(self, stage_name: str, key: str, df: pd.DataFrame) -> Optional[str]:
+        """
+        Write a stage output atomically
+
+        Returns None, with a warning, when the frame's values cannot be
+        represented in Parquet (e.g. mixed-type object columns); I/O errors
+        propagate.
+        """
+        path = self.path(stage_name, key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            df.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+            return path
+        except (ValueError, TypeError) as e:
+            # Arrow's conversion errors (ArrowInvalid, ArrowTypeError) subclass these
+            print(f"   ⚠️  Could not checkpoint stage {stage_name}: {e}")
+            return None
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,104 @@
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from aiengine.memory_utils import current_rss_mb, peak_rss_mb
+except ImportError:  # run as a script from aiengine/
+    from memory_utils import current_rss_mb, peak_rss_mb
+
+
+class PipelineProfile:
+    """
+    Per-stage profile of one clean_and_transform_data run: wall time, rows
+    in/out, process memory delta and cheap column statistics (null counts,
+    and min/max/mean of numeric columns) for the columns each stage touched.
+    """
+
+    def __init__(self, input_rows: int = 0):
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.input_rows = input_rows
+        self.stages: List[Dict[str, Any]] = []
+        self.memory_report: List[Dict[str, Any]] = []
+        self.checkpoint_report: List[Dict[str, Any]] = []
+        self.validation_results: Dict[str, int] = {}
+
+    def start_stage(self) -> Dict[str, Any]:
+        """Snapshot taken before a stage runs; pass it to end_stage"""
+        return {'started': time.perf_counter(), 'rss_mb': current_rss_mb()}
+
+    def end_stage(self, name: str, start: Dict[str, Any], df_in_rows: int, df_in_columns: List[str],
+                  df_out: pd.DataFrame, inputs: Optional[List[str]] = None,
+                  cache_hit: bool = False) -> Dict[str, Any]:
+        """Record a finished stage and return its entry"""
+        seconds = time.perf_counter() - start['started']
+        rss_after = current_rss_mb()
+        rss_delta = rss_after - start['rss_mb'] if rss_after is not None and start['rss_mb'] is not None else None
+
+        new_columns = [col for col in df_out.columns if col not in set(df_in_columns)]
+        if inputs is None or '*' in inputs:
+            touched = list(df_out.columns)
+        else:
+            touched = [col for col in inputs if col in df_out.columns] + new_columns
+
+        entry = {
+            'stage': name,
+            'seconds': round(seconds, 6),
+            'rows_in': df_in_rows,
+            'rows_out': len(df_out),
+            'rows_per_sec': round(df_in_rows / seconds, 1) if seconds > 0 else None,
+            'rss_delta_mb': round(rss_delta, 2) if rss_delta is not None else None,
+            'peak_rss_mb': peak_rss_mb(),
+            'new_columns': new_columns,
+            'column_stats': self.column_stats(df_out, touched),
+            'cache_hit': cache_hit,
+        }
+        self.stages.append(entry)
+        return entry
+
+    @staticmethod
+    def column_stats(df: pd.DataFrame, columns: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Null counts for all columns plus min/max/mean for numeric ones, one vectorized pass each"""
+        columns = list(dict.fromkeys(columns))
+        if not columns or len(df) == 0:
+            return {col: {'nulls': 0} for col in columns}
+
+        nulls = df[columns].isna().sum()
+        stats = {col: {'nulls': int(nulls[col])} for col in columns}
+
+        numeric = [col for col in columns
+                   if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+        if numeric:
+            values = df[numeric].astype(np.float64)
+            summary = pd.DataFrame({'min': values.min(), 'max': values.max(), 'mean': values.mean()})
+            for col, row in summary.iterrows():
+                stats[col].update({key: (float(val) if pd.notna(val) else None) for key, val in row.items()})
+        return stats
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(stage['seconds'] for stage in self.stages)
+
+    def stage(self, name: str) -> Optional[Dict[str, Any]]:
+        return next((entry for entry in self.stages if entry['stage'] == name), None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'started_at': self.started_at,
+            'input_rows': self.input_rows,
+            'total_seconds': round(self.total_seconds, 6),
+            'stages': self.stages,
+            'memory_report': self.memory_report,
+            'checkpoint_report': self.checkpoint_report,
+            'validation_results': self.validation_results,
+        }
+
+    def summary_line(self, entry: Dict[str, Any]) -> str:
+        """One-line verbose summary of a stage entry"""
+        memory = f" | RSS {entry['rss_delta_mb']:+.1f} MB" if entry['rss_delta_mb'] is not None else ""
+        source = " (checkpoint)" if entry['cache_hit'] else ""
+        return (f"   ⏱️  {entry['seconds']:.3f}s{source} | {entry['rows_in']} → {entry['rows_out']} rows"
+                f"{memory} | {len(entry['new_columns'])} new columns")
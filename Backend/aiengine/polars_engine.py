@@ -0,0 +1,430 @@
+from typing import Any, Callable, Dict, List, Tuple
+
+import pandas as pd
+import polars as pl
+
+try:
+    from aiengine.data_cleaning_pipeline import (
+        COMPLETENESS_FIELDS, EMPTY_VALUE_TOKENS, LARGE_RISK_BUSINESS_TYPES,
+        RISK_CATEGORY_BINS, RISK_CATEGORY_LABELS, RISK_SIZE_BINS, RISK_SIZE_LABELS,
+    )
+    from aiengine.loss_trends import LOSS_TREND_COLUMNS, loss_trend_frame
+except ImportError:  # run as a script from aiengine/
+    from data_cleaning_pipeline import (
+        COMPLETENESS_FIELDS, EMPTY_VALUE_TOKENS, LARGE_RISK_BUSINESS_TYPES,
+        RISK_CATEGORY_BINS, RISK_CATEGORY_LABELS, RISK_SIZE_BINS, RISK_SIZE_LABELS,
+    )
+    from loss_trends import LOSS_TREND_COLUMNS, loss_trend_frame
+
+# Columns whose pandas output is an ordered categorical from pd.cut
+CATEGORICAL_OUTPUTS = {'RiskSizeCategory': RISK_SIZE_LABELS, 'RiskCategory': RISK_CATEGORY_LABELS}
+
+
+class PolarsCleaningEngine:
+    """
+    Runs the stages of an EnhancedDataCleaningPipeline as one lazy Polars query.
+
+    Arithmetic, imputation, risk scoring, validation and quality flags are
+    Polars expressions, so the query optimizer and thread pool apply to them.
+    Parsing and mapping lookups (currency strings, geography, perils, business
+    types, loss history JSON) reuse the pipeline's own functions, called once
+    per distinct value inside the plan. Duplicate checks against a fitted
+    book and near-duplicate clustering use the pandas implementations on the
+    key columns. The result is a pandas frame matching the pandas engine's output.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    def run(self, df: pd.DataFrame, verbose: bool = True) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """Clean df and return the cleaned frame with the validation counts"""
+        pipeline = self.pipeline
+        lf = pl.from_pandas(self._arrow_safe(df)).lazy()
+
+        for stage in pipeline.stages:
+            if stage['name'] == 'quality_flags':
+                continue
+            if verbose:
+                print(f"\n{stage['description']}")
+            lf = getattr(self, stage['name'])(lf)
+
+        frame = lf.collect()
+        frame, validation_results = self._finish_validation(frame)
+        if verbose:
+            print(f"\n{pipeline.stages[-1]['description']}")
+        frame = self.quality_flags(frame.lazy()).collect()
+
+        cleaned = frame.to_pandas()
+        for col, labels in CATEGORICAL_OUTPUTS.items():
+            if col in cleaned.columns:
+                cleaned[col] = pd.Categorical(cleaned[col], categories=labels, ordered=True)
+        cleaned.index = df.index
+        return cleaned, validation_results
+
+    @staticmethod
+    def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+        """Render object columns mixing numbers and text as text; every stage parses them via str() anyway"""
+        mixed = [col for col in df.columns if df[col].dtype == object
+                 and pd.api.types.infer_dtype(df[col], skipna=True) in ('mixed', 'mixed-integer')]
+        if not mixed:
+            return df
+        df = df.copy()
+        for col in mixed:
+            df[col] = df[col].map(lambda value: value if pd.isna(value) else str(value))
+        return df
+
+    @staticmethod
+    def _per_value(func: Callable[[Any], Any], dtype) -> Callable[[pl.Series], pl.Series]:
+        """Batch function applying func once per distinct value of a column"""
+        def apply(series: pl.Series) -> pl.Series:
+            cache = {}
+            values = [cache[v] if v in cache else cache.setdefault(v, func(v)) for v in series.to_list()]
+            return pl.Series(series.name, values, dtype=dtype)
+        return apply
+
+    def _mapped(self, lf: pl.LazyFrame, columns: List[str], func: Callable[[Any], Any]) -> pl.LazyFrame:
+        present = [col for col in columns if col in lf.collect_schema().names()]
+        return lf.with_columns([
+            pl.col(col).map_batches(self._per_value(func, pl.String), return_dtype=pl.String) for col in present
+        ])
+
+    @staticmethod
+    def _number(schema, col: str, default: float) -> pl.Expr:
+        """Numeric column with NaN as null (Polars orders NaN above every number), or the pandas .get() default"""
+        if col not in schema:
+            return pl.lit(default, dtype=pl.Float64)
+        expr = pl.col(col)
+        return expr.fill_nan(None) if schema[col].is_float() else expr
+
+    @staticmethod
+    def _cut(expr: pl.Expr, bins: List[float], labels: List[str]) -> pl.Expr:
+        """pd.cut(..., include_lowest=True) as a when/then chain returning the label text"""
+        result = pl.when((expr >= bins[0]) & (expr <= bins[1])).then(pl.lit(labels[0]))
+        for low, high, label in zip(bins[1:-1], bins[2:], labels[1:]):
+            result = result.when((expr > low) & (expr <= high)).then(pl.lit(label))
+        return result.otherwise(pl.lit(None, dtype=pl.String))
+
+    # Stages, named as in EnhancedDataCleaningPipeline.stages
+
+    def currency(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        pipeline = self.pipeline
+        names = lf.collect_schema().names()
+        columns, rate_date_column = pipeline._currency_columns(names)
+        if not columns:
+            return lf
+        date_column = next((col for col in pipeline.fx_date_columns if col in names), None)
+
+        def converter(with_rate_date: bool) -> Callable[[pl.Series], pl.Series]:
+            def convert(batch: pl.Series) -> pl.Series:
+                values = pd.Series(batch.struct.field('value').to_list(), dtype=object)
+                dates = batch.struct.field('date').to_list() if date_column else None
+                amounts, currencies, _ = pipeline._parse_currency_column(values)
+                converted = pipeline.fx_rates.convert(amounts, currencies, dates)
+                fields = {'amount': converted['AmountUSD'].to_numpy()}
+                if with_rate_date:
+                    fields['rate_date'] = converted['FxRateDate'].to_numpy()
+                return pl.DataFrame(fields).to_struct(batch.name)
+            return convert
+
+        converted = []
+        for col in columns:
+            dtype = {'amount': pl.Float64}
+            if col == rate_date_column:
+                dtype['rate_date'] = pl.Datetime('ns')
+            fields = [pl.col(col).alias('value')] + ([pl.col(date_column).alias('date')] if date_column else [])
+            converted.append(pl.struct(fields).map_batches(converter(col == rate_date_column),
+                                                           return_dtype=pl.Struct(dtype)).alias(f'_fx_{col}'))
+
+        lf = lf.with_columns(converted)
+        extracted = [pl.col(f'_fx_{col}').struct.field('amount').alias(col) for col in columns]
+        if rate_date_column:
+            extracted.append(pl.col(f'_fx_{rate_date_column}').struct.field('rate_date').alias('FxRateDate'))
+        return lf.with_columns(extracted).drop([f'_fx_{col}' for col in columns])
+
+    def geography(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return self._mapped(lf, ['Geography', 'State', 'Country', 'Location', 'Territory'],
+                            self.pipeline.standardize_geography)
+
+    def perils(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return self._mapped(lf, ['Peril', 'Perils', 'PerilsCovered', 'Coverage', 'Risk'],
+                            self.pipeline.standardize_peril)
+
+    def business_types(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return self._mapped(lf, ['BusinessType', 'Occupation', 'Industry', 'Sector', 'Business'],
+                            self.pipeline.standardize_business_type)
+
+    def missing_values(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        pipeline = self.pipeline
+        schema = lf.collect_schema()
+        lf = lf.with_columns([pl.col(col).fill_null(pl.lit(value))
+                              for col, value in pipeline.missing_value_defaults.items() if col in schema])
+
+        # Small batches can arrive with all-missing numeric columns typed as text
+        imputer = pipeline._fitted_imputer()
+        schema = lf.collect_schema()
+        if imputer is not None:
+            lf = lf.with_columns([
+                (pl.col(col).cast(pl.String).str.strip_chars() if schema[col] == pl.String else pl.col(col))
+                .cast(pl.Float64, strict=False)
+                for col in imputer.global_medians if col in schema and not schema[col].is_numeric()
+            ])
+            schema = lf.collect_schema()
+
+        # Integer columns cannot hold gaps in pandas, so only float columns are imputed
+        targets = [col for col, dtype in schema.items() if dtype.is_float()]
+        fills: Dict[str, List[pl.Expr]] = {col: [] for col in targets}
+
+        if imputer is None:
+            # Same hierarchy as SegmentImputer, learned from this batch with window expressions
+            keys = [col for col in pipeline.imputation_segments if col in schema]
+            for depth in range(len(keys), 0, -1):
+                group = keys[:depth]
+                for col in targets:
+                    fills[col].append(
+                        pl.when(pl.col(col).count().over(group) >= pipeline.imputation_min_segment_size)
+                        .then(pl.col(col).median().over(group))
+                    )
+        else:
+            for level in imputer.levels:
+                if not all(key in schema for key in level['columns']):
+                    continue
+                segment = pl.concat_str([pl.col(key).cast(pl.String) for key in level['columns']], separator='\x1f')
+                segment_keys = ['\x1f'.join(key) for key in level['keys']]
+                for col in targets:
+                    mapping = {key: value for key, value in zip(segment_keys, level['medians'].get(col, []))
+                               if value is not None}
+                    if mapping:
+                        fills[col].append(segment.replace_strict(mapping, default=None, return_dtype=pl.Float64))
+
+        for col in targets:
+            if imputer is not None and col in imputer.global_medians:
+                fills[col].append(pl.lit(imputer.global_medians[col], dtype=pl.Float64))
+            else:
+                fills[col].append(pl.col(col).median())
+
+        return lf.with_columns([
+            pl.coalesce([pl.col(col)] + fills[col]).cast(schema[col]).alias(col) for col in targets
+        ])
+
+    def features(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        pipeline = self.pipeline
+        schema = lf.collect_schema()
+        has = schema.names()
+        sum_insured = pl.col('SumInsured')
+
+        if 'PastPremium' in has and 'SumInsured' in has:
+            lf = lf.with_columns(pl.when(sum_insured > 0).then(pl.col('PastPremium') / sum_insured)
+                                 .otherwise(0.0).alias('PremiumRate'))
+        if 'LossHistory' in has:
+            history = pl.col('LossHistory')
+            lf = lf.with_columns(
+                history.map_batches(self._per_value(pipeline.calculate_loss_frequency, pl.Int64),
+                                    return_dtype=pl.Int64).alias('LossFrequency'),
+                history.map_batches(self._per_value(pipeline.calculate_avg_annual_loss, pl.Float64),
+                                    return_dtype=pl.Float64).alias('AvgAnnualLoss'),
+            )
+            if 'SumInsured' in has:
+                lf = lf.with_columns(pl.when(sum_insured > 0).then(pl.col('AvgAnnualLoss') / sum_insured)
+                                     .otherwise(0.0).alias('LossSeverity'))
+        if 'SumInsured' in has:
+            lf = lf.with_columns(self._cut(self._number(schema, 'SumInsured', 0.0).cast(pl.Float64),
+                                           RISK_SIZE_BINS, RISK_SIZE_LABELS).alias('RiskSizeCategory'))
+
+        schema = lf.collect_schema()
+        if 'PremiumRate' in schema and 'ClaimRatio' in schema:
+            lf = lf.with_columns(pl.when(pl.col('ClaimRatio') > 0)
+                                 .then(pl.col('PremiumRate') / pl.col('ClaimRatio'))
+                                 .otherwise(1.0).alias('PremiumAdequacy'))
+
+        filled = []
+        for field in [f for f in COMPLETENESS_FIELDS if f in schema]:
+            is_filled = pl.col(field).is_not_null() & ~pl.col(field).cast(pl.String).str.to_lowercase().is_in(
+                EMPTY_VALUE_TOKENS)
+            if schema[field].is_float():
+                is_filled = is_filled & ~pl.col(field).is_nan()
+            filled.append(is_filled.fill_null(False).cast(pl.Int32))
+        completeness = pl.sum_horizontal(filled) / len(COMPLETENESS_FIELDS) if filled else pl.lit(0.0)
+        lf = lf.with_columns(completeness.cast(pl.Float64).alias('DataCompletenessScore'))
+
+        if 'Retention' in has and 'SumInsured' in has:
+            lf = lf.with_columns(pl.when(sum_insured > 0).then(pl.col('Retention') / sum_insured)
+                                 .otherwise(0.0).alias('RetentionRatio'))
+
+        return lf.with_columns([pl.col(col).clip(0, 1) for col in ['LossRatio', 'ESGScore', 'CatastropheExposure']
+                                if col in has])
+
+    def loss_trends(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        if 'LossHistory' not in lf.collect_schema().names():
+            return lf
+
+        def trends(series: pl.Series) -> pl.Series:
+            return pl.from_pandas(loss_trend_frame(pd.Series(series.to_list(), dtype=object))).to_struct(series.name)
+
+        dtype = pl.Struct({'LossTrendSlope': pl.Float64, 'LossVolatility': pl.Float64, 'WorstLossYear': pl.Int64})
+        lf = lf.with_columns(pl.col('LossHistory').map_batches(trends, return_dtype=dtype).alias('_loss_trends'))
+        return lf.with_columns([pl.col('_loss_trends').struct.field(col) for col in LOSS_TREND_COLUMNS]) \
+            .drop('_loss_trends')
+
+    def risk_scores(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        pipeline = self.pipeline
+        schema = lf.collect_schema()
+
+        def score(col: str, default: str, func: Callable[[Any], float]) -> pl.Expr:
+            source = pl.col(col) if col in schema else pl.lit(default, dtype=pl.String)
+            return source.map_batches(self._per_value(func, pl.Float64), return_dtype=pl.Float64)
+
+        lf = lf.with_columns(
+            score('State', 'Unknown', pipeline.calculate_geo_risk_score).alias('GeographicRiskScore'),
+            score('BusinessType', 'Other', pipeline.calculate_business_risk_score).alias('BusinessTypeRiskScore'),
+            score('Peril', 'Unknown', pipeline.calculate_peril_risk_score).alias('PerilRiskScore'),
+        )
+
+        def column(col: str, default: float) -> pl.Expr:
+            return pl.col(col) if col in schema else pl.lit(default, dtype=pl.Float64)
+
+        lf = lf.with_columns((
+            pl.col('GeographicRiskScore') * 0.20 +
+            pl.col('BusinessTypeRiskScore') * 0.25 +
+            pl.col('PerilRiskScore') * 0.20 +
+            column('LossSeverity', 0) * 50 * 0.10 +
+            column('LossFrequency', 0) * 0.05 +
+            column('LossRatio', 0) * 0.10 +
+            (1 - column('ESGScore', 0.5)) * 0.05 +
+            column('CatastropheExposure', 0.5) * 0.05
+        ).round(2).alias('CombinedRiskScore'))
+
+        combined = pl.col('CombinedRiskScore')
+        bounds = pipeline.fitted_state.get('risk_score_bounds') if pipeline.fitted_state else None
+        if bounds is not None:
+            score_range = bounds['max'] - bounds['min']
+            if score_range > 0:
+                normalized = ((combined - bounds['min']) / score_range * 10).clip(0, 10).round(2)
+            else:
+                normalized = pl.lit(5.0)
+        else:
+            normalized = (pl.when(combined.max() > 0)
+                          .then(((combined - combined.min()) / (combined.max() - combined.min()) * 10).round(2))
+                          .otherwise(5.0))
+        lf = lf.with_columns(normalized.cast(pl.Float64).alias('NormalizedRiskScore'))
+
+        return lf.with_columns(self._cut(pl.col('NormalizedRiskScore').fill_nan(None), RISK_CATEGORY_BINS,
+                                         RISK_CATEGORY_LABELS).alias('RiskCategory'))
+
+    def validation(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        """Negative amounts and exact duplicates; counts are taken in _finish_validation"""
+        pipeline = self.pipeline
+        schema = lf.collect_schema()
+
+        currency_cols = [col for col in ['SumInsured', 'PastPremium', 'Retention', 'AvgAnnualLoss'] if col in schema]
+        lf = lf.with_columns([(pl.col(col) < 0).fill_null(False).alias(f'_negative_{col}') for col in currency_cols])
+        lf = lf.with_columns([pl.when(pl.col(col) < 0).then(0).otherwise(pl.col(col)).cast(schema[col]).alias(col)
+                              for col in currency_cols])
+
+        key_columns = [col for col in pipeline.duplicate_key_columns if col in schema]
+        if len(key_columns) >= 3:
+            lf = lf.with_columns((~pl.struct(key_columns).is_first_distinct()).alias('_duplicate'))
+        return lf
+
+    def _finish_validation(self, frame: pl.DataFrame) -> Tuple[pl.DataFrame, Dict[str, int]]:
+        """Book-level duplicate checks that need pandas, duplicate flags and the validation counts"""
+        pipeline = self.pipeline
+        names = frame.columns
+        negative = [col for col in names if col.startswith('_negative_')]
+        results = {
+            'negative_values_fixed': int(sum(frame[col].sum() for col in negative)),
+            'extreme_ratios_flagged': 0,
+            'duplicates_found': 0,
+            'low_quality_records': 0,
+            'data_anomalies': 0,
+        }
+        frame = frame.drop(negative)
+
+        if 'PremiumRate' in names:
+            rate = frame['PremiumRate'].fill_nan(None)
+            results['extreme_ratios_flagged'] = int(((rate > 0.5) | (rate < 0)).sum())
+
+        if '_duplicate' in names:
+            key_columns = [col for col in pipeline.duplicate_key_columns if col in names]
+            is_duplicate = frame['_duplicate'].to_numpy().copy()
+            frame = frame.drop('_duplicate')
+
+            extra = key_columns + [pipeline.record_id_column, 'Cedant', 'Insured', 'SumInsured']
+            keys = frame.select(list(dict.fromkeys(col for col in extra if col in frame.columns))).to_pandas()
+            if pipeline.fitted_state:
+                is_duplicate |= pipeline._matches_fitted_duplicate_keys(keys, key_columns).to_numpy()
+            if pipeline.near_duplicate_settings is not None:
+                clusters = pipeline.find_near_duplicates(keys).set_index('RecordIndex')
+                frame = frame.with_columns(
+                    pl.Series('DuplicateClusterID', clusters['ClusterID'].reindex(keys.index).to_numpy()),
+                    pl.Series('DuplicateSimilarity', clusters['Similarity'].reindex(keys.index).to_numpy()),
+                )
+                representatives = clusters['IsRepresentative'].astype(bool)
+                is_duplicate |= keys.index.isin(representatives.index[~representatives.to_numpy()])
+
+            results['duplicates_found'] = int(is_duplicate.sum())
+            if results['duplicates_found'] > 0:
+                frame = frame.with_columns(pl.Series('IsDuplicate', is_duplicate))
+
+        if 'DataCompletenessScore' in names:
+            results['low_quality_records'] = int((frame['DataCompletenessScore'].fill_nan(None) < 0.5).sum())
+
+        if 'SumInsured' in names and 'PastPremium' in names:
+            sum_insured = frame['SumInsured'].fill_nan(None)
+            premium = frame['PastPremium'].fill_nan(None)
+            results['data_anomalies'] = int(((sum_insured > 100_000_000) & (premium < 10_000)).sum() +
+                                            ((sum_insured == 0) & (premium > 0)).sum())
+        return frame, results
+
+    def quality_flags(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        """QualityFlags and ValidationSummary as in create_quality_flags and create_validation_summary"""
+        schema = lf.collect_schema()
+        sum_insured = self._number(schema, 'SumInsured', 0.0)
+        premium_rate = self._number(schema, 'PremiumRate', 0.0)
+        risk_score = self._number(schema, 'NormalizedRiskScore', 0.0)
+        completeness = self._number(schema, 'DataCompletenessScore', 0.0)
+
+        def text_in(col: str, values: List[str]) -> pl.Expr:
+            # Missing text is NaN in pandas, whose str() is 'nan'
+            if col not in schema:
+                return pl.lit('' in values)
+            return pl.col(col).cast(pl.String).str.to_lowercase().is_in(values).fill_null('nan' in values)
+
+        no_sum_insured = sum_insured.is_null() | (sum_insured == 0) if 'SumInsured' in schema else pl.lit(True)
+        if 'BusinessType' in schema:
+            usual_business = pl.col('BusinessType').is_in(LARGE_RISK_BUSINESS_TYPES).fill_null(False)
+        else:
+            usual_business = pl.lit(False)
+        duplicate = pl.col('IsDuplicate').fill_null(False) if 'IsDuplicate' in schema else pl.lit(False)
+
+        conditions = [
+            ('NO_SUM_INSURED', no_sum_insured),
+            ('NO_PERIL', text_in('Peril', ['unknown', 'nan', ''])),
+            ('NO_GEOGRAPHY', text_in('Geography', ['unknown', 'unknown location', 'nan', ''])),
+            ('HIGH_RISK', risk_score > 8.0),
+            ('HIGH_PREMIUM_RATE', premium_rate > 0.2),
+            ('LOW_PREMIUM_RATE', (premium_rate < 0.001) & (sum_insured > 0)),
+            ('LOW_COMPLETENESS', completeness < 0.5),
+            ('DUPLICATE', duplicate),
+            ('UNUSUAL_SIZE_FOR_BUSINESS', (sum_insured > 500_000_000) & ~usual_business),
+        ]
+        flags = pl.concat_str([pl.when(condition.fill_null(False)).then(pl.lit(flag))
+                               for flag, condition in conditions], separator='|', ignore_nulls=True)
+
+        summary_risk = self._number(schema, 'NormalizedRiskScore', 5.0)
+        summary_premium = self._number(schema, 'PastPremium', 0.0)
+        summary = pl.concat_str([
+            pl.when(completeness >= 0.8).then(pl.lit('High Quality Data'))
+            .when(completeness >= 0.5).then(pl.lit('Moderate Quality Data'))
+            .otherwise(pl.lit('Low Quality Data')),
+            pl.when(summary_risk >= 8).then(pl.lit('Very High Risk'))
+            .when(summary_risk >= 6).then(pl.lit('High Risk'))
+            .when(summary_risk >= 4).then(pl.lit('Medium Risk'))
+            .otherwise(pl.lit('Low Risk')),
+            pl.when((sum_insured > 0) & (summary_premium > 0)).then(pl.lit('Financial Data Available'))
+            .otherwise(pl.lit('Limited Financial Data')),
+        ], separator=' | ')
+
+        return lf.with_columns(
+            pl.when(flags.is_null() | (flags == '')).then(pl.lit('CLEAN')).otherwise(flags).alias('QualityFlags'),
+            summary.alias('ValidationSummary'),
+        )
@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+# Default size and lifetime of cached predictions
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL_SECONDS = 600.0
+# Larger matrices (book scoring) bypass the cache instead of flushing it
+DEFAULT_MAX_BATCH_ROWS = 256
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of per-row model outputs with a time-to-live.
+
+    Entries are keyed by model name, model version and the bytes of the
+    canonical feature vector (float64, with -0.0 folded into 0.0), so a
+    reloaded model never sees its predecessor's results; the registry also
+    drops them with invalidate() when it swaps models.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_batch_rows: int = DEFAULT_MAX_BATCH_ROWS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_batch_rows = max_batch_rows
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def lookup(self, name: str, version: int, X: np.ndarray,
+               compute: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        Model outputs for every row of X, computing only the uncached rows
+
+        Args:
+            name, version: Model the outputs belong to
+            X: Feature matrix, one row per submission
+            compute: Scores a feature matrix, one output per row
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) > self.max_batch_rows:
+            return compute(X)
+
+        X, keys = self._keys(name, version, X)
+        now = time.monotonic()
+        with self._lock:
+            values = [self._get(key, now) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+
+        if missing:
+            computed = compute(X[missing])
+            expires = time.monotonic() + self.ttl_seconds
+            with self._lock:
+                for i, value in zip(missing, computed):
+                    value = value.copy() if isinstance(value, np.ndarray) else value
+                    values[i] = value
+                    self._put(keys[i], value, expires)
+        return np.array(values)
+
+    def peek(self, name: str, version: int, X: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Cached outputs for every row of X, or None unless all of them are cached
+
+        Lets callers answer repeated requests without queueing them for the
+        model. Only hits are counted; a miss is counted by the lookup that
+        computes the rows.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) > self.max_batch_rows:
+            return None
+        _, keys = self._keys(name, version, X)
+        now = time.monotonic()
+        with self._lock:
+            entries = [self._entries.get(key) for key in keys]
+            if any(entry is None or entry[1] <= now for entry in entries):
+                return None
+            for key in keys:
+                self._entries.move_to_end(key)
+            self._counters['hits'] += len(keys)
+        return np.array([value for value, _ in entries])
+
+    def invalidate(self, name: Optional[str] = None, keep_version: Optional[int] = None):
+        """Drop the entries of a model (all models by default), except those of keep_version"""
+        with self._lock:
+            stale = [key for key in self._entries
+                     if (name is None or key[0] == name) and key[1] != keep_version]
+            for key in stale:
+                del self._entries[key]
+            self._counters['invalidations'] += len(stale)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, evictions and size"""
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = counters['hits'] + counters['misses']
+        return dict(counters, hit_rate=counters['hits'] / lookups if lookups else 0.0, size=size,
+                    max_entries=self.max_entries, ttl_seconds=self.ttl_seconds)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _keys(name: str, version: int, X: np.ndarray):
+        # Canonical float64 rows, with -0.0 folded into 0.0
+        X = np.ascontiguousarray(X) + 0.0
+        return X, [(name, version, row.tobytes()) for row in X]
+
+    def _get(self, key, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            self._counters['misses'] += 1
+            return None
+        value, expires = entry
+        if expires <= now:
+            del self._entries[key]
+            self._counters['expirations'] += 1
+            self._counters['misses'] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._counters['hits'] += 1
+        return value
+
+    def _put(self, key, value, expires: float):
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
@@ -5,6 +6,33 @@ from sklearn.metrics import mean_absolute_error, r2_score
 import joblib
 import os
 
+try:
+    from aiengine.feature_matrix import build_feature_matrix
+    from aiengine.forest_engine import compile_forest
+    from aiengine.model_artifacts import is_artifact_path, load_artifact, save_artifact
+except ImportError:  # run as a script from aiengine/
+    from feature_matrix import build_feature_matrix
+    from forest_engine import compile_forest
+    from model_artifacts import is_artifact_path, load_artifact, save_artifact
+
+# Features of models saved before the feature list was stored with the model
+LEGACY_FEATURES = [
+    "SumInsured", "ClaimRatio", "LossFrequency",
+    "LossSeverity", "PremiumRate", "NormalizedRiskScore"
+]
+# Candidate training features, used when present in the data
+PRICING_FEATURES = LEGACY_FEATURES + ["LossTrendSlope", "LossVolatility"]
+# Premium range reported when quantiles are requested without a list
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+# Submissions with a claim ratio above this are rejected
+REJECT_CLAIM_RATIO = 0.8
+
+
+def quantile_labels(quantiles) -> list:
+    """Column names of premium quantiles: 0.1 -> P10"""
+    return [f"P{q * 100:g}" for q in quantiles]
+
+
 class PricingModel:
     """
     Premium prediction model.
@@ -15,14 +43,17 @@ class PricingModel:
     def __init__(self, model_path: str = "models/pricing_model.pkl"):
         self.model_path = model_path
         self.model = None
+        self.engine = None  # Compiled forest used for inference
+        # Set by the model registry to share cached predictions
+        self.cache = None
+        self.cache_name = "pricing"
+        self.version = 0
+        self.feature_columns = list(LEGACY_FEATURES)
+        self.metadata = {}  # Training run details saved with the artifact
 
     def train(self, df: pd.DataFrame, target_col: str = "PastPremium") -> None:
         """Train a regression model on cleaned features."""
-        features = [
-            "SumInsured", "ClaimRatio", "LossFrequency", "LossSeverity",
-            "PremiumRate", "NormalizedRiskScore"
-        ]
-        features = [f for f in features if f in df.columns]
+        features = [f for f in PRICING_FEATURES if f in df.columns]
 
         if not features:
             raise ValueError("No valid features found in the dataframe!")
@@ -38,6 +69,9 @@ class PricingModel:
         # RandomForest regressor
         self.model = RandomForestRegressor(n_estimators=100, random_state=42)
         self.model.fit(X_train, y_train)
+        self.engine = compile_forest(self.model)
+        if self.cache is not None:
+            self.cache.invalidate(self.cache_name)
 
         # Evaluate
         preds = self.model.predict(X_test)
@@ -45,63 +79,158 @@ class PricingModel:
         print(f"MAE: {mean_absolute_error(y_test, preds):.2f}")
         print(f"R²: {r2_score(y_test, preds):.2f}")
 
-        # Save model
-        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-        joblib.dump(self.model, self.model_path)
+        # Save model with its feature columns
+        self.feature_columns = features
+        self.save_model()
         print(f"✅ Model saved to {self.model_path}")
 
+    @property
+    def is_loaded(self) -> bool:
+        return self.model is not None or self.engine is not None
+
+    def save_model(self, metadata: dict = None):
+        """Save the trained model and feature columns, with optional training metadata"""
+        if not self.is_loaded:
+            raise ValueError("No model to save. Train the model first.")
+
+        if is_artifact_path(self.model_path):
+            engine = self.engine if self.engine is not None else compile_forest(self.model)
+            if engine is None:
+                raise ValueError("Only random forest models can be saved as artifacts")
+            importances = getattr(self.model, "feature_importances_", None)
+            save_artifact(self.model_path, engine, self.feature_columns,
+                          feature_importances=importances, metadata=metadata, estimator=self.model)
+            return
+
+        if self.model is None:
+            raise ValueError("Only the compiled forest is loaded; save it to an artifact (.json) path")
+        model_data = {"model": self.model, "features": self.feature_columns}
+        if metadata:
+            model_data["metadata"] = metadata
+        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
+        joblib.dump(model_data, self.model_path)
+
     def load_model(self):
         """Load a previously trained model"""
-        if os.path.exists(self.model_path):
-            self.model = joblib.load(self.model_path)
+        if os.path.exists(self.model_path) and is_artifact_path(self.model_path):
+            # Memory-mapped compiled forest; the sklearn model is not needed to serve
+            self.engine, manifest = load_artifact(self.model_path, kind="regressor")
+            self.model = None
+            self.feature_columns = manifest["features"]
+            self.metadata = manifest.get("metadata", {})
+            print(f"📦 Loaded pricing model {manifest['version']} from {self.model_path}")
+        elif os.path.exists(self.model_path):
+            data = joblib.load(self.model_path)
+
+            # Handle both old and new format
+            if isinstance(data, dict):
+                self.model = data["model"]
+                self.feature_columns = data.get("features") or list(getattr(data["model"], "feature_names_in_", LEGACY_FEATURES))
+                self.metadata = data.get("metadata", {})
+            else:
+                # Old format - just the model, trained on the legacy features unless it names its own
+                self.model = data
+                self.feature_columns = list(getattr(data, "feature_names_in_", LEGACY_FEATURES))
+            self.engine = compile_forest(self.model)
             print(f"📦 Loaded pricing model from {self.model_path}")
         else:
             raise FileNotFoundError(f"{self.model_path} not found. Train the model first.")
 
-    def suggest(self, submission: dict) -> dict:
+    def suggest(self, submission: dict, quantiles=None) -> dict:
         """
         Suggest a fair premium and accept/reject based on claim ratio.
-        - ClaimRatio > 0.8 → Reject
-        - ClaimRatio <= 0.8 → Accept
+        - ClaimRatio > REJECT_CLAIM_RATIO (0.8) → Reject
+        - ClaimRatio <= REJECT_CLAIM_RATIO → Accept
+        With quantiles (e.g. DEFAULT_QUANTILES), also a PremiumRange such as {"P10", "P50", "P90"}.
         """
-        if not self.model:
+        if not self.is_loaded:
             self.load_model()
 
-        feature_order = [
-            "SumInsured", "ClaimRatio", "LossFrequency",
-            "LossSeverity", "PremiumRate", "NormalizedRiskScore"
-        ]
-        features = [submission.get(f, 0) for f in feature_order]
-
-        predicted_premium = float(self.model.predict([features])[0])
+        # Same features as suggest_batch: missing, null or non-numeric values are 0
+        X = build_feature_matrix([submission], self.feature_columns)
+        predicted_premium = float(self.predict_matrix(X)[0])
 
         # Apply acceptance rule
-        if submission.get("ClaimRatio", 0) > 0.8:
+        if build_feature_matrix([submission], ["ClaimRatio"])[0, 0] > REJECT_CLAIM_RATIO:
             decision = "REJECT"
         else:
             decision = "ACCEPT"
 
-        print(f"💡 Suggested Premium: {predicted_premium:,.2f} USD | Decision: {decision}")
-        return {"Premium": predicted_premium, "Decision": decision}
+        result = {"Premium": predicted_premium, "Decision": decision}
+        if quantiles is not None:
+            result["PremiumRange"] = dict(zip(quantile_labels(quantiles),
+                                              self.predict_quantiles_matrix(X, quantiles)[0].tolist()))
+        return result
+
+    def suggest_batch(self, submissions, quantiles=None) -> pd.DataFrame:
+        """
+        Suggest premiums and accept/reject decisions for many submissions with one model call
+
+        Accepts a DataFrame, a list of submission dicts or a columnar dict of
+        lists; missing, null or non-numeric features are 0, as in suggest().
+
+        Returns:
+            Premium and Decision columns, one row per submission, plus a
+            column per quantile (P10, P50, ...) when quantiles are given
+        """
+        if not self.is_loaded:
+            self.load_model()
+
+        X = build_feature_matrix(submissions, self.feature_columns)
+        if quantiles is not None and self.engine is not None:
+            # Point premium and range from the same pass over the forest
+            bands, premiums = self.engine.predict_quantiles(X, quantiles, return_mean=True)
+        else:
+            bands, premiums = None, self.predict_matrix(X)
+
+        claim_ratio = build_feature_matrix(submissions, ["ClaimRatio"])[:, 0]
+        decisions = np.where(claim_ratio > REJECT_CLAIM_RATIO, "REJECT", "ACCEPT")
+        index = submissions.index if isinstance(submissions, pd.DataFrame) else None
+        result = pd.DataFrame({"Premium": premiums.astype(np.float64), "Decision": decisions.astype(object)},
+                              index=index)
+        if quantiles is not None:
+            result[quantile_labels(quantiles)] = bands if bands is not None else self.predict_quantiles_matrix(X, quantiles)
+        return result
+
+    def predict_quantiles_matrix(self, X: np.ndarray, quantiles=DEFAULT_QUANTILES) -> np.ndarray:
+        """
+        Premium quantiles for a feature matrix, shape (n_rows, len(quantiles))
+
+        Taken across the per-tree predictions of the forest, from the same
+        leaves as the point premium, in one vectorized pass over all trees.
+        """
+        if self.engine is None:
+            raise ValueError("Premium quantiles need a random forest pricing model")
+        return self.engine.predict_quantiles(X, quantiles)
+
+    def predict_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Premiums for a feature matrix, reusing cached rows when a cache is set"""
+        if self.cache is not None:
+            return self.cache.lookup(self.cache_name, self.version, X, self._score)
+        return self._score(X)
+
+    def cached_matrix(self, X: np.ndarray):
+        """Premiums for X if every row is in the prediction cache, else None"""
+        if self.cache is None:
+            return None
+        return self.cache.peek(self.cache_name, self.version, X)
+
+    def _score(self, X: np.ndarray) -> np.ndarray:
+        """Premiums from the compiled forest when available"""
+        if self.engine is not None:
+            return self.engine.predict(X)
+        if hasattr(self.model, "feature_names_in_"):
+            X = pd.DataFrame(X, columns=self.feature_columns)
+        return self.model.predict(X)
 
 
 if __name__ == "__main__":
-    # Load cleaned data
-    cleaned_path = "data/cleaned_submissions.csv"  # adjust path if needed
-    if not os.path.exists(cleaned_path):
-        raise FileNotFoundError("❌ Cleaned data not found. Run your pipeline first!")
-
-    df = pd.read_csv(cleaned_path)
-    model = PricingModel()
-    model.train(df)
-
-    # Example new submission
-    new_case = {
-        "SumInsured": 500000,
-        "ClaimRatio": 0.35,
-        "LossFrequency": 0.08,
-        "LossSeverity": 0.25,
-        "PremiumRate": 0.04,
-        "NormalizedRiskScore": 0.7
-    }
-    model.suggest(new_case)
+    import sys
+
+    try:
+        from aiengine.train_models import main
+    except ImportError:  # run as a script from aiengine/
+        from train_models import main
+
+    # Train through the shared command so the registry serves the result
+    main(["--models", "pricing"] + sys.argv[1:])
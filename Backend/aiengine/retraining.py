@@ -0,0 +1,387 @@
+"""
+Background retraining of the risk and pricing models.
+
+Scored and bound submissions are appended to an incoming file as they
+arrive. When enough rows have accumulated, or the schedule comes round,
+the pending rows are set aside and a separate process retrains on the full
+history: it adds trees to the current forest when that is valid (warm
+start) and refits from scratch otherwise, validates the candidate against
+the current model on the newest rows and, if it is no worse, publishes it
+as a new artifact. The model registry hot-swaps it; serving never waits
+on training.
+
+The history is a file in the work directory. The first job starts it from
+the cleaned training data, which is only ever read.
+"""
+import glob
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    from aiengine.feature_matrix import build_feature_matrix
+    from aiengine.model_artifacts import data_hash, load_estimator, read_manifest
+    from aiengine.model_registry import MODEL_PATHS, MODELS_DIR
+    from aiengine.pricing_model import PRICING_FEATURES, PricingModel
+    from aiengine.risk_analyzer import RISK_FEATURES, RiskAnalyzer
+    from aiengine.train_models import (DEFAULT_DATA_PATH, MODEL_SPECS, fit_model, publish_model, score,
+                                       training_matrix)
+except ImportError:  # run as a script from aiengine/
+    from feature_matrix import build_feature_matrix
+    from model_artifacts import data_hash, load_estimator, read_manifest
+    from model_registry import MODEL_PATHS, MODELS_DIR
+    from pricing_model import PRICING_FEATURES, PricingModel
+    from risk_analyzer import RISK_FEATURES, RiskAnalyzer
+    from train_models import DEFAULT_DATA_PATH, MODEL_SPECS, fit_model, publish_model, score, training_matrix
+
+DEFAULT_WORK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'retraining')
+HISTORY_FILE = 'history.csv'
+# Columns kept from recorded submissions: model features and targets
+RETRAINING_COLUMNS = list(dict.fromkeys(
+    RISK_FEATURES + PRICING_FEATURES + [spec['target'] for spec in MODEL_SPECS.values()]))
+
+DEFAULT_MIN_NEW_ROWS = 1000
+DEFAULT_INTERVAL_SECONDS = 24 * 3600
+DEFAULT_WARM_START_TREES = 20
+DEFAULT_MAX_TREES = 400
+# Candidates may score this much (relative) worse than the current model on the newest rows
+DEFAULT_TOLERANCE = 0.02
+DEFAULT_HOLDOUT_FRACTION = 0.2
+# Seconds for a full refit's hyperparameter search, per job
+DEFAULT_TIME_BUDGET = 3600.0
+
+
+class RetrainingManager:
+    """
+    Accumulates new submissions and retrains in a background process.
+
+    record() is cheap and safe to call from request handlers. A scheduler
+    thread (start()) or an explicit trigger() starts a retraining job when
+    min_new_rows rows are pending or interval_seconds have passed since the
+    last one; only one job runs at a time, and rows recorded meanwhile wait
+    for the next.
+
+    Retraining history defaults to history.csv in work_dir, seeded from
+    seed_path when it does not exist yet.
+    """
+
+    def __init__(self, history_path: Optional[str] = None, work_dir: str = DEFAULT_WORK_DIR,
+                 seed_path: Optional[str] = DEFAULT_DATA_PATH,
+                 models_dir: str = MODELS_DIR, names: Sequence[str] = ('risk', 'pricing'),
+                 min_new_rows: int = DEFAULT_MIN_NEW_ROWS,
+                 interval_seconds: Optional[float] = DEFAULT_INTERVAL_SECONDS, poll_seconds: float = 60.0,
+                 warm_start_trees: int = DEFAULT_WARM_START_TREES, max_trees: int = DEFAULT_MAX_TREES,
+                 tolerance: float = DEFAULT_TOLERANCE, holdout_fraction: float = DEFAULT_HOLDOUT_FRACTION,
+                 time_budget: Optional[float] = DEFAULT_TIME_BUDGET, max_candidates: Optional[int] = None,
+                 n_jobs: int = 1):
+        self.history_path = history_path or os.path.join(work_dir, HISTORY_FILE)
+        self.work_dir = work_dir
+        self.incoming_path = os.path.join(work_dir, 'incoming.csv')
+        self.min_new_rows = min_new_rows
+        self.interval_seconds = interval_seconds
+        self.poll_seconds = poll_seconds
+        self.job_options = {
+            'history_path': self.history_path,
+            'work_dir': work_dir,
+            'seed_path': seed_path,
+            'models_dir': models_dir,
+            'names': list(names),
+            'warm_start_trees': warm_start_trees,
+            'max_trees': max_trees,
+            'tolerance': tolerance,
+            'holdout_fraction': holdout_fraction,
+            'time_budget': time_budget,
+            'max_candidates': max_candidates,
+            'n_jobs': n_jobs,
+        }
+        os.makedirs(work_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending = _count_rows(self.incoming_path)
+        self._last_run = time.monotonic()
+        self._job: Optional[Future] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._history: List[Dict] = []
+        self._stop = threading.Event()
+        self._scheduler: Optional[threading.Thread] = None
+
+    def record(self, submissions) -> int:
+        """
+        Append scored or bound submissions for the next retraining
+
+        Accepts a DataFrame or a list of submission dicts; only model
+        features and targets are kept. Returns the number of pending rows.
+        """
+        df = pd.DataFrame(submissions) if not isinstance(submissions, pd.DataFrame) else submissions
+        df = df.reindex(columns=RETRAINING_COLUMNS)
+        with self._lock:
+            df.to_csv(self.incoming_path, mode='a', index=False, header=not os.path.exists(self.incoming_path))
+            self._pending += len(df)
+            return self._pending
+
+    def pending_rows(self) -> int:
+        return self._pending
+
+    def should_retrain(self) -> bool:
+        """Whether enough rows are pending or the schedule is due (with at least one new row)"""
+        if self._pending >= self.min_new_rows:
+            return True
+        due = self.interval_seconds is not None and time.monotonic() - self._last_run >= self.interval_seconds
+        return due and self._pending > 0
+
+    def trigger(self, force: bool = False) -> Optional[Future]:
+        """
+        Start a retraining job in the background process if one is due
+
+        Pending rows are moved aside first, so rows recorded while the job
+        runs go to the next one. Returns the job's future, or None when no
+        job was started.
+        """
+        with self._lock:
+            if self._job is not None and not self._job.done():
+                return None
+            if not (force or self.should_retrain()):
+                return None
+            if os.path.exists(self.incoming_path):
+                stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+                os.replace(self.incoming_path, os.path.join(self.work_dir, f'pending-{stamp}.csv'))
+            self._pending = 0
+            self._last_run = time.monotonic()
+            if self._executor is None:
+                # A fresh interpreter: the server's threads are not forked into it
+                self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+            self._job = self._executor.submit(run_retraining, **self.job_options)
+            self._job.add_done_callback(self._finished)
+            return self._job
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Result of the current or last job, waiting for it to finish"""
+        job = self._job
+        return job.result(timeout) if job is not None else None
+
+    def start(self):
+        """Check the triggers every poll_seconds in a daemon thread"""
+        if self._scheduler is not None and self._scheduler.is_alive():
+            return
+        self._stop.clear()
+        self._scheduler = threading.Thread(target=self._run, name='retraining-scheduler', daemon=True)
+        self._scheduler.start()
+
+    def stop(self):
+        """Stop scheduling; a running job finishes in its process"""
+        self._stop.set()
+        if self._scheduler is not None:
+            self._scheduler.join()
+            self._scheduler = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def status(self) -> Dict:
+        """Pending rows, whether a job is running and the outcome of past jobs"""
+        return {
+            'pending_rows': self._pending,
+            'running': self._job is not None and not self._job.done(),
+            'min_new_rows': self.min_new_rows,
+            'interval_seconds': self.interval_seconds,
+            'history': list(self._history),
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.trigger()
+            except Exception as e:
+                print(f"⚠️ Could not start retraining: {e}")
+
+    def _finished(self, job: Future):
+        try:
+            outcome = job.result()
+        except Exception as e:
+            outcome = {'error': str(e)}
+            print(f"⚠️ Retraining failed: {e}")
+        outcome['finished_at'] = datetime.now(timezone.utc).isoformat()
+        self._history.append(outcome)
+
+
+def run_retraining(history_path: str, work_dir: str, models_dir: str = MODELS_DIR,
+                   names: Sequence[str] = ('risk', 'pricing'),
+                   warm_start_trees: int = DEFAULT_WARM_START_TREES, max_trees: int = DEFAULT_MAX_TREES,
+                   tolerance: float = DEFAULT_TOLERANCE, holdout_fraction: float = DEFAULT_HOLDOUT_FRACTION,
+                   time_budget: Optional[float] = DEFAULT_TIME_BUDGET, max_candidates: Optional[int] = None,
+                   n_jobs: int = 1, seed_path: Optional[str] = None) -> Dict:
+    """
+    Retrain, validate and publish each model on the history plus pending rows
+
+    Runs in the background process. The newest holdout_fraction of pending
+    rows is held out to compare candidate and current model; the pending
+    rows join the history once every model is done, so a crashed job leaves
+    them to be retried. Without a history file, the rows at seed_path start
+    it; seed_path itself is never written.
+
+    Returns:
+        Per model: mode (warm_start or refit), the selection metric of the
+        candidate and current model, whether it was published and its version
+    """
+    pending_files = sorted(glob.glob(os.path.join(work_dir, 'pending-*.csv')))
+    new_rows = pd.concat([pd.read_csv(f) for f in pending_files], ignore_index=True) if pending_files else \
+        pd.DataFrame(columns=RETRAINING_COLUMNS)
+    if os.path.exists(history_path):
+        history = pd.read_csv(history_path)
+    elif seed_path is not None and os.path.exists(seed_path):
+        history = pd.read_csv(seed_path)
+    else:
+        history = pd.DataFrame()
+
+    n_holdout = int(np.ceil(len(new_rows) * holdout_fraction)) if len(new_rows) else 0
+    holdout = new_rows.iloc[len(new_rows) - n_holdout:]
+    training = pd.concat([history, new_rows.iloc[:len(new_rows) - n_holdout]], ignore_index=True)
+    # Recorded rows carry every retraining column; one never observed is not a feature
+    training = training.dropna(axis=1, how='all')
+
+    results = {}
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    for i, name in enumerate(names):
+        # Models left share what remains of the budget
+        share = None if deadline is None else max(deadline - time.monotonic(), 0) / (len(names) - i)
+        results[name] = _retrain_model(name, training, holdout, models_dir, warm_start_trees, max_trees,
+                                       tolerance, share, max_candidates, n_jobs)
+
+    if pending_files:
+        _write_csv(pd.concat([history, new_rows], ignore_index=True), history_path)
+        for f in pending_files:
+            os.remove(f)
+    return {'new_rows': len(new_rows), 'history_rows': len(history) + len(new_rows), 'models': results}
+
+
+def _retrain_model(name: str, training: pd.DataFrame, holdout: pd.DataFrame, models_dir: str,
+                   warm_start_trees: int, max_trees: int, tolerance: float,
+                   time_budget: Optional[float], max_candidates: Optional[int], n_jobs: int) -> Dict:
+    spec = MODEL_SPECS[name]
+    path = os.path.join(models_dir, os.path.basename(MODEL_PATHS[name]))
+    X, y, features = training_matrix(training, name)
+
+    model = _warm_start(path, X, y, features, warm_start_trees, max_trees, spec)
+    if model is not None:
+        mode = 'warm_start'
+        metadata = {'params': {k: v for k, v in model.get_params().items() if k in spec['defaults']},
+                    'cv_metrics': {}}
+    else:
+        mode = 'refit'
+        model, features, metadata = fit_model(name, training, n_jobs=n_jobs, time_budget=time_budget,
+                                              max_candidates=max_candidates)
+
+    candidate_metric = current_metric = None
+    labelled, y_holdout = _holdout_targets(holdout, name)
+    if len(labelled):
+        # Features as served: missing values are 0
+        predictions = model.predict(build_feature_matrix(labelled, features))
+        candidate_metric = score(name, y_holdout, predictions)[spec['select']]
+        current_metric = _current_metric(name, path, labelled, y_holdout)
+
+    accepted = _no_worse(candidate_metric, current_metric, spec['greater_is_better'], tolerance)
+    outcome = {'mode': mode, 'candidate_metric': candidate_metric, 'current_metric': current_metric,
+               'selected_by': spec['select'], 'published': accepted}
+    if not accepted:
+        print(f"⚠️ Kept the current {name} model: candidate {spec['select']}={candidate_metric:.4f}, "
+              f"current {current_metric:.4f}")
+        return outcome
+
+    version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    metadata.update({
+        'version': version,
+        'model': name,
+        'retraining_mode': mode,
+        'n_trees': len(model.estimators_),
+        'n_rows': int(len(y)),
+        'features': features,
+        'data_hash': data_hash(X, y, features),
+        'validation_metrics': {spec['select']: candidate_metric, 'current': current_metric},
+        'trained_at': datetime.now(timezone.utc).isoformat(),
+    })
+    publish_model(name, model, features, metadata, models_dir)
+    print(f"✅ Published {name} model {version} ({mode})")
+    outcome['version'] = version
+    return outcome
+
+
+def _warm_start(path: str, X: np.ndarray, y: np.ndarray, features: List[str],
+                warm_start_trees: int, max_trees: int, spec: Dict):
+    """The current forest with warm_start_trees more trees fitted on X, or None when that is not valid"""
+    if not os.path.exists(path) or warm_start_trees <= 0:
+        return None
+    # The estimator was fitted on a bare matrix, so only the manifest knows its columns
+    if read_manifest(path).get('features') != features:
+        return None
+    estimator = load_estimator(path)
+    if estimator is None or not isinstance(estimator, spec['estimator']):
+        return None
+    if estimator.n_features_in_ != len(features):
+        return None
+    if estimator.n_estimators + warm_start_trees > max_trees:
+        return None
+    # Added trees must vote over the same classes as the existing ones
+    if spec['target_mapping'] is not None and not np.array_equal(np.unique(y), estimator.classes_):
+        return None
+
+    estimator.set_params(warm_start=True, n_estimators=estimator.n_estimators + warm_start_trees, n_jobs=1)
+    estimator.fit(X, y)
+    estimator.set_params(warm_start=False, n_jobs=None)
+    return estimator
+
+
+def _holdout_targets(df: pd.DataFrame, name: str):
+    """Holdout rows that have a target, and their targets as the model is trained on them"""
+    spec = MODEL_SPECS[name]
+    if spec['target'] not in df.columns:
+        return df.iloc[:0], np.empty(0)
+    y = df[spec['target']]
+    if spec['target_mapping'] is not None:
+        y = y.map(spec['target_mapping'])
+    y = pd.to_numeric(y, errors='coerce')
+    mask = y.notna().to_numpy()
+    y = y[mask].to_numpy()
+    return df[mask], y.astype(np.int64) if spec['target_mapping'] is not None else y
+
+
+def _current_metric(name: str, path: str, holdout: pd.DataFrame, y_holdout: np.ndarray) -> Optional[float]:
+    if not os.path.exists(path):
+        return None
+    if name == 'risk':
+        current = RiskAnalyzer(model_path=path)
+        current.load_model()
+        predictions = current.classes_[current.predict_proba_matrix(current.feature_matrix(holdout)).argmax(axis=1)]
+    else:
+        current = PricingModel(model_path=path)
+        current.load_model()
+        predictions = current.predict_matrix(build_feature_matrix(holdout, current.feature_columns))
+    return score(name, y_holdout, predictions)[MODEL_SPECS[name]['select']]
+
+
+def _no_worse(candidate: Optional[float], current: Optional[float], greater_is_better: bool,
+              tolerance: float) -> bool:
+    if candidate is None or current is None or np.isnan(current):
+        return True
+    if np.isnan(candidate):
+        return False
+    if greater_is_better:
+        return candidate >= current - abs(current) * tolerance
+    return candidate <= current + abs(current) * tolerance
+
+
+def _count_rows(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    return len(pd.read_csv(path, usecols=[0]))
+
+
+def _write_csv(df: pd.DataFrame, path: str):
+    staged = f'{path}.tmp'
+    df.to_csv(staged, index=False)
+    os.replace(staged, path)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
@@ -5,37 +6,57 @@ from sklearn.metrics import classification_report
 import joblib
 import os
 
+try:
+    from aiengine.feature_matrix import build_feature_matrix
+    from aiengine.forest_engine import compile_forest
+    from aiengine.model_artifacts import is_artifact_path, label_mapping, load_artifact, save_artifact
+except ImportError:  # run as a script from aiengine/
+    from feature_matrix import build_feature_matrix
+    from forest_engine import compile_forest
+    from model_artifacts import is_artifact_path, label_mapping, load_artifact, save_artifact
+
+# Candidate training features, used when present in the data
+RISK_FEATURES = [
+    "SumInsured", "PastPremium", "ClaimRatio",
+    "LossFrequency", "LossSeverity", "PremiumRate",
+    "DataCompletenessScore", "LossRatio", "ESGScore", "CatastropheExposure",
+    "LossTrendSlope", "LossVolatility"
+]
+# Risk categories of the cleaned data as model classes
+RISK_TARGET_MAPPING = {
+    "Low Risk": 0,
+    "Medium Risk": 1,
+    "High Risk": 2,
+    "Very High Risk": 2
+}
+
 class RiskAnalyzer:
     def __init__(self, model_path: str = "models/risk_model.pkl"):
         self.model_path = model_path
         self.model = None
+        self.engine = None  # Compiled forest used for inference
+        # Set by the model registry to share cached predictions
+        self.cache = None
+        self.cache_name = 'risk'
+        self.version = 0
         self.label_mapping = {0: "Low", 1: "Medium", 2: "High"}
         self.feature_columns = []
+        self.metadata = {}  # Training run details saved with the artifact
+        self.feature_importances = None  # From the manifest when only the compiled forest is loaded
         
         # Ensure models directory exists
         os.makedirs(os.path.dirname(model_path), exist_ok=True)
 
     def train(self, df: pd.DataFrame, target_col: str = "RiskCategory") -> None:
         """Train the risk analysis model"""
-        features = [
-            "SumInsured", "PastPremium", "ClaimRatio",
-            "LossFrequency", "LossSeverity", "PremiumRate",
-            "DataCompletenessScore", "LossRatio", "ESGScore", "CatastropheExposure"
-        ]
-        
         # Keep only columns present in df
-        self.feature_columns = [f for f in features if f in df.columns]
+        self.feature_columns = [f for f in RISK_FEATURES if f in df.columns]
         
         if len(self.feature_columns) == 0:
             raise ValueError("No valid feature columns found in DataFrame")
 
         X = df[self.feature_columns]
-        y = df[target_col].map({
-            "Low Risk": 0,
-            "Medium Risk": 1,
-            "High Risk": 2,
-            "Very High Risk": 2
-        })
+        y = df[target_col].map(RISK_TARGET_MAPPING)
 
         # Handle any NaN values in target
         mask = y.notna()
@@ -47,21 +68,46 @@ class RiskAnalyzer:
 
         self.model = RandomForestClassifier(n_estimators=100, random_state=42)
         self.model.fit(X, y)
+        self.engine = compile_forest(self.model)
+        if self.cache is not None:
+            self.cache.invalidate(self.cache_name)
 
         # Save model and feature columns
         self.save_model()
         print(f"✅ Model trained and saved to {self.model_path}")
 
-    def save_model(self):
-        """Save the trained model and feature columns"""
-        if self.model is None:
+    @property
+    def is_loaded(self) -> bool:
+        return self.model is not None or self.engine is not None
+
+    @property
+    def classes_(self) -> np.ndarray:
+        """Model classes, in predict_proba column order"""
+        return self.engine.classes if self.engine is not None else self.model.classes_
+
+    def save_model(self, metadata: dict = None):
+        """Save the trained model and feature columns, with optional training metadata"""
+        if not self.is_loaded:
             raise ValueError("No model to save. Train the model first.")
+
+        if is_artifact_path(self.model_path):
+            engine = self.engine if self.engine is not None else compile_forest(self.model)
+            if engine is None:
+                raise ValueError("Only random forest models can be saved as artifacts")
+            importances = getattr(self.model, 'feature_importances_', self.feature_importances)
+            save_artifact(self.model_path, engine, self.feature_columns, self.label_mapping,
+                          importances, metadata, estimator=self.model)
+            return
         
+        if self.model is None:
+            raise ValueError("Only the compiled forest is loaded; save it to an artifact (.json) path")
         model_data = {
             "model": self.model,
             "features": self.feature_columns,
             "label_mapping": self.label_mapping
         }
+        if metadata:
+            model_data["metadata"] = metadata
         
         joblib.dump(model_data, self.model_path)
         print(f"💾 Model saved to {self.model_path}")
@@ -72,17 +118,35 @@ class RiskAnalyzer:
             raise FileNotFoundError(f"{self.model_path} not found. Train the model first.")
         
         try:
+            if is_artifact_path(self.model_path):
+                # Memory-mapped compiled forest; the sklearn model is not needed to serve
+                self.engine, manifest = load_artifact(self.model_path, kind='classifier')
+                self.model = None
+                self.feature_columns = manifest['features']
+                self.label_mapping = label_mapping(manifest) or self.label_mapping
+                self.feature_importances = manifest.get('feature_importances')
+                self.metadata = manifest.get('metadata', {})
+                self.engine.prepare_explanations()
+                print(f"📦 Loaded risk model {manifest['version']} from {self.model_path}")
+                return
+
             data = joblib.load(self.model_path)
             
             # Handle both old and new format
             if isinstance(data, dict):
                 self.model = data["model"]
-                self.feature_columns = data.get("features", [])
+                self.feature_columns = data.get("features") or list(getattr(data["model"], "feature_names_in_", []))
                 self.label_mapping = data.get("label_mapping", self.label_mapping)
+                self.metadata = data.get("metadata", {})
             else:
-                # Old format - just the model
+                # Old format - just the model, which knows its features when fitted on a DataFrame
                 self.model = data
-                print("⚠️ Loaded model in old format. Consider retraining to save feature columns.")
+                self.feature_columns = list(getattr(data, "feature_names_in_", []))
+                if not self.feature_columns:
+                    print("⚠️ Loaded model in old format. Consider retraining to save feature columns.")
+            self.engine = compile_forest(self.model)
+            if self.engine is not None:
+                self.engine.prepare_explanations()
             
             print(f"📦 Loaded risk model from {self.model_path}")
             
@@ -91,43 +155,137 @@ class RiskAnalyzer:
 
     def predict(self, submission: dict) -> str:
         """Predict risk level for a submission"""
-        if self.model is None:
+        if not self.is_loaded:
             self.load_model()
         
-        # Use the same columns as training
-        features = [submission.get(f, 0) for f in self.feature_columns]
+        # Same features as a batch: missing, null or non-numeric values are 0
+        X = self.feature_matrix([submission])
         
         try:
-            pred = self.model.predict([features])[0]
-            return self.label_mapping[pred]
+            probabilities = self.predict_proba_matrix(X)[0]
+            return self.label_mapping[self.classes_[probabilities.argmax()]]
         except Exception as e:
             print(f"⚠️ Prediction error: {e}")
             return "Medium"  # Default fallback
 
     def predict_proba(self, submission: dict) -> dict:
         """Get prediction probabilities"""
-        if self.model is None:
+        if not self.is_loaded:
             self.load_model()
         
-        features = [submission.get(f, 0) for f in self.feature_columns]
+        X = self.feature_matrix([submission])
         
         try:
-            probabilities = self.model.predict_proba([features])[0]
+            probabilities = self.predict_proba_matrix(X)[0]
             return {
-                self.label_mapping[i]: prob 
-                for i, prob in enumerate(probabilities)
+                self.label_mapping[c]: prob
+                for c, prob in zip(self.classes_, probabilities)
             }
         except Exception as e:
             print(f"⚠️ Probability prediction error: {e}")
             return {"Low": 0.33, "Medium": 0.34, "High": 0.33}
 
+    def feature_matrix(self, submissions) -> np.ndarray:
+        """
+        Feature matrix in feature_columns order for many submissions
+
+        Accepts a DataFrame, a list of submission dicts or a columnar dict of
+        lists. Missing, null or non-numeric features are 0.
+        """
+        return build_feature_matrix(submissions, self.feature_columns)
+
+    def predict_batch(self, submissions) -> pd.DataFrame:
+        """
+        Predict risk levels and probabilities for many submissions with one model call
+
+        Returns:
+            One row per submission: a probability column per risk level and predicted_risk
+        """
+        if not self.is_loaded:
+            self.load_model()
+        if len(self.feature_columns) == 0:
+            raise ValueError("Model has no feature columns. Retrain the model to save them.")
+
+        probabilities = self.predict_proba_matrix(self.feature_matrix(submissions))
+
+        # Same labels as model.predict, without a second pass over the forest
+        labels = [self.label_mapping[c] for c in self.classes_]
+        result = pd.DataFrame(probabilities, columns=labels)
+        result['predicted_risk'] = np.asarray(labels, dtype=object)[probabilities.argmax(axis=1)]
+        return result
+
+    def predict_proba_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities for a feature matrix, reusing cached rows when a cache is set"""
+        if self.cache is not None:
+            return self.cache.lookup(self.cache_name, self.version, X, self._score_proba)
+        return self._score_proba(X)
+
+    def cached_proba_matrix(self, X: np.ndarray):
+        """Class probabilities for X if every row is in the prediction cache, else None"""
+        if self.cache is None:
+            return None
+        return self.cache.peek(self.cache_name, self.version, X)
+
+    def _score_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities from the compiled forest when available"""
+        if self.engine is not None:
+            return self.engine.predict_proba(X)
+        if hasattr(self.model, 'feature_names_in_'):
+            X = pd.DataFrame(X, columns=self.feature_columns)
+        return self.model.predict_proba(X)
+
+    def explain_batch(self, submissions) -> pd.DataFrame:
+        """
+        Per-feature contributions to each submission's predicted risk level
+
+        Each prediction is decomposed along the forest's decision paths, at
+        about the cost of predicting it.
+
+        Returns:
+            One row per submission: predicted_risk, its probability,
+            BaseValue (the forest's prior for that level) and a column per
+            feature; BaseValue plus the feature columns equals probability
+        """
+        if not self.is_loaded:
+            self.load_model()
+        if self.engine is None:
+            raise ValueError("Explanations need a random forest risk model")
+
+        bias, contributions = self.engine.contributions(self.feature_matrix(submissions))
+        probabilities = bias + contributions.sum(axis=1)
+        predicted = probabilities.argmax(axis=1)
+        rows = np.arange(len(predicted))
+        labels = np.asarray([self.label_mapping[c] for c in self.classes_], dtype=object)
+
+        result = pd.DataFrame(contributions[rows, :, predicted], columns=self.feature_columns)
+        result.insert(0, 'BaseValue', bias[predicted])
+        result.insert(0, 'probability', probabilities[rows, predicted])
+        result.insert(0, 'predicted_risk', labels[predicted])
+        return result
+
+    def explain(self, submission: dict, top_n: int = None) -> dict:
+        """Predicted risk level of a submission and the features behind it, largest effect first"""
+        row = self.explain_batch([submission]).iloc[0]
+        contributions = [
+            {"feature": f, "value": submission.get(f, 0), "contribution": float(row[f])}
+            for f in self.feature_columns
+        ]
+        contributions.sort(key=lambda c: abs(c["contribution"]), reverse=True)
+        return {
+            "predicted_risk": row["predicted_risk"],
+            "probability": float(row["probability"]),
+            "base_value": float(row["BaseValue"]),
+            "contributions": contributions[:top_n] if top_n else contributions,
+        }
+
     def get_feature_importance(self) -> dict:
         """Get feature importance from the trained model"""
-        if self.model is None:
+        if not self.is_loaded:
             self.load_model()
         
-        if hasattr(self.model, 'feature_importances_'):
-            importance = dict(zip(self.feature_columns, self.model.feature_importances_))
+        importances = getattr(self.model, 'feature_importances_', self.feature_importances)
+        if importances is not None:
+            importance = dict(zip(self.feature_columns, importances))
             return dict(sorted(importance.items(), key=lambda x: x[1], reverse=True))
         else:
             return {}
@@ -0,0 +1,97 @@
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+
+class SegmentImputer:
+    """
+    Median imputation learned per segment (e.g. business type × state).
+
+    Medians are learned at every level of the segment hierarchy, from all
+    segment columns down to the first one, plus a global median. A gap is
+    filled from the most specific level whose segment had at least
+    min_segment_size observed values. The fitted tables are plain lists, so
+    they can be saved with the pipeline's JSON state and reused at serving
+    time without the historical book.
+    """
+
+    def __init__(self, segment_columns: Optional[List[str]] = None, min_segment_size: int = 5):
+        self.segment_columns = list(segment_columns or [])
+        self.min_segment_size = min_segment_size
+        self.levels: List[Dict[str, Any]] = []
+        self.global_medians: Dict[str, float] = {}
+
+    def fit(self, df: pd.DataFrame, columns: List[str]) -> 'SegmentImputer':
+        """Learn segment and global medians of the given numeric columns"""
+        columns = [col for col in columns if col in df.columns]
+        medians = df[columns].median() if columns else pd.Series(dtype=float)
+        self.global_medians = {col: float(val) for col, val in medians.items() if pd.notna(val)}
+
+        self.levels = []
+        present = [col for col in self.segment_columns if col in df.columns]
+        for depth in range(len(present), 0, -1):
+            keys = present[:depth]
+            table = self._segment_table(df, keys, columns)
+            if table is not None:
+                self.levels.append(table)
+        return self
+
+    def _segment_table(self, df: pd.DataFrame, keys: List[str], columns: List[str]) -> Optional[Dict[str, Any]]:
+        """Medians of every column per segment, one grouped aggregation for all columns"""
+        if not columns:
+            return None
+        grouped = df.groupby(keys, sort=False, observed=True, dropna=False)[columns]
+        medians = grouped.median()
+        # Medians of thinly populated segments are noise; leave those cells to coarser levels
+        medians = medians.where(grouped.count() >= self.min_segment_size)
+        medians = medians.dropna(how='all')
+        if medians.empty:
+            return None
+
+        index = medians.index.to_frame(index=False).astype(str)
+        return {
+            'columns': keys,
+            'keys': index.values.tolist(),
+            'medians': {col: [None if pd.isna(v) else float(v) for v in medians[col]] for col in medians.columns},
+        }
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Fill gaps in place from the most specific segment level, then the global medians"""
+        for level in self.levels:
+            targets = [col for col in level['medians'] if col in df.columns]
+            if not targets or not all(col in df.columns for col in level['columns']):
+                continue
+            missing = df[targets].isna()
+            if not missing.values.any():
+                return df
+
+            table = pd.DataFrame(level['medians'], index=pd.MultiIndex.from_arrays(
+                list(zip(*level['keys'])), names=level['columns']))[targets]
+            row_keys = pd.MultiIndex.from_frame(df[level['columns']].astype(str))
+            fills = table.reindex(row_keys)
+            fills.index = df.index
+            df[targets] = df[targets].fillna(fills)
+
+        remaining = {col: val for col, val in self.global_medians.items()
+                     if col in df.columns and df[col].isna().any()}
+        if remaining:
+            df.fillna(remaining, inplace=True)
+        return df
+
+    def fit_transform(self, df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        return self.fit(df, columns).transform(df)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'segment_columns': self.segment_columns,
+            'min_segment_size': self.min_segment_size,
+            'levels': self.levels,
+            'global_medians': self.global_medians,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'SegmentImputer':
+        imputer = cls(state.get('segment_columns'), state.get('min_segment_size', 5))
+        imputer.levels = state.get('levels', [])
+        imputer.global_medians = state.get('global_medians', {})
+        return imputer
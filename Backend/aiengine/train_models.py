@@ -0,0 +1,343 @@
+"""
+Unified training command for the risk and pricing models.
+
+Runs a cross-validated hyperparameter search in parallel across cores,
+refits the best candidate on the full history and saves it as a versioned
+artifact with its metrics. From Backend/:
+
+    python -m aiengine.train_models --data aiengine/data/cleaned_submissions.csv --time-budget 3600
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.metrics import accuracy_score, f1_score, mean_absolute_error, r2_score
+from sklearn.model_selection import KFold, ParameterGrid, StratifiedKFold
+
+try:
+    from aiengine.forest_engine import compile_forest
+    from aiengine.model_artifacts import data_hash
+    from aiengine.model_registry import MODEL_PATHS, MODELS_DIR
+    from aiengine.pricing_model import PRICING_FEATURES, PricingModel
+    from aiengine.risk_analyzer import RISK_FEATURES, RISK_TARGET_MAPPING, RiskAnalyzer
+except ImportError:  # run as a script from aiengine/
+    from forest_engine import compile_forest
+    from model_artifacts import data_hash
+    from model_registry import MODEL_PATHS, MODELS_DIR
+    from pricing_model import PRICING_FEATURES, PricingModel
+    from risk_analyzer import RISK_FEATURES, RISK_TARGET_MAPPING, RiskAnalyzer
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'cleaned_submissions.csv')
+DEFAULT_CV = 5
+DEFAULT_SEED = 42
+
+# Hyperparameters searched for both forests
+PARAM_GRID = {
+    'n_estimators': [100, 200, 400],
+    'max_depth': [None, 8, 16],
+    'min_samples_leaf': [1, 2, 5],
+    'max_features': ['sqrt', 0.5, 1.0],
+}
+
+# Features, target, estimator, metrics and the metric picking the best candidate
+MODEL_SPECS = {
+    'risk': {
+        'features': RISK_FEATURES,
+        'target': 'RiskCategory',
+        'target_mapping': RISK_TARGET_MAPPING,
+        'estimator': RandomForestClassifier,
+        'defaults': {'n_estimators': 100, 'max_depth': None, 'min_samples_leaf': 1, 'max_features': 'sqrt'},
+        'select': 'f1_macro',
+        'greater_is_better': True,
+    },
+    'pricing': {
+        'features': PRICING_FEATURES,
+        'target': 'PastPremium',
+        'target_mapping': None,
+        'estimator': RandomForestRegressor,
+        'defaults': {'n_estimators': 100, 'max_depth': None, 'min_samples_leaf': 1, 'max_features': 1.0},
+        'select': 'mae',
+        'greater_is_better': False,
+    },
+}
+
+
+def training_matrix(df: pd.DataFrame, name: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """Feature matrix, target and feature columns of a model, dropping rows without a target"""
+    spec = MODEL_SPECS[name]
+    features = [f for f in spec['features'] if f in df.columns]
+    if not features:
+        raise ValueError(f"No valid {name} feature columns found in DataFrame")
+    if spec['target'] not in df.columns:
+        raise ValueError(f"Target column {spec['target']} not found in DataFrame")
+
+    y = df[spec['target']]
+    if spec['target_mapping'] is not None:
+        y = y.map(spec['target_mapping'])
+    y = pd.to_numeric(y, errors='coerce')
+    mask = y.notna().to_numpy()
+    if not mask.any():
+        raise ValueError(f"No valid {name} training samples after cleaning")
+
+    # Trees split on float32, so store the matrix that way once instead of per fit
+    X = df.loc[mask, features].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float32)
+    y = y[mask].to_numpy()
+    if spec['target_mapping'] is not None:
+        y = y.astype(np.int64)
+    return np.ascontiguousarray(X), y, features
+
+
+def candidates(name: str, seed: int, max_candidates: Optional[int] = None) -> List[Dict]:
+    """Shuffled grid, starting with the parameters the models used to be trained with"""
+    defaults = MODEL_SPECS[name]['defaults']
+    grid = [params for params in ParameterGrid(PARAM_GRID) if params != defaults]
+    np.random.default_rng(seed).shuffle(grid)
+    grid = [dict(defaults)] + grid
+    return grid[:max_candidates] if max_candidates else grid
+
+
+def folds(name: str, y: np.ndarray, cv: int, seed: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Train/validation indices, stratified for the classifier when every class allows it"""
+    n_splits = min(cv, len(y))
+    if n_splits < 2:
+        raise ValueError(f"Need at least 2 rows to cross-validate the {name} model")
+    if MODEL_SPECS[name]['target_mapping'] is not None and np.unique(y, return_counts=True)[1].min() >= n_splits:
+        splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    else:
+        splitter = KFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    return list(splitter.split(np.zeros(len(y)), y))
+
+
+def score(name: str, y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
+    if MODEL_SPECS[name]['target_mapping'] is not None:
+        return {
+            'accuracy': float(accuracy_score(y_true, y_pred)),
+            'f1_macro': float(f1_score(y_true, y_pred, average='macro', zero_division=0)),
+        }
+    return {
+        'mae': float(mean_absolute_error(y_true, y_pred)),
+        'r2': float(r2_score(y_true, y_pred)) if len(y_true) > 1 else float('nan'),
+    }
+
+
+def _fit_fold(name: str, params: Dict, X: np.ndarray, y: np.ndarray,
+              train: np.ndarray, test: np.ndarray, seed: int) -> Tuple[Dict[str, float], float]:
+    # Each trial is single-threaded; the search parallelizes across trials
+    started = time.perf_counter()
+    model = MODEL_SPECS[name]['estimator'](random_state=seed, n_jobs=1, **params)
+    model.fit(X[train], y[train])
+    metrics = score(name, y[test], model.predict(X[test]))
+    return metrics, time.perf_counter() - started
+
+
+def search(name: str, X: np.ndarray, y: np.ndarray, cv: int = DEFAULT_CV, n_jobs: int = -1,
+           deadline: Optional[float] = None, seed: int = DEFAULT_SEED,
+           max_candidates: Optional[int] = None) -> List[Dict]:
+    """
+    Cross-validate candidates in rounds of parallel (candidate, fold) fits
+
+    The first round always runs. Later rounds start only if they and the
+    final refit are expected to finish before deadline (time.monotonic()),
+    so the budget should leave room for a few cross-validated fits.
+
+    Returns:
+        One entry per evaluated candidate with its params, mean and std
+        of each metric over the folds, and its total fit seconds
+    """
+    splits = folds(name, y, cv, seed)
+    grid = candidates(name, seed, max_candidates)
+    workers = effective_n_jobs(n_jobs)
+    per_round = max(1, math.ceil(workers / len(splits)))
+
+    results: List[Dict] = []
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for start in range(0, len(grid), per_round):
+            batch = grid[start:start + per_round]
+            if results and deadline is not None:
+                # Fit time grows with the number of trees
+                per_tree = max(r['round_seconds'] / r['round_trees'] for r in results)
+                round_seconds = per_tree * max(params['n_estimators'] for params in batch)
+                if time.monotonic() + round_seconds + _refit_estimate(results, len(splits)) > deadline:
+                    print(f"⏱️ Time budget reached after {len(results)} {name} candidates")
+                    break
+
+            round_started = time.monotonic()
+            outcomes = parallel(
+                delayed(_fit_fold)(name, params, X, y, train, test, seed)
+                for params in batch for train, test in splits
+            )
+            round_seconds = time.monotonic() - round_started
+
+            for i, params in enumerate(batch):
+                fold_outcomes = outcomes[i * len(splits):(i + 1) * len(splits)]
+                fold_metrics = pd.DataFrame([metrics for metrics, _ in fold_outcomes])
+                results.append({
+                    'params': params,
+                    'metrics': {metric: float(fold_metrics[metric].mean()) for metric in fold_metrics},
+                    'metrics_std': {metric: float(fold_metrics[metric].std(ddof=0)) for metric in fold_metrics},
+                    'fit_seconds': float(sum(seconds for _, seconds in fold_outcomes)),
+                    'round_seconds': round_seconds,
+                    'round_trees': max(p['n_estimators'] for p in batch),
+                })
+    return results
+
+
+def _refit_estimate(results: List[Dict], n_splits: int) -> float:
+    # A refit sees all rows, n_splits / (n_splits - 1) times a fold's training set
+    fold_seconds = max(r['fit_seconds'] for r in results) / n_splits
+    return fold_seconds * n_splits / max(n_splits - 1, 1)
+
+
+def best_candidate(name: str, results: List[Dict]) -> Dict:
+    spec = MODEL_SPECS[name]
+    values = [r['metrics'][spec['select']] for r in results]
+    values = [v if not math.isnan(v) else (-math.inf if spec['greater_is_better'] else math.inf) for v in values]
+    best = int(np.argmax(values)) if spec['greater_is_better'] else int(np.argmin(values))
+    return results[best]
+
+
+def fit_model(name: str, df: pd.DataFrame, cv: int = DEFAULT_CV, n_jobs: int = -1,
+              time_budget: Optional[float] = None, seed: int = DEFAULT_SEED,
+              max_candidates: Optional[int] = None, deadline: Optional[float] = None) -> Tuple[object, List[str], Dict]:
+    """
+    Search and refit one model, without publishing it
+
+    The feature matrix is written once as .npy and memory-mapped, so every
+    trial and worker process reads the same pages instead of its own copy.
+
+    Returns:
+        The fitted estimator, its feature columns and its metadata
+    """
+    if deadline is None and time_budget is not None:
+        deadline = time.monotonic() + time_budget
+    started = time.monotonic()
+    X, y, features = training_matrix(df, name)
+    fingerprint = data_hash(X, y, features)
+
+    with tempfile.TemporaryDirectory(prefix=f'{name}-train-') as scratch:
+        np.save(os.path.join(scratch, 'X.npy'), X)
+        np.save(os.path.join(scratch, 'y.npy'), y)
+        del X, y
+        # Copy-on-write maps share pages like read-only ones, but sklearn's
+        # missing-value checks need a writable buffer
+        X = np.load(os.path.join(scratch, 'X.npy'), mmap_mode='c')
+        y = np.load(os.path.join(scratch, 'y.npy'), mmap_mode='c')
+
+        if deadline is not None and time.monotonic() >= deadline:
+            # Out of time: refit the usual parameters without cross-validating
+            print(f"⏱️ No time left to search the {name} model, refitting its default parameters")
+            results = []
+            best = {'params': dict(MODEL_SPECS[name]['defaults']), 'metrics': {}, 'metrics_std': {}}
+        else:
+            print(f"🔎 Searching {name} model on {X.shape[0]} rows x {X.shape[1]} features")
+            results = search(name, X, y, cv=cv, n_jobs=n_jobs, deadline=deadline, seed=seed,
+                             max_candidates=max_candidates)
+            best = best_candidate(name, results)
+
+        # Refit may use every core, the search is over
+        model = MODEL_SPECS[name]['estimator'](random_state=seed, n_jobs=n_jobs, **best['params'])
+        model.fit(X, y)
+        model.n_jobs = None
+        n_rows = int(X.shape[0])
+        del X, y
+
+    version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    metadata = {
+        'version': version,
+        'model': name,
+        'params': best['params'],
+        'cv_metrics': best['metrics'],
+        'cv_metrics_std': best['metrics_std'],
+        'cv_folds': min(cv, n_rows) if results else 0,
+        'candidates_evaluated': len(results),
+        'selected_by': MODEL_SPECS[name]['select'],
+        'n_rows': n_rows,
+        'features': features,
+        'data_hash': fingerprint,
+        'trained_at': datetime.now(timezone.utc).isoformat(),
+        'training_seconds': time.monotonic() - started,
+    }
+    return model, features, metadata
+
+
+def publish_model(name: str, model, features: List[str], metadata: Dict, models_dir: str = MODELS_DIR) -> str:
+    """
+    Save an estimator as the canonical artifact of name
+
+    The artifact's arrays are written under versions/ and its manifest then
+    atomically replaces the canonical one, which the model registry
+    hot-reloads while in-flight requests finish on the old model.
+
+    Returns:
+        The manifest path
+    """
+    path = os.path.join(models_dir, os.path.basename(MODEL_PATHS[name]))
+    os.makedirs(models_dir, exist_ok=True)
+    owner = RiskAnalyzer(model_path=path) if name == 'risk' else PricingModel(model_path=path)
+    owner.model = model
+    owner.feature_columns = features
+    owner.engine = compile_forest(model)
+    owner.save_model(metadata=metadata)
+    return path
+
+
+def train_model(name: str, df: pd.DataFrame, models_dir: str = MODELS_DIR, **kwargs) -> Dict:
+    """
+    Search, refit and publish one model; see fit_model for the options
+
+    Returns:
+        The metadata saved with the artifact
+    """
+    model, features, metadata = fit_model(name, df, **kwargs)
+    path = publish_model(name, model, features, metadata, models_dir)
+
+    selected = metadata['selected_by']
+    summary = f"{selected}={metadata['cv_metrics'][selected]:.4f}" if metadata['cv_metrics'] else "not cross-validated"
+    print(f"✅ {name} model {metadata['version']} saved to {path} ({summary})")
+    return metadata
+
+
+def train_models(df: pd.DataFrame, names: List[str] = ('risk', 'pricing'), time_budget: Optional[float] = None,
+                 **kwargs) -> Dict[str, Dict]:
+    """Train several models in order, splitting what is left of the time budget evenly among those remaining"""
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    trained = {}
+    for i, name in enumerate(names):
+        share = None
+        if deadline is not None:
+            now = time.monotonic()
+            share = now + max(deadline - now, 0) / (len(names) - i)
+        trained[name] = train_model(name, df, deadline=share, **kwargs)
+    return trained
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Dict]:
+    parser = argparse.ArgumentParser(description="Train the risk and pricing models with a cross-validated search")
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH, help="Cleaned submissions CSV")
+    parser.add_argument('--models', nargs='+', choices=sorted(MODEL_SPECS), default=['risk', 'pricing'])
+    parser.add_argument('--models-dir', default=MODELS_DIR, help="Directory of the canonical artifacts")
+    parser.add_argument('--cv', type=int, default=DEFAULT_CV, help="Cross-validation folds")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Parallel fits (-1 for all cores)")
+    parser.add_argument('--time-budget', type=float, default=None, help="Seconds for the whole run")
+    parser.add_argument('--max-candidates', type=int, default=None, help="Cap on hyperparameter candidates per model")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    columns = set(RISK_FEATURES) | set(PRICING_FEATURES) | {spec['target'] for spec in MODEL_SPECS.values()}
+    df = pd.read_csv(args.data, usecols=lambda column: column in columns)
+    print(f"📂 Loaded {len(df)} rows from {args.data}")
+
+    return train_models(df, args.models, time_budget=args.time_budget, models_dir=args.models_dir,
+                        cv=args.cv, n_jobs=args.n_jobs, seed=args.seed, max_candidates=args.max_candidates)
+
+
+if __name__ == '__main__':
+    main()
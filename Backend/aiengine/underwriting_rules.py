@@ -0,0 +1,290 @@
+import copy
+import json
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Underwriting rules of the message parser, as data. Keyword rules match
+# case-insensitive substrings of a text column: 'first' rules take the
+# multiplier of the first matching entry (an if/elif ladder), 'product' rules
+# multiply every matching entry. Blank or 'Not Found' text gets 'missing'.
+DEFAULT_UNDERWRITING_RULES = {
+    'multipliers': {
+        'GeographyRiskMultiplier': {
+            'column': 'Geography',
+            'match': 'first',
+            'rules': [
+                {'terms': ['california', 'florida', 'japan', 'philippines'], 'multiplier': 1.3},
+                {'terms': ['texas', 'louisiana', 'italy', 'turkey'], 'multiplier': 1.2},
+                {'terms': ['midwest', 'canada', 'uk', 'germany'], 'multiplier': 1.0},
+            ],
+            'default': 1.1,
+            'missing': 1.0,
+        },
+        'PerilRiskMultiplier': {
+            'column': 'PerilsCovered',
+            'match': 'product',
+            'rules': [
+                {'terms': ['earthquake'], 'multiplier': 1.4},
+                {'terms': ['hurricane', 'windstorm'], 'multiplier': 1.3},
+                {'terms': ['flood'], 'multiplier': 1.2},
+                {'terms': ['terrorism'], 'multiplier': 1.3},
+            ],
+            'default': 1.0,
+            'missing': 1.0,
+            'cap': 2.0,
+        },
+        'BusinessRiskMultiplier': {
+            'column': 'Occupation',
+            'match': 'first',
+            'rules': [
+                {'terms': ['chemical', 'petrochemical', 'oil', 'gas'], 'multiplier': 1.5},
+                {'terms': ['manufacturing', 'mining', 'construction'], 'multiplier': 1.3},
+                {'terms': ['technology', 'software', 'office'], 'multiplier': 0.8},
+                {'terms': ['retail', 'wholesale', 'distribution'], 'multiplier': 0.9},
+            ],
+            'default': 1.0,
+            'missing': 1.0,
+        },
+    },
+
+    # Risk score points, summed in order and capped at score_cap. A component
+    # scores (value - offset), or (offset - value) with 'below', times 'scale'
+    # or divided by 'divisor', capped at 'cap'; only when the value is above
+    # or below its threshold if one is given.
+    'score_components': [
+        {'column': 'GeographyRiskMultiplier', 'default': 1.0, 'offset': 0.8, 'scale': 4, 'cap': 2.0},
+        {'column': 'PerilRiskMultiplier', 'default': 1.0, 'offset': 0.8, 'scale': 2, 'cap': 2.0},
+        {'column': 'BusinessRiskMultiplier', 'default': 1.0, 'offset': 0.8, 'scale': 3, 'cap': 1.5},
+        {'column': 'AverageLossRatio', 'default': 0, 'above': 0, 'offset': 0, 'divisor': 50000000, 'cap': 2.0},
+        {'column': 'ClaimRatio', 'default': 0, 'above': 60, 'offset': 60, 'divisor': 20, 'cap': 2.0},
+        {'column': 'DataCompleteness', 'default': 100, 'below': 70, 'offset': 70, 'divisor': 40},
+    ],
+    'score_cap': 10.0,
+
+    # Ratings and decisions by the first band whose max_score the score does not exceed
+    'ratings': [
+        {'max_score': 3, 'rating': 'Low Risk'},
+        {'max_score': 6, 'rating': 'Moderate Risk'},
+        {'max_score': 8, 'rating': 'High Risk'},
+    ],
+    'default_rating': 'Very High Risk',
+    'decisions': [
+        {'max_score': 3, 'action': 'Accept',
+         'reason': 'Low risk profile with acceptable exposure',
+         'pricing_adjustment': 0.0, 'notes': 'Standard terms acceptable'},
+        {'max_score': 5, 'action': 'Accept with Conditions',
+         'reason': 'Moderate risk - acceptable with pricing adjustment',
+         'pricing_adjustment': 15.0, 'notes': 'Recommend 15% pricing increase'},
+        {'max_score': 7, 'action': 'Refer to Senior Underwriter',
+         'reason': 'High risk profile requires senior review',
+         'pricing_adjustment': 25.0, 'notes': 'Consider 25% pricing increase and additional terms'},
+    ],
+    'default_decision': {'action': 'Decline',
+                         'reason': 'Risk profile exceeds acceptable thresholds',
+                         'pricing_adjustment': 0.0, 'notes': 'Risk too high for standard acceptance'},
+
+    # Submissions below min_completeness are sent back for the missing fields instead
+    'insufficient_data': {
+        'column': 'DataCompleteness', 'default': 0, 'min_completeness': 50,
+        'action': 'Request More Information',
+        'reason': 'Insufficient data for proper risk assessment',
+    },
+    'required_fields': {
+        'Cedant': 'Ceding company information',
+        'Insured': 'Insured party details',
+        'Geography': 'Geographic scope',
+        'PerilsCovered': 'Perils and coverage scope',
+        'SumInsured': 'Sum insured amount',
+        'PeriodOfInsurance': 'Insurance period',
+    },
+
+    # Notes appended to decided submissions
+    'note_rules': [
+        {'column': 'ClaimRatio', 'default': 0, 'above': 80,
+         'note': ' | High claims history - consider exclusions'},
+        {'column': 'LossHistoryTrend', 'equals': 'Increasing',
+         'note': ' | Increasing loss trend - monitor closely'},
+    ],
+}
+
+DECISION_COLUMNS = ['RecommendedAction', 'UnderwriterNotes', 'PricingAdjustment',
+                    'RequiredInformation', 'DecisionReason']
+
+
+class UnderwritingRuleEngine:
+    """
+    Re-scores and re-decides a table of structured submissions in one pass.
+
+    The rules are a JSON-serialisable dict (see DEFAULT_UNDERWRITING_RULES)
+    compiled into column operations. The message parser scores and decides
+    each new submission with the same engine on a one-row frame, so edited
+    rules apply alike to ingestion and re-scoring. Keyword rules are
+    evaluated once per distinct text value.
+    """
+
+    def __init__(self, rules: Optional[Dict] = None):
+        self.rules = copy.deepcopy(rules if rules is not None else DEFAULT_UNDERWRITING_RULES)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'UnderwritingRuleEngine':
+        """Load rules saved as JSON"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def save(self, path: str):
+        """Save the rules as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.rules, f, indent=2)
+
+    def multipliers(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Geography, peril and business risk multipliers from the submission text columns"""
+        return pd.DataFrame({
+            name: self._keyword_multiplier(self._column(df, spec['column'], None), spec)
+            for name, spec in self.rules['multipliers'].items()
+        }, index=df.index)
+
+    def multiplier(self, name: str, text) -> float:
+        """One submission's multiplier, e.g. multiplier('GeographyRiskMultiplier', 'Florida, USA')"""
+        spec = self.rules['multipliers'][name]
+        return float(self._keyword_multiplier(pd.Series([text], dtype=object), spec)[0])
+
+    def risk_scores(self, df: pd.DataFrame) -> pd.Series:
+        """Risk score (0-10 scale) of every submission"""
+        score = np.zeros(len(df))
+        for component in self.rules['score_components']:
+            value = self._numeric(df, component['column'], component['default'])
+            if 'below' in component:
+                delta = component['offset'] - value
+                applies = value < component['below']
+            else:
+                delta = value - component['offset']
+                applies = value > component['above'] if 'above' in component else np.ones(len(df), dtype=bool)
+            points = delta * component['scale'] if 'scale' in component else delta / component['divisor']
+            if component.get('cap') is not None:
+                points = np.minimum(points, component['cap'])
+            score = np.where(applies, score + points, score)
+        return pd.Series(np.minimum(score, self.rules['score_cap']), index=df.index, name='RiskScore')
+
+    def risk_ratings(self, scores: pd.Series) -> pd.Series:
+        """Risk rating band of every score"""
+        bands = self.rules['ratings']
+        values = np.asarray(scores, dtype=float)
+        rating = np.select([values <= band['max_score'] for band in bands],
+                           [band['rating'] for band in bands], self.rules['default_rating'])
+        return pd.Series(rating, index=scores.index, name='RiskRating', dtype=object)
+
+    def decisions(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Recommended action, notes, pricing adjustment and reasons from each submission's RiskScore"""
+        score = self._numeric(df, 'RiskScore', 0)
+        bands = self.rules['decisions'] + [dict(self.rules['default_decision'], max_score=np.inf)]
+        band = np.select([score <= b['max_score'] for b in bands[:-1]], np.arange(len(bands) - 1), len(bands) - 1)
+
+        action = np.array([b['action'] for b in bands], dtype=object)[band]
+        reason = np.array([b['reason'] for b in bands], dtype=object)[band]
+        pricing = np.array([b['pricing_adjustment'] for b in bands], dtype=float)[band]
+        notes = pd.Series(np.array([b['notes'] for b in bands], dtype=object)[band], index=df.index)
+        for rule in self.rules['note_rules']:
+            if 'equals' in rule:
+                matches = self._column(df, rule['column'], None).eq(rule['equals']).to_numpy()
+            else:
+                matches = self._numeric(df, rule['column'], rule['default']) > rule['above']
+            notes[matches] = notes[matches] + rule['note']
+
+        # Incomplete submissions skip the risk-based decision entirely
+        insufficient = self.rules['insufficient_data']
+        incomplete = self._numeric(df, insufficient['column'], insufficient['default']) < insufficient['min_completeness']
+        action[incomplete] = insufficient['action']
+        reason[incomplete] = insufficient['reason']
+        pricing[incomplete] = 0.0
+        notes[incomplete] = ''
+        required = self._missing_information(df, incomplete)
+
+        return pd.DataFrame({
+            'RecommendedAction': action,
+            'UnderwriterNotes': notes.to_numpy(dtype=object),
+            'PricingAdjustment': pricing,
+            'RequiredInformation': required,
+            'DecisionReason': reason,
+        }, index=df.index)
+
+    def apply(self, df: pd.DataFrame, rescore_multipliers: bool = True) -> pd.DataFrame:
+        """
+        Re-score and re-decide a submissions table
+
+        Args:
+            df: Structured submissions, one row per submission
+            rescore_multipliers: Recompute the risk multipliers from the text
+                columns instead of using the stored ones
+
+        Returns:
+            Copy of df with multipliers, RiskScore, RiskRating and decision columns updated
+        """
+        result = df.copy()
+        if rescore_multipliers:
+            multipliers = self.multipliers(result)
+            for column in multipliers.columns:
+                result[column] = multipliers[column]
+        result['RiskScore'] = self.risk_scores(result)
+        result['RiskRating'] = self.risk_ratings(result['RiskScore'])
+        decisions = self.decisions(result)
+        for column in DECISION_COLUMNS:
+            result[column] = decisions[column]
+        return result
+
+    def _keyword_multiplier(self, text: pd.Series, spec: Dict) -> np.ndarray:
+        """Multiplier of each text value, evaluating the keyword rules on distinct values only"""
+        codes, uniques = pd.factorize(text)
+        lowered = pd.Series(uniques, dtype=object).map(lambda value: value.lower() if isinstance(value, str) else '')
+        hits = [np.logical_or.reduce([lowered.str.contains(term, regex=False).to_numpy(dtype=bool)
+                                      for term in rule['terms']] + [np.zeros(len(uniques), dtype=bool)])
+                for rule in spec['rules']]
+
+        if spec['match'] == 'product':
+            values = np.full(len(uniques), float(spec['default']))
+            for rule, hit in zip(spec['rules'], hits):
+                values = np.where(hit, values * rule['multiplier'], values)
+        else:
+            values = np.select(hits, [rule['multiplier'] for rule in spec['rules']], spec['default']) \
+                if hits else np.full(len(uniques), float(spec['default']))
+        if spec.get('cap') is not None:
+            values = np.minimum(values, spec['cap'])
+
+        # Blank and 'Not Found' values, and missing ones (code -1), are not scored
+        blank = pd.Series(uniques, dtype=object).map(lambda value: not value or value == 'Not Found').to_numpy(dtype=bool)
+        values = np.append(np.where(blank, spec['missing'], values).astype(float), spec['missing'])
+        return values[codes]
+
+    def _missing_information(self, df: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+        """Descriptions of the required fields each selected submission lacks, an empty list for the others"""
+        fields = self.rules['required_fields']
+        bits = np.zeros(len(df), dtype=np.int64)
+        for i, field in enumerate(fields):
+            if field in df.columns:
+                values = df[field]
+                missing = ~values.to_numpy(dtype=object).astype(bool) | values.eq('Not Found').to_numpy(dtype=bool)
+            else:
+                missing = np.ones(len(df), dtype=bool)
+            bits |= (missing & rows).astype(np.int64) << i
+
+        # One list per distinct combination of missing fields, copied to its rows
+        descriptions = list(fields.values())
+        masks, inverse = np.unique(bits, return_inverse=True)
+        lists = [[d for i, d in enumerate(descriptions) if mask >> i & 1] for mask in masks]
+        required = np.empty(len(df), dtype=object)
+        for row, position in enumerate(inverse.ravel()):
+            required[row] = list(lists[position])
+        return required
+
+    @staticmethod
+    def _column(df: pd.DataFrame, column: str, default) -> pd.Series:
+        if column in df.columns:
+            return df[column]
+        return pd.Series(default, index=df.index, dtype=object)
+
+    @staticmethod
+    def _numeric(df: pd.DataFrame, column: str, default) -> np.ndarray:
+        if column not in df.columns:
+            return np.full(len(df), float(default))
+        return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
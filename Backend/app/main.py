@@ -1,7 +1,10 @@
+from typing import Any, Dict, List, Union
+
 from fastapi import FastAPI
 from app.routers import submissions, portfolio, analysis
 from app.models.database import Base, engine
-from aiengine.risk_analyzer import initialize_risk_analyzer
+from aiengine.model_registry import get_registry
+from aiengine.inference_dispatcher import get_dispatcher, risk_scorer
 
 app = FastAPI(
     title="ReSure-AI API",
@@ -16,17 +19,19 @@ app.include_router(submissions.router, prefix="/submissions", tags=["Submissions
 app.include_router(portfolio.router, prefix="/portfolio", tags=["Portfolio"])  
 app.include_router(analysis.router, prefix="/analysis", tags=["Analysis"])
 
-# Initialize analyzer (no training or batch processing)
-analyzer = None
-try:
-    analyzer = initialize_risk_analyzer("aiengine/models/risk_model.pkl")
-    if analyzer.model is not None:
-        print("Risk analyzer loaded successfully")
-        print(f"Model features: {analyzer.feature_columns}")
-    else:
-        print("Warning: No trained model found. Run 'python train.py' first.")
-except Exception as e:
-    print(f"Warning: Could not load risk analyzer: {e}")
+# Models are shared with the routers and loaded on first use
+registry = get_registry()
+# Concurrent single-row requests are scored together
+risk_dispatcher = get_dispatcher("risk")
+
+
+def get_analyzer():
+    """Shared risk analyzer, or None when no trained model is available"""
+    try:
+        return registry.get("risk")
+    except Exception as e:
+        print(f"Warning: Could not load risk analyzer: {e}")
+        return None
 
 @app.get("/")
 def root():
@@ -34,24 +39,52 @@ def root():
 
 @app.get("/health")
 def health_check():
+    analyzer = get_analyzer()
     return {
         "status": "healthy",
-        "model_loaded": analyzer is not None and analyzer.model is not None
+        "model_loaded": analyzer is not None and analyzer.is_loaded,
+        "models": registry.status()
     }
 
 @app.post("/predict-risk")
 async def predict_risk(submission: dict):
     """Predict risk for a submission"""
-    if analyzer is None or analyzer.model is None:
+    analyzer = get_analyzer()
+    if analyzer is None or not analyzer.is_loaded:
         return {"error": "Risk model not available. Train the model first."}
     
     try:
-        prediction = analyzer.predict(submission)
-        probabilities = analyzer.predict_proba(submission)
+        prediction = await risk_dispatcher.apredict(submission)
         return {
-            "predicted_risk": prediction,
-            "probabilities": probabilities,
+            "predicted_risk": prediction["predicted_risk"],
+            "probabilities": prediction["probabilities"],
             "model_features": analyzer.feature_columns
         }
     except Exception as e:
-        return {"error": f"Prediction failed: {str(e)}"}
\ No newline at end of file
+        return {"error": f"Prediction failed: {str(e)}"}
+
+@app.post("/predict-risk/batch")
+def predict_risk_batch(submissions: Union[List[Dict[str, Any]], Dict[str, List[Any]]]):
+    """Predict risk for many submissions, given as a list of records or as columns"""
+    # A plain def runs in FastAPI's threadpool, so the forest pass does not block the event loop
+    analyzer = get_analyzer()
+    if analyzer is None or not analyzer.is_loaded:
+        return {"error": "Risk model not available. Train the model first."}
+    
+    try:
+        predictions = risk_scorer(registry)(submissions)
+        return {
+            "predictions": predictions,
+            "count": len(predictions),
+            "model_features": analyzer.feature_columns
+        }
+    except Exception as e:
+        return {"error": f"Batch prediction failed: {str(e)}"}
+
+
+@app.get("/inference-metrics")
+def inference_metrics():
+    """Batch size, queue wait and model time of the inference dispatchers, and prediction cache counters"""
+    metrics = {name: get_dispatcher(name).metrics() for name in ("risk", "pricing", "analysis")}
+    metrics["cache"] = registry.cache.stats()
+    return metrics
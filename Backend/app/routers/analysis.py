@@ -1,9 +1,11 @@
 # app/routers/analysis.py
-from fastapi import APIRouter
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Query
 import pandas as pd
 import os
-from aiengine.risk_analyzer import RiskAnalyzer
-from aiengine.pricing_model import PricingModel
+from aiengine.inference_dispatcher import get_dispatcher
+from aiengine.model_registry import get_registry
 from aiengine.portfolio_optimizer import PortfolioOptimizer
 
 router = APIRouter(prefix="/analysis", tags=["Analysis"])
@@ -15,19 +17,64 @@ async def analyze_risk(submission: dict):
     """
     Run risk classification on a single submission.
     """
-    model = RiskAnalyzer()
-    category = model.predict(submission)
-    return {"risk_category": category}
+    try:
+        # Concurrent requests are scored together, off the event loop
+        prediction = await get_dispatcher("risk").apredict(submission)
+    except ValueError as e:
+        return {"error": str(e)}
+    return {"risk_category": prediction["predicted_risk"]}
+
+@router.post("/explain")
+def explain_risk(submission: dict, top_n: Optional[int] = None):
+    """
+    Risk category of a single submission and each feature's contribution to it.
+    """
+    model = get_registry().get("risk")
+    try:
+        return model.explain(submission, top_n=top_n)
+    except ValueError as e:
+        return {"error": str(e)}
+
+@router.post("/explain/batch")
+def explain_risks(submissions: List[Dict[str, Any]]):
+    """
+    Per-feature contributions to the risk category of many submissions, e.g. for reports.
+    """
+    model = get_registry().get("risk")
+    try:
+        explanations = model.explain_batch(submissions)
+    except ValueError as e:
+        return {"error": str(e)}
+    return {"explanations": explanations.to_dict("records"), "count": len(explanations)}
 
 @router.post("/premium")
-async def suggest_premium(submission: dict):
+def suggest_premium(submission: dict, quantiles: Optional[List[float]] = Query(None)):
     """
     Suggest fair premium for a single submission.
+    With ?quantiles=0.1&quantiles=0.9, also a PremiumRange such as {"P10", "P90"}.
     """
-    model = PricingModel()
-    premium = model.suggest(submission)
+    try:
+        if quantiles is None:
+            # Concurrent requests are scored together
+            premium = get_dispatcher("pricing").predict(submission)
+        else:
+            premium = get_registry().get("pricing").suggest(submission, quantiles=quantiles)
+    except ValueError as e:
+        return {"error": str(e)}
     return {"suggested_premium": premium}
 
+@router.post("/premium/batch")
+def suggest_premiums(submissions: List[Dict[str, Any]], quantiles: Optional[List[float]] = Query(None)):
+    """
+    Suggest premiums, and optional quantile ranges, for many submissions with one model call.
+    """
+    model = get_registry().get("pricing")
+    try:
+        premiums = model.suggest_batch(submissions, quantiles=quantiles)
+    except ValueError as e:
+        return {"error": str(e)}
+    return {"suggested_premiums": premiums.to_dict("records"), "count": len(premiums)}
+
 @router.post("/portfolio")
 async def optimize_portfolio():
     """
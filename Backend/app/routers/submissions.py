@@ -1,4 +1,6 @@
 # app/routers/submissions.py
+from typing import List
+
 from fastapi import APIRouter
 from pydantic import BaseModel
 from app.services.ai_service import AIService
@@ -13,14 +15,22 @@ class SubmissionInput(BaseModel):
     LossSeverity: float
     PremiumRate: float
     NormalizedRiskScore: float
+    LossTrendSlope: float = 0.0
+    LossVolatility: float = 0.0
     # Add any other fields your models require
 
 @router.post("/analyze")
 def analyze_submission(submission: SubmissionInput):
-    sub_dict = submission.dict()
-    risk = ai_service.predict_risk(sub_dict)
-    premium = ai_service.suggest_premium(sub_dict)
-    return {"RiskCategory": risk, "SuggestedPremium": premium}
+    result = ai_service.analyze(submission.dict())
+    return {
+        "RiskCategory": result["RiskCategory"],
+        "RiskProbabilities": result["RiskProbabilities"],
+        "SuggestedPremium": {"Premium": result["SuggestedPremium"], "Decision": result["Decision"]}
+    }
+
+@router.post("/analyze/batch")
+def analyze_submissions(submissions: List[SubmissionInput]):
+    return {"results": ai_service.analyze_batch([s.dict() for s in submissions])}
 
 @router.get("/portfolio")
 def portfolio_report():
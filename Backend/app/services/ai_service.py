@@ -1,8 +1,12 @@
 # aiengine/ai_service.py
 import os
+from typing import Iterable, Iterator, Union
+
 import pandas as pd
-from aiengine.pricing_model import PricingModel
-from aiengine.risk_analyzer import RiskAnalyzer
+from aiengine.model_registry import ModelRegistry, get_registry
+from aiengine.inference_dispatcher import InferenceDispatcher, analysis_lookup, analysis_scorer, get_dispatcher
+from aiengine.inference_pipeline import InferencePipeline
+from aiengine.retraining import RetrainingManager
 from app.models.portfolio import PortfolioAnalytics  # Your portfolio module
 
 class AIService:
@@ -13,12 +17,23 @@ class AIService:
     - Portfolio analytics
     """
 
-    def __init__(self, cleaned_data_path="aiengine/data/cleaned_submissions.csv"):
+    def __init__(self, cleaned_data_path="aiengine/data/cleaned_submissions.csv",
+                 registry: ModelRegistry = None, retraining: RetrainingManager = None):
         self.cleaned_data_path = cleaned_data_path
+        # Opt-in: when set, process_submissions keeps scored batches for the next retraining.
+        # The API's own service is created without one, as its endpoints see no true targets.
+        self.retraining = retraining
 
-        # Initialize models
-        self.risk_model = RiskAnalyzer(model_path="aiengine/models/risk_model.pkl")
-        self.pricing_model = PricingModel(model_path="aiengine/models/pricing_model.pkl")
+        # Models are shared through the registry and loaded on first use
+        self.registry = registry or get_registry()
+        # Both models from one feature pass
+        self.pipeline = InferencePipeline(self.registry)
+        # Single-row predictions from concurrent requests are micro-batched
+        if registry is None:
+            self.analysis_dispatcher = get_dispatcher("analysis")
+        else:
+            self.analysis_dispatcher = InferenceDispatcher(analysis_scorer(registry), name="analysis",
+                                                           lookup=analysis_lookup(registry))
         self.portfolio_model = PortfolioAnalytics()  # assume it has analyze(df) method
 
         # Load cleaned data if exists
@@ -27,19 +42,22 @@ class AIService:
             self.cleaned_df = pd.read_csv(self.cleaned_data_path)
             print(f"📂 Loaded cleaned dataset with {len(self.cleaned_df)} rows and {len(self.cleaned_df.columns)} columns")
 
-    # ---------------- Risk Analysis ----------------
-    def predict_risk(self, submission: dict):
-        """Predict risk category for a single submission"""
-        if not self.risk_model.model:
-            self.risk_model.load_model()
-        return self.risk_model.predict(pd.DataFrame([submission]))[0]
+    @property
+    def risk_model(self):
+        return self.registry.get("risk")
+
+    @property
+    def pricing_model(self):
+        return self.registry.get("pricing")
+
+    # ---------------- Combined Analysis ----------------
+    def analyze(self, submission: dict) -> dict:
+        """Risk category, probabilities, premium and decision for one submission"""
+        return self.analysis_dispatcher.predict(submission)
 
-    # ---------------- Premium Suggestion ----------------
-    def suggest_premium(self, submission: dict):
-        """Suggest premium for a single submission"""
-        if not self.pricing_model.model:
-            self.pricing_model.load_model()
-        return self.pricing_model.suggest(submission)
+    def analyze_batch(self, submissions: list) -> list:
+        """Risk category, probabilities, premium and decision for many submissions in one pass"""
+        return self.pipeline.run(submissions)
 
     # ---------------- Portfolio Analytics ----------------
     def portfolio_report(self):
@@ -50,8 +68,30 @@ class AIService:
 
     # ---------------- Batch Processing ----------------
     def process_submissions(self, df: pd.DataFrame):
-        """Add risk category and suggested premium columns to a dataframe"""
+        """Add risk category, suggested premium and pricing decision columns to a dataframe"""
+        # One feature pass and one call per model over the whole frame
+        scored = self.pipeline.score(df)
+        if self.retraining is not None:
+            # Keep the submissions as given: a known RiskCategory is a training target, a prediction is not
+            self.retraining.record(df)
+            self.retraining.trigger()
         df = df.copy()
-        df["RiskCategory"] = df.apply(lambda row: self.predict_risk(row.to_dict()), axis=1)
-        df["SuggestedPremium"] = df.apply(lambda row: self.suggest_premium(row.to_dict()), axis=1)
+        for column in ("RiskCategory", "SuggestedPremium", "PricingDecision"):
+            df[column] = scored[column].to_numpy()
         return df
+
+    def process_submissions_chunked(self, source: Union[str, Iterable[pd.DataFrame]],
+                                    chunksize: int = 50000) -> Iterator[pd.DataFrame]:
+        """
+        Score a submissions file too big for memory, one chunk at a time
+
+        Args:
+            source: CSV path, or an iterable of dataframes
+            chunksize: Rows per chunk when reading a CSV
+
+        Yields:
+            Each chunk with the process_submissions columns added
+        """
+        chunks = pd.read_csv(source, chunksize=chunksize) if isinstance(source, str) else source
+        for chunk in chunks:
+            yield self.process_submissions(chunk)
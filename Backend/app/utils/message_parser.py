@@ -13,6 +13,9 @@ import mammoth
 import io
 import base64
 
+from aiengine.fx_rates import FxRateStore
+from aiengine.underwriting_rules import UnderwritingRuleEngine
+
 warnings.filterwarnings('ignore')
 
 class IntegratedReinsuranceProcessor:
@@ -21,8 +24,15 @@ class IntegratedReinsuranceProcessor:
     and decision making capabilities
     """
     
-    def __init__(self, base_dir: str = None):
-        """Initialize the integrated processor"""
+    def __init__(self, base_dir: str = None, rules_path: str = None):
+        """
+        Initialize the integrated processor
+
+        Args:
+            base_dir: Directory for attachments and structured data
+            rules_path: Underwriting rules saved as JSON (see UnderwritingRuleEngine.save);
+                the default rules when not given
+        """
         self.base_dir = base_dir or os.path.dirname(__file__)
         self.attachments_dir = os.path.join(self.base_dir, "attachments")
         self.structured_data_dir = os.path.join(self.base_dir, "structured_data")
@@ -31,11 +41,13 @@ class IntegratedReinsuranceProcessor:
         os.makedirs(self.attachments_dir, exist_ok=True)
         os.makedirs(self.structured_data_dir, exist_ok=True)
         
-        # Currency exchange rates
-        self.currency_rates = {
-            'USD': 1.0, 'EUR': 1.08, 'GBP': 1.27, 'JPY': 0.0067,
-            'CAD': 0.74, 'AUD': 0.65, 'KES': 0.0077, 'ZAR': 0.055
-        }
+        # Dated exchange rates shared with the cleaning pipeline
+        self.fx_rates = FxRateStore.load()
+        self.currency_rates = self.fx_rates.latest_rates()
+        
+        # Underwriting rules behind both the per-submission decisions and re-deciding the book
+        self.underwriting_rules = (UnderwritingRuleEngine.from_file(rules_path) if rules_path
+                                   else UnderwritingRuleEngine())
         
         # Comprehensive field mappings for reinsurance data extraction
         self.field_mappings = {
@@ -852,12 +864,12 @@ class IntegratedReinsuranceProcessor:
         
         return 0.0
 
-    def convert_to_usd(self, amount: float, currency: str = 'USD') -> float:
-        """Convert amount to USD using exchange rates"""
+    def convert_to_usd(self, amount: float, currency: str = 'USD', as_of=None) -> float:
+        """Convert amount to USD at the latest rate on or before as_of (default: latest rates)"""
         if amount == 0:
             return 0.0
         
-        rate = self.currency_rates.get(currency.upper(), 1.0)
+        rate, _ = self.fx_rates.rate(currency, as_of)
         return amount * rate
 
     def get_loss_history_years(self, attachment_data: Dict) -> int:
@@ -923,59 +935,15 @@ class IntegratedReinsuranceProcessor:
 
     def get_geography_risk(self, geography: str) -> float:
         """Get risk multiplier based on geography"""
-        if not geography or geography == 'Not Found':
-            return 1.0
-        
-        geography_lower = geography.lower()
-        
-        # High-risk areas
-        if any(region in geography_lower for region in ['california', 'florida', 'japan', 'philippines']):
-            return 1.3
-        elif any(region in geography_lower for region in ['texas', 'louisiana', 'italy', 'turkey']):
-            return 1.2
-        elif any(region in geography_lower for region in ['midwest', 'canada', 'uk', 'germany']):
-            return 1.0
-        else:
-            return 1.1  # Default for unknown regions
+        return self.underwriting_rules.multiplier('GeographyRiskMultiplier', geography)
 
     def get_peril_risk(self, perils: str) -> float:
         """Get risk multiplier based on perils covered"""
-        if not perils or perils == 'Not Found':
-            return 1.0
-        
-        perils_lower = perils.lower()
-        multiplier = 1.0
-        
-        # High-risk perils
-        if 'earthquake' in perils_lower:
-            multiplier *= 1.4
-        if 'hurricane' in perils_lower or 'windstorm' in perils_lower:
-            multiplier *= 1.3
-        if 'flood' in perils_lower:
-            multiplier *= 1.2
-        if 'terrorism' in perils_lower:
-            multiplier *= 1.3
-        
-        return min(multiplier, 2.0)  # Cap at 2.0
+        return self.underwriting_rules.multiplier('PerilRiskMultiplier', perils)
 
     def get_business_risk(self, occupation: str) -> float:
         """Get risk multiplier based on business type"""
-        if not occupation or occupation == 'Not Found':
-            return 1.0
-        
-        occupation_lower = occupation.lower()
-        
-        # High-risk businesses
-        if any(term in occupation_lower for term in ['chemical', 'petrochemical', 'oil', 'gas']):
-            return 1.5
-        elif any(term in occupation_lower for term in ['manufacturing', 'mining', 'construction']):
-            return 1.3
-        elif any(term in occupation_lower for term in ['technology', 'software', 'office']):
-            return 0.8
-        elif any(term in occupation_lower for term in ['retail', 'wholesale', 'distribution']):
-            return 0.9
-        else:
-            return 1.0
+        return self.underwriting_rules.multiplier('BusinessRiskMultiplier', occupation)
 
     def calculate_data_completeness(self, body_data: Dict, attachment_data: Dict) -> float:
         """Calculate data completeness percentage"""
@@ -1013,14 +981,7 @@ class IntegratedReinsuranceProcessor:
         structured_row['RiskScore'] = risk_score
         
         # Determine risk rating
-        if risk_score <= 3:
-            risk_rating = 'Low Risk'
-        elif risk_score <= 6:
-            risk_rating = 'Moderate Risk'
-        elif risk_score <= 8:
-            risk_rating = 'High Risk'
-        else:
-            risk_rating = 'Very High Risk'
+        risk_rating = self.underwriting_rules.risk_ratings(pd.Series([risk_score])).iloc[0]
         
         structured_row['RiskRating'] = risk_rating
         
@@ -1036,115 +997,33 @@ class IntegratedReinsuranceProcessor:
 
     def calculate_risk_score(self, row: Dict[str, Any]) -> float:
         """Calculate overall risk score (0-10 scale)"""
-        score = 0.0
-        
-        # Geography risk (0-2 points)
-        geo_multiplier = row.get('GeographyRiskMultiplier', 1.0)
-        score += min((geo_multiplier - 0.8) * 4, 2.0)
-        
-        # Peril risk (0-2 points)
-        peril_multiplier = row.get('PerilRiskMultiplier', 1.0)
-        score += min((peril_multiplier - 0.8) * 2, 2.0)
-        
-        # Business risk (0-1.5 points)
-        business_multiplier = row.get('BusinessRiskMultiplier', 1.0)
-        score += min((business_multiplier - 0.8) * 3, 1.5)
-        
-        # Loss history risk (0-2 points)
-        avg_loss_ratio = row.get('AverageLossRatio', 0)
-        if avg_loss_ratio > 0:
-            score += min(avg_loss_ratio / 50000000, 2.0)  # Assuming losses in dollars
-        
-        # Claims ratio risk (0-2 points)
-        claim_ratio = row.get('ClaimRatio', 0)
-        if claim_ratio > 60:
-            score += min((claim_ratio - 60) / 20, 2.0)
-        
-        # Data completeness penalty (0-0.5 points)
-        completeness = row.get('DataCompleteness', 100)
-        if completeness < 70:
-            score += (70 - completeness) / 40  # 0.5 points if 50% complete
-        
-        return min(score, 10.0)
+        # Same rules, and code, as re-scoring the whole book
+        return float(self.underwriting_rules.risk_scores(pd.DataFrame([row])).iloc[0])
 
     def make_underwriting_decision(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """Make underwriting decision based on risk analysis"""
-        risk_score = row.get('RiskScore', 0)
-        data_completeness = row.get('DataCompleteness', 0)
-        claim_ratio = row.get('ClaimRatio', 0)
-        
-        decision = {
-            'RecommendedAction': 'Pending Review',
-            'UnderwriterNotes': '',
-            'PricingAdjustment': 0.0,
-            'RequiredInformation': [],
-            'DecisionReason': ''
-        }
-        
-        # Check data completeness first
-        if data_completeness < 50:
-            decision.update({
-                'RecommendedAction': 'Request More Information',
-                'DecisionReason': 'Insufficient data for proper risk assessment',
-                'RequiredInformation': self.get_missing_information(row)
-            })
-            return decision
-        
-        # Risk-based decisions
-        if risk_score <= 3:
-            decision.update({
-                'RecommendedAction': 'Accept',
-                'DecisionReason': 'Low risk profile with acceptable exposure',
-                'PricingAdjustment': 0.0,
-                'UnderwriterNotes': 'Standard terms acceptable'
-            })
-        elif risk_score <= 5:
-            decision.update({
-                'RecommendedAction': 'Accept with Conditions',
-                'DecisionReason': 'Moderate risk - acceptable with pricing adjustment',
-                'PricingAdjustment': 15.0,
-                'UnderwriterNotes': 'Recommend 15% pricing increase'
-            })
-        elif risk_score <= 7:
-            decision.update({
-                'RecommendedAction': 'Refer to Senior Underwriter',
-                'DecisionReason': 'High risk profile requires senior review',
-                'PricingAdjustment': 25.0,
-                'UnderwriterNotes': 'Consider 25% pricing increase and additional terms'
-            })
-        else:
-            decision.update({
-                'RecommendedAction': 'Decline',
-                'DecisionReason': 'Risk profile exceeds acceptable thresholds',
-                'UnderwriterNotes': 'Risk too high for standard acceptance'
-            })
-        
-        # Special conditions based on specific factors
-        if claim_ratio > 80:
-            decision['UnderwriterNotes'] += ' | High claims history - consider exclusions'
-        
-        if row.get('LossHistoryTrend') == 'Increasing':
-            decision['UnderwriterNotes'] += ' | Increasing loss trend - monitor closely'
-        
+        decision = self.underwriting_rules.decisions(pd.DataFrame([row])).iloc[0].to_dict()
+        decision['PricingAdjustment'] = float(decision['PricingAdjustment'])
         return decision
 
     def get_missing_information(self, row: Dict[str, Any]) -> List[str]:
         """Identify missing critical information"""
-        missing = []
-        critical_fields = {
-            'Cedant': 'Ceding company information',
-            'Insured': 'Insured party details',
-            'Geography': 'Geographic scope',
-            'PerilsCovered': 'Perils and coverage scope',
-            'SumInsured': 'Sum insured amount',
-            'PeriodOfInsurance': 'Insurance period'
-        }
-        
-        for field, description in critical_fields.items():
-            if not row.get(field) or row.get(field) == 'Not Found':
-                missing.append(description)
-        
-        return missing
+        return [description for field, description in self.underwriting_rules.rules['required_fields'].items()
+                if not row.get(field) or row.get(field) == 'Not Found']
+
+    def rescore_submissions(self, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Re-score and re-decide saved submissions with the current underwriting rules"""
+        if df is None:
+            csv_path = os.path.join(self.structured_data_dir, "reinsurance_submissions.csv")
+            df = pd.read_csv(csv_path, keep_default_na=False)
+        
+        rescored = self.underwriting_rules.apply(df)
+        # Only saved decisions can change; a frame without them has nothing to compare
+        changed = 'n/a'
+        if 'RecommendedAction' in df.columns:
+            changed = int((rescored['RecommendedAction'] != df['RecommendedAction']).sum())
+        print(f"🔁 Re-decided {len(rescored)} submissions ({changed} decisions changed)")
+        return rescored
 
     def save_structured_data(self, structured_row: Dict[str, Any], submission_id: str):
         """Save structured data to file"""
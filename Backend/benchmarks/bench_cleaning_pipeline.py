@@ -0,0 +1,164 @@
+"""
+Benchmark EnhancedDataCleaningPipeline on synthetic submissions.
+
+Runs every stage of clean_and_transform_data in order and records wall time,
+rows/sec and peak memory per stage, then writes the results as JSON so runs
+from different commits can be diffed.
+
+Usage (from Backend/):
+    python -m benchmarks.bench_cleaning_pipeline
+    python -m benchmarks.bench_cleaning_pipeline --sizes 10000 100000 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from aiengine.data_cleaning_pipeline import EnhancedDataCleaningPipeline
+from aiengine.memory_utils import current_rss_mb, frame_bytes, peak_rss_mb
+from benchmarks.synthetic_submissions import generate_submissions
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+class RssSampler:
+    """
+    Tracks the peak resident set size between start() and stop() by polling
+    /proc/self/statm from a background thread. Where /proc is unavailable the
+    process-wide high-water mark is used instead, which only shows stages
+    that raise the overall peak.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def current_mb(self) -> Optional[float]:
+        current = current_rss_mb()
+        return current if current is not None else peak_rss_mb()
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._observe()
+
+    def _observe(self) -> None:
+        current = self.current_mb()
+        if current is not None and (self.peak_mb is None or current > self.peak_mb):
+            self.peak_mb = current
+
+    def start(self) -> 'RssSampler':
+        self.peak_mb = None
+        self._stop.clear()
+        self._observe()
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Optional[float]:
+        self._stop.set()
+        self._thread.join()
+        self._observe()
+        return self.peak_mb
+
+
+def benchmark_size(n_rows: int, seed: int = 42) -> Dict[str, Any]:
+    """Run the pipeline stage by stage on n_rows synthetic submissions"""
+    generate_start = time.perf_counter()
+    raw = generate_submissions(n_rows, seed)
+    generate_seconds = time.perf_counter() - generate_start
+
+    pipeline = EnhancedDataCleaningPipeline()
+    sampler = RssSampler()
+    baseline_mb = sampler.current_mb()
+
+    # Mirrors clean_and_transform_data: copy the input, then run each stage in order
+    df = raw.copy()
+    stages: List[Dict[str, Any]] = []
+    for stage in pipeline.stages:
+        rows_in = len(df)
+        sampler.start()
+        start = time.perf_counter()
+        df = getattr(pipeline, stage['method'])(df, False)
+        seconds = time.perf_counter() - start
+        peak_mb = sampler.stop()
+
+        stages.append({
+            'stage': stage['name'],
+            'seconds': round(seconds, 4),
+            'rows_per_sec': round(rows_in / seconds, 1) if seconds > 0 else None,
+            'rows_in': rows_in,
+            'rows_out': len(df),
+            'peak_rss_mb': round(peak_mb, 1) if peak_mb is not None else None,
+            'frame_mb': round(frame_bytes(df) / (1024 * 1024), 1),
+        })
+        print(f"   {stage['name']:<16} {seconds:9.3f}s  {stages[-1]['rows_per_sec'] or 0:>12,.0f} rows/s  "
+              f"peak {stages[-1]['peak_rss_mb']} MB")
+
+    total_seconds = sum(stage['seconds'] for stage in stages)
+    return {
+        'rows': n_rows,
+        'seed': seed,
+        'generate_seconds': round(generate_seconds, 3),
+        'total_seconds': round(total_seconds, 3),
+        'rows_per_sec': round(n_rows / total_seconds, 1) if total_seconds > 0 else None,
+        'baseline_rss_mb': round(baseline_mb, 1) if baseline_mb is not None else None,
+        'peak_rss_mb': max((s['peak_rss_mb'] for s in stages if s['peak_rss_mb'] is not None), default=None),
+        'input_frame_mb': round(frame_bytes(raw) / (1024 * 1024), 1),
+        'stages': stages,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes: List[int], seed: int = 42) -> Dict[str, Any]:
+    results = {
+        'benchmark': 'cleaning_pipeline',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'runs': [],
+    }
+    for n_rows in sizes:
+        print(f"📊 Benchmarking {n_rows:,} rows...")
+        results['runs'].append(benchmark_size(n_rows, seed))
+        print(f"   ✅ {results['runs'][-1]['total_seconds']}s total")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the data cleaning pipeline on synthetic submissions")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Row counts to benchmark")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for the synthetic data")
+    parser.add_argument('--output', default='benchmarks/results/cleaning_pipeline.json',
+                        help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.seed)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
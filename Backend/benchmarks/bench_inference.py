@@ -0,0 +1,280 @@
+"""
+Benchmark RiskAnalyzer and PricingModel inference on synthetic submissions.
+
+Trains reference forests of each requested size on synthetic cleaned
+features, saves them as artifacts (and pickles, for comparison) and times:
+- loading each model (artifact and pickle);
+- single-submission calls: RiskAnalyzer.predict, predict_proba and
+  PricingModel.suggest;
+- batch calls: RiskAnalyzer.predict_batch and PricingModel.suggest_batch
+  for every batch size;
+each from one or several concurrent caller threads, as under the API's
+thread pool. Every case records p50/p99 latency per call and rows/sec, and
+the results are written as JSON; pass --baseline with the JSON of another
+commit to print the change per case.
+
+Usage (from Backend/):
+    python -m benchmarks.bench_inference
+    python -m benchmarks.bench_inference --trees 100 --batch-sizes 1 1000 --threads 1 --output bench.json
+    python -m benchmarks.bench_inference --baseline benchmarks/results/inference_main.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from aiengine.pricing_model import PricingModel
+from aiengine.risk_analyzer import RiskAnalyzer
+from aiengine.train_models import MODEL_SPECS, publish_model, training_matrix
+from benchmarks.bench_cleaning_pipeline import _git_commit
+from benchmarks.synthetic_submissions import generate_model_features
+
+DEFAULT_TREES = [50, 200]
+DEFAULT_BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+DEFAULT_THREADS = [1, 4]
+DEFAULT_TRAIN_ROWS = 10_000
+# Per case: time spent calling, and bounds on the number of calls (with few calls p99 is the slowest)
+DEFAULT_SECONDS = 1.0
+MIN_CALLS = 3
+MAX_CALLS = 2_000
+LOAD_REPEATS = 5
+
+SINGLE_OPERATIONS = ['risk.predict', 'risk.predict_proba', 'pricing.suggest']
+BATCH_OPERATIONS = ['risk.predict_batch', 'pricing.suggest_batch']
+
+
+def train_reference_models(models_dir: str, n_trees: int, n_rows: int = DEFAULT_TRAIN_ROWS,
+                           seed: int = 42) -> Dict[str, Dict[str, str]]:
+    """
+    Fit both models with their default hyperparameters and n_trees trees
+
+    Returns:
+        Per model, the artifact and pickle paths
+    """
+    df = generate_model_features(n_rows, seed)
+    paths = {}
+    for name, spec in MODEL_SPECS.items():
+        X, y, features = training_matrix(df, name)
+        model = spec['estimator'](**dict(spec['defaults'], n_estimators=n_trees), random_state=seed, n_jobs=1)
+        model.fit(X, y)
+        artifact = publish_model(name, model, features, {'model': name, 'benchmark': True}, models_dir)
+
+        pickle = os.path.join(models_dir, f'{name}_model.pkl')
+        owner = RiskAnalyzer(model_path=pickle) if name == 'risk' else PricingModel(model_path=pickle)
+        owner.model, owner.feature_columns = model, features
+        owner.save_model()
+        paths[name] = {'artifact': artifact, 'pickle': pickle}
+    return paths
+
+
+def load_model(name: str, path: str):
+    model = RiskAnalyzer(model_path=path) if name == 'risk' else PricingModel(model_path=path)
+    model.load_model()
+    return model
+
+
+def time_loads(name: str, path: str, repeats: int = LOAD_REPEATS) -> Dict[str, float]:
+    """Milliseconds to load a model into a fresh instance, as a new worker would"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        load_model(name, path)
+        times.append(time.perf_counter() - start)
+    return {'p50_ms': round(float(np.median(times)) * 1000, 3), 'max_ms': round(max(times) * 1000, 3)}
+
+
+def time_calls(call: Callable[[], Any], threads: int, seconds: float) -> Dict[str, Any]:
+    """
+    Call from threads concurrent callers until seconds have passed (and each
+    made MIN_CALLS calls) or MAX_CALLS calls were made in total
+
+    Returns:
+        Per-call latencies in seconds and the wall time of the whole run
+    """
+    call()  # warm up
+    latencies: List[List[float]] = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+    deadline = [0.0]
+
+    def caller(out: List[float]):
+        barrier.wait()
+        while len(out) < MIN_CALLS or (time.perf_counter() < deadline[0] and len(out) < MAX_CALLS // threads):
+            start = time.perf_counter()
+            call()
+            out.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=caller, args=(out,)) for out in latencies]
+    for worker in workers:
+        worker.start()
+    start = time.perf_counter()
+    deadline[0] = start + seconds
+    barrier.wait()
+    for worker in workers:
+        worker.join()
+    wall = time.perf_counter() - start
+    return {'latencies': [t for out in latencies for t in out], 'wall_seconds': wall}
+
+
+def operation(name: str, risk: RiskAnalyzer, pricing: PricingModel, rows: pd.DataFrame) -> Callable[[], Any]:
+    if name == 'risk.predict':
+        submission = rows.iloc[0].to_dict()
+        return lambda: risk.predict(submission)
+    if name == 'risk.predict_proba':
+        submission = rows.iloc[0].to_dict()
+        return lambda: risk.predict_proba(submission)
+    if name == 'pricing.suggest':
+        submission = rows.iloc[0].to_dict()
+        return lambda: pricing.suggest(submission)
+    if name == 'risk.predict_batch':
+        return lambda: risk.predict_batch(rows)
+    if name == 'pricing.suggest_batch':
+        return lambda: pricing.suggest_batch(rows)
+    raise ValueError(f"Unknown operation {name}")
+
+
+def benchmark_case(op: str, risk: RiskAnalyzer, pricing: PricingModel, rows: pd.DataFrame,
+                   threads: int, seconds: float) -> Dict[str, Any]:
+    """Latency percentiles and throughput of one operation, batch size and thread count"""
+    call = operation(op, risk, pricing, rows)
+    # suggest() prints every premium; keep that out of the console and the timings' noise
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        run = time_calls(call, threads, seconds)
+    latencies = np.array(run['latencies'])
+    return {
+        'operation': op,
+        'batch_size': len(rows),
+        'threads': threads,
+        'calls': len(latencies),
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 4),
+        'p99_ms': round(float(np.percentile(latencies, 99)) * 1000, 4),
+        'mean_ms': round(float(latencies.mean()) * 1000, 4),
+        'rows_per_sec': round(len(latencies) * len(rows) / run['wall_seconds'], 1),
+    }
+
+
+def benchmark_trees(n_trees: int, batch_sizes: List[int], threads: List[int], seconds: float,
+                    train_rows: int, seed: int = 42) -> Dict[str, Any]:
+    """Train reference models of n_trees trees, then time loading and every inference case"""
+    with tempfile.TemporaryDirectory(prefix='bench-inference-') as models_dir:
+        train_start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            paths = train_reference_models(models_dir, n_trees, train_rows, seed)
+            load = {name: {kind: time_loads(name, path) for kind, path in formats.items()}
+                    for name, formats in paths.items()}
+            risk = load_model('risk', paths['risk']['artifact'])
+            pricing = load_model('pricing', paths['pricing']['artifact'])
+        train_seconds = time.perf_counter() - train_start
+        for name, formats in load.items():
+            print(f"   load {name:<8} artifact {formats['artifact']['p50_ms']:8.2f} ms  "
+                  f"pickle {formats['pickle']['p50_ms']:8.2f} ms")
+
+        inputs = generate_model_features(max(batch_sizes), seed + 1)
+        cases = []
+        for batch_size in batch_sizes:
+            rows = inputs.iloc[:batch_size]
+            operations = (SINGLE_OPERATIONS if batch_size == 1 else []) + BATCH_OPERATIONS
+            for op in operations:
+                for n_threads in threads:
+                    cases.append(benchmark_case(op, risk, pricing, rows, n_threads, seconds))
+                    case = cases[-1]
+                    print(f"   {op:<22} batch {batch_size:>7,}  threads {n_threads:>2}  "
+                          f"p50 {case['p50_ms']:10.3f} ms  p99 {case['p99_ms']:10.3f} ms  "
+                          f"{case['rows_per_sec']:>12,.0f} rows/s")
+
+    return {
+        'trees': n_trees,
+        'train_rows': train_rows,
+        'setup_seconds': round(train_seconds, 3),
+        'max_depth': {'risk': risk.engine.max_depth, 'pricing': pricing.engine.max_depth},
+        'load': load,
+        'cases': cases,
+    }
+
+
+def run_benchmarks(trees: List[int], batch_sizes: List[int], threads: List[int],
+                   seconds: float = DEFAULT_SECONDS, train_rows: int = DEFAULT_TRAIN_ROWS,
+                   seed: int = 42) -> Dict[str, Any]:
+    results = {
+        'benchmark': 'inference',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed,
+        'runs': [],
+    }
+    for n_trees in trees:
+        print(f"📊 Benchmarking {n_trees} trees...")
+        results['runs'].append(benchmark_trees(n_trees, batch_sizes, threads, seconds, train_rows, seed))
+    return results
+
+
+def case_key(n_trees: int, case: Dict[str, Any]) -> str:
+    return f"{case['operation']} trees={n_trees} batch={case['batch_size']} threads={case['threads']}"
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """p50 latency and throughput of each case relative to the same case in baseline"""
+    previous = {case_key(run['trees'], case): case for run in baseline['runs'] for case in run['cases']}
+    changes = []
+    for run in results['runs']:
+        for case in run['cases']:
+            key = case_key(run['trees'], case)
+            if key in previous and previous[key]['p50_ms'] > 0 and previous[key]['rows_per_sec'] > 0:
+                changes.append({
+                    'case': key,
+                    'p50_ratio': round(case['p50_ms'] / previous[key]['p50_ms'], 3),
+                    'throughput_ratio': round(case['rows_per_sec'] / previous[key]['rows_per_sec'], 3),
+                })
+    return changes
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark risk and pricing inference on synthetic submissions")
+    parser.add_argument('--trees', type=int, nargs='+', default=DEFAULT_TREES, help="Forest sizes to benchmark")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES,
+                        help="Submissions per batch call")
+    parser.add_argument('--threads', type=int, nargs='+', default=DEFAULT_THREADS,
+                        help="Concurrent caller threads")
+    parser.add_argument('--seconds', type=float, default=DEFAULT_SECONDS, help="Time spent calling per case")
+    parser.add_argument('--train-rows', type=int, default=DEFAULT_TRAIN_ROWS,
+                        help="Synthetic rows the reference models are trained on")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for the synthetic data and models")
+    parser.add_argument('--output', default='benchmarks/results/inference.json',
+                        help="Where to write the JSON results")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.trees, args.batch_sizes, args.threads, args.seconds, args.train_rows, args.seed)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        results['baseline'] = {'path': args.baseline, 'commit': baseline.get('commit'),
+                               'changes': compare(results, baseline)}
+        print(f"📈 Against {args.baseline} ({baseline.get('commit') or 'unknown commit'}):")
+        for change in results['baseline']['changes']:
+            print(f"   {change['case']:<60} p50 x{change['p50_ratio']:<7} throughput x{change['throughput_ratio']}")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
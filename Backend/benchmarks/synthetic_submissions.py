@@ -0,0 +1,173 @@
+"""
+Synthetic facultative submissions shaped like the raw broker data the
+cleaning pipeline receives: mixed currency strings, multi-part geographies,
+multi-peril strings and LossHistory JSON. Also cleaned, numeric model
+features with risk and premium targets, for the model benchmarks.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+CEDANTS = [
+    'ABC Insurance Co', 'XYZ Reinsurance Ltd', 'Global Risk Partners', 'Premier Insurance',
+    'Kenya Re', 'Africa Re Corporation', 'Jubilee Insurance', 'Britam General', 'CIC Insurance Group',
+    'Old Mutual', 'Sanlam General', 'APA Insurance'
+]
+
+INSURED_PREFIXES = ['Tech', 'Chemical', 'Energy', 'Retail', 'Coastal', 'Summit', 'Pacific', 'Atlas',
+                    'Harbor', 'Northern', 'Evergreen', 'Pioneer', 'Granite', 'Falcon', 'Liberty']
+INSURED_SUFFIXES = ['Corp LLC', 'Manufacturing Inc', 'Solutions Ltd', 'Chain Corp', 'Holdings',
+                    'Logistics Ltd', 'Foods Inc', 'Mining Co', 'Hotels Group', 'Industries']
+
+# (city, region, country) triples; formatted in several broker styles
+LOCATIONS = [
+    ('Los Angeles', 'California', 'USA'), ('Houston', 'Texas', 'USA'), ('Miami', 'Florida', 'USA'),
+    ('New York', 'New York', 'USA'), ('Chicago', 'Illinois', 'USA'), ('Seattle', 'Washington', 'USA'),
+    ('London', 'England', 'United Kingdom'), ('Edinburgh', 'Scotland', 'United Kingdom'),
+    ('Nairobi', 'Nairobi County', 'Kenya'), ('Mombasa', 'Coast', 'Kenya'), ('Lagos', 'Lagos State', 'Nigeria'),
+    ('Johannesburg', 'Gauteng', 'South Africa'), ('Mumbai', 'Maharashtra', 'India'),
+    ('Tokyo', 'Kanto', 'Japan'), ('Sydney', 'New South Wales', 'Australia'), ('Toronto', 'Ontario', 'Canada'),
+    ('Frankfurt', 'Hesse', 'Germany'), ('Singapore', 'Central', 'Singapore'), ('Zurich', 'Zurich', 'Switzerland')
+]
+
+PERILS = ['Fire', 'Fire & Explosion', 'Flood', 'Earthquake', 'Hurricane', 'Windstorm', 'Tornado', 'Hail',
+          'All Risks', 'Theft', 'Cyber Liability', 'Public Liability', 'Marine Cargo', 'Terrorism',
+          'Wildfire', 'Water Damage', 'Political Risk', 'Named Perils']
+
+BUSINESS_TYPES = ['Technology', 'Chemical Manufacturing', 'Energy', 'Retail', 'Oil and Gas', 'Healthcare',
+                  'Logistics', 'Real Estate', 'Hospitality', 'Agriculture', 'Mining', 'Construction',
+                  'Financial', 'Aviation', 'Marine', 'Food Processing']
+
+# Currency code, symbol, typical magnitude of a sum insured in that currency
+CURRENCIES = [('USD', '$', 1e6), ('EUR', '€', 1e6), ('GBP', '£', 1e6), ('KES', '', 1e8),
+              ('INR', '', 1e8), ('JPY', '¥', 1e8), ('ZAR', '', 1e7), ('NGN', '', 1e9),
+              ('CAD', '', 1e6), ('AUD', '', 1e6), ('CHF', '', 1e6), ('SGD', '', 1e6)]
+
+
+def _format_amounts(rng: np.random.Generator, amounts: np.ndarray, currency_idx: np.ndarray) -> np.ndarray:
+    """Render amounts in the mix of styles seen in broker slips"""
+    style = rng.integers(0, 6, len(amounts))
+    out = np.empty(len(amounts), dtype=object)
+    for i, (amount, c, s) in enumerate(zip(amounts, currency_idx, style)):
+        code, symbol, _ = CURRENCIES[c]
+        if s == 0 and symbol:
+            out[i] = f"{symbol}{amount / 1e6:.1f} M {code}"
+        elif s == 1:
+            out[i] = f"{amount / 1e6:.2f} M {code}"
+        elif s == 2:
+            out[i] = f"{code} {amount:,.0f}"
+        elif s == 3 and amount >= 1e9:
+            out[i] = f"{amount / 1e9:.2f} B {code}"
+        elif s == 4:
+            out[i] = f"{amount / 1e6:.0f} million {code}"
+        else:
+            out[i] = f"{symbol or code + ' '}{amount / 1e3:,.0f} K"
+    return out
+
+
+def _loss_history(rng: np.random.Generator, n_rows: int, sums_insured: np.ndarray) -> list:
+    counts = np.minimum(rng.poisson(1.2, n_rows), 10)
+    # Distinct loss years per row: the first `count` columns of a random permutation of 2015-2024
+    years = 2015 + np.argsort(rng.random((n_rows, 10)), axis=1)
+    amounts = (sums_insured[:, None] * rng.uniform(0.001, 0.05, (n_rows, 10))).astype(np.int64)
+    return [
+        json.dumps([{'year': int(y), 'amount': int(a)}
+                    for y, a in sorted(zip(years[i, :count], amounts[i, :count]))])
+        for i, count in enumerate(counts)
+    ]
+
+
+def generate_submissions(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Generate n_rows raw submissions with deterministic content for a given seed"""
+    rng = np.random.default_rng(seed)
+
+    location_idx = rng.integers(0, len(LOCATIONS), n_rows)
+    geo_style = rng.integers(0, 3, n_rows)
+    geographies = [
+        f"{city}, {region}" if s == 0 else f"{city}, {region}, {country}" if s == 1 else f"{region} - {country}"
+        for (city, region, country), s in zip((LOCATIONS[i] for i in location_idx), geo_style)
+    ]
+    states = [LOCATIONS[i][1] if s % 2 else LOCATIONS[i][2] for i, s in zip(location_idx, geo_style)]
+
+    peril_count = rng.choice([1, 2, 3], n_rows, p=[0.55, 0.3, 0.15])
+    peril_picks = np.argsort(rng.random((n_rows, len(PERILS))), axis=1)[:, :3]
+    separators = [', ', ' & ', '/', '; ']
+    perils = [
+        separators[i % 4].join(PERILS[p] for p in picks[:k])
+        for i, (picks, k) in enumerate(zip(peril_picks.tolist(), peril_count))
+    ]
+
+    currency_idx = rng.integers(0, len(CURRENCIES), n_rows)
+    magnitudes = np.array([c[2] for c in CURRENCIES])[currency_idx]
+    sums_insured = np.round(magnitudes * rng.lognormal(3.5, 1.0, n_rows), -3)
+    premiums = np.round(sums_insured * rng.uniform(0.002, 0.03, n_rows), -2)
+
+    claim_ratio = np.round(rng.beta(2, 4, n_rows), 3)
+    esg_score = np.round(rng.uniform(0.2, 0.95, n_rows), 2)
+
+    df = pd.DataFrame({
+        'SubmissionID': [f'SUB{i:08d}' for i in range(n_rows)],
+        'Cedant': rng.choice(CEDANTS, n_rows),
+        'Insured': np.char.add(np.char.add(rng.choice(INSURED_PREFIXES, n_rows), ' '),
+                               rng.choice(INSURED_SUFFIXES, n_rows)).astype(object),
+        'Geography': geographies,
+        'State': states,
+        'Peril': perils,
+        'BusinessType': rng.choice(BUSINESS_TYPES, n_rows),
+        'SumInsured': _format_amounts(rng, sums_insured, currency_idx),
+        'PastPremium': _format_amounts(rng, premiums, currency_idx),
+        'ClaimRatio': claim_ratio,
+        'ESGScore': esg_score,
+        'CatastropheExposure': np.round(rng.beta(2, 5, n_rows), 2),
+        'LossHistory': _loss_history(rng, n_rows, sums_insured),
+    })
+
+    # Gaps like those in extracted submissions
+    df.loc[rng.random(n_rows) < 0.05, 'ClaimRatio'] = np.nan
+    df.loc[rng.random(n_rows) < 0.10, 'ESGScore'] = np.nan
+    df.loc[rng.random(n_rows) < 0.02, 'PastPremium'] = 'Not Found'
+    return df
+
+
+def generate_model_features(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Generate n_rows cleaned submissions: the risk and pricing model features
+    as the cleaning pipeline outputs them, plus RiskCategory and PastPremium
+    targets that depend on them
+    """
+    rng = np.random.default_rng(seed)
+
+    sums_insured = np.round(rng.lognormal(1.5, 1.2, n_rows), 3)  # USD millions
+    premium_rate = np.round(rng.uniform(0.002, 0.03, n_rows) * 100, 3)
+    claim_ratio = np.round(rng.beta(2, 4, n_rows), 3)
+    loss_frequency = np.minimum(rng.poisson(1.2, n_rows), 10)
+    loss_severity = np.round(sums_insured * 1e6 * rng.uniform(0.001, 0.05, n_rows) * (loss_frequency > 0), 2)
+    catastrophe = np.round(rng.beta(2, 5, n_rows), 2)
+    risk_score = np.round(np.clip(10 * (0.5 * claim_ratio + 0.3 * catastrophe + 0.05 * loss_frequency)
+                                  + rng.normal(0, 0.5, n_rows), 0, 10), 2)
+    past_premium = np.round(sums_insured * premium_rate / 100 * (1 + 0.1 * risk_score)
+                            * rng.lognormal(0, 0.1, n_rows), 4)
+
+    df = pd.DataFrame({
+        'SumInsured': sums_insured,
+        'PastPremium': past_premium,
+        'ClaimRatio': claim_ratio,
+        'LossFrequency': loss_frequency,
+        'LossSeverity': loss_severity,
+        'PremiumRate': premium_rate,
+        'DataCompletenessScore': np.round(rng.uniform(0.5, 1.0, n_rows), 2),
+        'LossRatio': np.round(claim_ratio * rng.uniform(0.8, 1.2, n_rows), 3),
+        'ESGScore': np.round(rng.uniform(0.2, 0.95, n_rows), 2),
+        'CatastropheExposure': catastrophe,
+        'LossTrendSlope': np.round(rng.normal(0, 0.2, n_rows), 4),
+        'LossVolatility': np.round(rng.gamma(2, 0.15, n_rows), 4),
+        'NormalizedRiskScore': risk_score,
+        'RiskCategory': pd.cut(risk_score, [-np.inf, 3, 5, 7, np.inf],
+                               labels=['Low Risk', 'Medium Risk', 'High Risk', 'Very High Risk']).astype(object),
+    })
+
+    # Gaps like those left after cleaning
+    df.loc[rng.random(n_rows) < 0.10, 'ESGScore'] = np.nan
+    df.loc[rng.random(n_rows) < 0.05, ['LossTrendSlope', 'LossVolatility']] = np.nan
+    return df
@@ -1,5 +1,9 @@
+import inspect
+
 from fastapi.testclient import TestClient
+from app import main
 from app.main import app
+from app.routers import analysis
 
 client = TestClient(app)
 
@@ -7,3 +11,17 @@ def test_root():
     response = client.get("/")
     assert response.status_code == 200
     assert "Facultative AI System" in response.json()["message"]
+
+
+# Premium, batch and explanation endpoints do CPU-bound model work and must run in the threadpool, not on the event loop
+def test_batch_endpoints_do_not_block_the_event_loop():
+    handlers = [main.predict_risk_batch, analysis.suggest_premium, analysis.suggest_premiums,
+                analysis.explain_risk, analysis.explain_risks]
+
+    assert not any(inspect.iscoroutinefunction(handler) for handler in handlers)
+
+
+def test_inference_metrics_cover_every_serving_dispatcher():
+    metrics = client.get("/inference-metrics").json()
+
+    assert {"risk", "pricing", "analysis", "cache"} <= set(metrics)
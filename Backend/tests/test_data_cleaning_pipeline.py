@@ -0,0 +1,227 @@
+import pandas as pd
+import pytest
+
+from aiengine.data_cleaning_pipeline import EnhancedDataCleaningPipeline
+
+
+def sample_submissions():
+    return pd.DataFrame({
+        'SubmissionID': ['S1', 'S2', 'S3', 'S4'],
+        'Cedant': ['ABC Insurance Co', 'XYZ Reinsurance Ltd', 'Global Risk Partners', 'Premier Insurance'],
+        'Insured': ['Tech Corp LLC', 'Chemical Manufacturing Inc', 'Energy Solutions Ltd', 'Retail Chain Corp'],
+        'Geography': ['Los Angeles, California', 'Houston, Texas', 'London, UK', 'Mumbai, India'],
+        'State': ['CA', 'TX', 'UK', 'IN'],
+        'Peril': ['Fire & Explosion', 'Hurricane & Windstorm', 'All Risks', 'Earthquake'],
+        'BusinessType': ['Technology', 'Chemical Manufacturing', 'Energy', 'Retail'],
+        'SumInsured': ['$50 M USD', '2.5 B KES', '€100 M', '500 M INR'],
+        'PastPremium': ['$2.5 M', '125 M KES', '€5 M', '25 M INR'],
+        'ClaimRatio': [0.45, 0.65, 0.85, 0.32],
+        'ESGScore': [0.6, 0.4, 0.8, None],
+        'LossHistory': [
+            '[{"year": 2022, "amount": 1000000}, {"year": 2023, "amount": 500000}]',
+            '[{"year": 2021, "amount": 5000000}]',
+            '[{"year": 2020, "amount": 8000000}, {"year": 2022, "amount": 3000000}]',
+            '[]'
+        ]
+    })
+
+
+def test_transform_skips_rows_seen_during_fit():
+    pipeline = EnhancedDataCleaningPipeline().fit(sample_submissions())
+
+    assert pipeline.transform(sample_submissions()).empty
+
+
+def test_transform_scores_new_rows_against_fitted_book():
+    history = sample_submissions()
+    pipeline = EnhancedDataCleaningPipeline().fit(history)
+
+    new_row = history.iloc[[1]].copy()
+    new_row['SubmissionID'] = 'S5'
+    new_row['Insured'] = 'Chemical Storage Inc'
+    new_row['ESGScore'] = None
+
+    cleaned = pipeline.transform(new_row)
+    full_book = EnhancedDataCleaningPipeline().clean_and_transform_data(
+        pd.concat([history, new_row], ignore_index=True), verbose=False
+    )
+
+    assert len(cleaned) == 1
+    assert cleaned['NormalizedRiskScore'].iloc[0] == full_book['NormalizedRiskScore'].iloc[-1]
+    assert cleaned['ESGScore'].iloc[0] == pipeline.fitted_state['medians']['ESGScore']
+
+
+def test_transform_flags_duplicates_of_fitted_book(tmp_path):
+    history = sample_submissions()
+    EnhancedDataCleaningPipeline().fit(history).save_state(str(tmp_path / 'state.json'))
+    pipeline = EnhancedDataCleaningPipeline().load_state(str(tmp_path / 'state.json'))
+
+    resent = history.iloc[[0]].copy()
+    resent['SubmissionID'] = 'S6'
+    resent['LossHistory'] = '[]'
+
+    cleaned = pipeline.transform(resent)
+
+    assert bool(cleaned['IsDuplicate'].iloc[0])
+    assert 'DUPLICATE' in cleaned['QualityFlags'].iloc[0]
+
+
+def test_transform_requires_fitted_state():
+    with pytest.raises(ValueError):
+        EnhancedDataCleaningPipeline().transform(sample_submissions())
+
+
+def test_checkpoints_recompute_only_invalidated_stages(tmp_path):
+    pytest.importorskip('pyarrow')
+    pipeline = EnhancedDataCleaningPipeline()
+    first = pipeline.clean_and_transform_data(sample_submissions(), verbose=False, checkpoint_dir=str(tmp_path))
+
+    pipeline.risk_multipliers['peril_risk']['Fire'] = 2.0
+    rerun = pipeline.clean_and_transform_data(sample_submissions(), verbose=False, checkpoint_dir=str(tmp_path))
+    hits = {r['stage']: r['cache_hit'] for r in pipeline.last_checkpoint_report}
+
+    assert [stage for stage, hit in hits.items() if not hit] == ['risk_scores', 'validation', 'quality_flags']
+    fresh = EnhancedDataCleaningPipeline()
+    fresh.risk_multipliers['peril_risk']['Fire'] = 2.0
+    pd.testing.assert_frame_equal(rerun, fresh.clean_and_transform_data(sample_submissions(), verbose=False))
+    assert not rerun['PerilRiskScore'].equals(first['PerilRiskScore'])
+
+
+def test_checkpoint_write_failures_are_not_silenced(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+
+    def unwritable(self, path, *args, **kwargs):
+        raise PermissionError(f"cannot write {path}")
+
+    monkeypatch.setattr(pd.DataFrame, 'to_parquet', unwritable)
+    with pytest.raises(PermissionError):
+        EnhancedDataCleaningPipeline().clean_and_transform_data(sample_submissions(), verbose=False,
+                                                               checkpoint_dir=str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_memory_optimized_mode_preserves_values():
+    pipeline = EnhancedDataCleaningPipeline()
+    expected = pipeline.clean_and_transform_data(sample_submissions(), verbose=False)
+    optimized = pipeline.clean_and_transform_data(sample_submissions(), verbose=False, memory_optimized=True)
+
+    assert optimized['LossFrequency'].dtype == 'int8'
+    assert optimized['QualityFlags'].dtype == 'category'
+    assert [r['stage'] for r in pipeline.last_memory_report] == [s['name'] for s in pipeline.stages]
+
+    for col in expected.columns:
+        if expected[col].dtype == object:
+            optimized[col] = optimized[col].astype(object)
+    pd.testing.assert_frame_equal(optimized, expected, check_dtype=False)
+
+
+def test_partitioned_execution_matches_serial_path():
+    book = pd.concat([sample_submissions()] * 5, ignore_index=True)
+    book['SumInsured'] = [f'${i} M' for i in range(len(book))]
+    pipeline = EnhancedDataCleaningPipeline()
+    pipeline.min_partition_rows = 1
+
+    serial = pipeline.clean_and_transform_data(book, verbose=False)
+    partitioned = pipeline.clean_and_transform_data(book, verbose=False, n_jobs=3)
+
+    pd.testing.assert_frame_equal(partitioned, serial)
+    assert partitioned.to_csv() == serial.to_csv()
+
+
+def test_near_duplicate_resubmissions_are_clustered():
+    history = sample_submissions()
+    resent = history.iloc[[0]].copy()
+    resent['SubmissionID'] = 'S7'
+    resent['Cedant'] = 'ABC Insurance Company Ltd.'
+    resent['Insured'] = 'TECH CORP'
+    resent['SumInsured'] = '$52 M USD'
+
+    pipeline = EnhancedDataCleaningPipeline()
+    pipeline.near_duplicate_settings = {}
+    cleaned = pipeline.clean_and_transform_data(pd.concat([history, resent], ignore_index=True), verbose=False)
+
+    assert cleaned['IsDuplicate'].tolist() == [False, False, False, False, True]
+    assert cleaned['DuplicateClusterID'].iloc[0] == cleaned['DuplicateClusterID'].iloc[4]
+    assert cleaned['DuplicateSimilarity'].iloc[4] > 0.9
+
+
+def test_currency_conversion_uses_rate_as_of_submission_date():
+    pipeline = EnhancedDataCleaningPipeline()
+    book = pd.DataFrame({
+        'SumInsured': ['€1 M', '€1 M', '€1 M'],
+        'SubmissionDate': ['2024-03-01', '2025-10-01', None],
+    })
+
+    converted = pipeline.convert_currency_values(book, verbose=False)
+
+    eur_2024, date_2024 = pipeline.fx_rates.rate('EUR', '2024-03-01')
+    eur_latest, date_latest = pipeline.fx_rates.rate('EUR')
+    assert eur_2024 != eur_latest
+    assert converted['SumInsured'].tolist() == [1_000_000 * eur_2024, 1_000_000 * eur_latest, 1_000_000 * eur_latest]
+    assert converted['FxRateDate'].tolist() == [date_2024, date_latest, date_latest]
+
+
+def test_currency_code_precedence_when_a_string_names_two_currencies():
+    pipeline = EnhancedDataCleaningPipeline()
+    book = pd.DataFrame({'SumInsured': ['USD 1,000,000 (APPROX EUR 920,000)', 'EUR 2,000,000 (GBP 1,700,000 equivalent)']})
+
+    converted = pipeline.convert_currency_values(book, verbose=False)
+
+    assert pipeline.parse_currency_amount(book['SumInsured'][0]) == (1_000_000, 'USD')
+    assert converted['SumInsured'].tolist() == [1_000_000, 2_000_000 * pipeline.fx_rates.rate('EUR')[0]]
+
+
+def test_profile_records_every_stage_and_feeds_cleaning_report():
+    pipeline = EnhancedDataCleaningPipeline()
+    raw = sample_submissions()
+
+    cleaned, profile = pipeline.clean_and_transform_data(raw, verbose=False, return_profile=True)
+    report = pipeline.generate_cleaning_report(raw, cleaned)
+
+    assert [entry['stage'] for entry in profile.stages] == [stage['name'] for stage in pipeline.stages]
+    assert all(entry['rows_in'] == entry['rows_out'] == len(raw) for entry in profile.stages)
+    assert 'PremiumRate' in profile.stage('features')['new_columns']
+    assert profile.stage('missing_values')['column_stats']['ESGScore']['nulls'] == 0
+    assert report['stage_profile']['stages'] == profile.stages
+    assert report['validation_results']['duplicates_found'] == 0
+
+
+def test_missing_values_use_segment_medians_saved_with_state(tmp_path):
+    history = pd.concat([sample_submissions()] * 5, ignore_index=True)
+    history['SubmissionID'] = [f'H{i}' for i in range(len(history))]
+    EnhancedDataCleaningPipeline().fit(history).save_state(str(tmp_path / 'state.json'))
+    pipeline = EnhancedDataCleaningPipeline().load_state(str(tmp_path / 'state.json'))
+
+    new_rows = history.iloc[[0, 3]].copy()
+    new_rows['SubmissionID'] = ['N1', 'N2']
+    new_rows['ESGScore'] = None
+
+    cleaned = pipeline.transform(new_rows)
+
+    # Technology/California has five ESG scores of 0.6; Retail/India has none, so the book median applies
+    assert cleaned['ESGScore'].tolist() == [0.6, pipeline.fitted_state['medians']['ESGScore']]
+
+
+def test_polars_engine_matches_pandas_output():
+    pytest.importorskip('polars')
+    submissions = pd.concat([sample_submissions()] * 3, ignore_index=True)
+    submissions.loc[4, 'PastPremium'] = 'Not Found'
+    submissions.loc[5, 'ClaimRatio'] = None
+
+    expected = EnhancedDataCleaningPipeline().clean_and_transform_data(submissions, verbose=False)
+    pipeline = EnhancedDataCleaningPipeline()
+    result = pipeline.clean_and_transform_data(submissions, verbose=False, engine='polars')
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert pipeline.last_profile.validation_results['duplicates_found'] == 8
+
+
+def test_loss_trend_features_from_loss_history():
+    cleaned = EnhancedDataCleaningPipeline().clean_and_transform_data(sample_submissions(), verbose=False)
+
+    # S1 fell from 1.0M (2022) to 0.5M (2023): -0.5M/year against a 0.75M mean
+    assert cleaned['LossTrendSlope'].iloc[0] == pytest.approx(-2 / 3)
+    assert cleaned['LossVolatility'].iloc[0] == pytest.approx(0.4714, abs=1e-4)
+    assert cleaned['WorstLossYear'].tolist() == [2022, 2021, 2020, 0]
+    # A single loss year or no losses carry no trend
+    assert cleaned['LossTrendSlope'].iloc[[1, 3]].tolist() == [0.0, 0.0]
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.model_selection import train_test_split
+
+from aiengine.forest_engine import CompiledForest
+from aiengine.pricing_model import PricingModel
+from aiengine.risk_analyzer import RiskAnalyzer
+from tests.test_models import cleaned_book
+
+
+def holdout_split():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 6))
+    labels = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int) + (X[:, 3] > 1)
+    target = 3 * X[:, 0] + X[:, 1] ** 2 + rng.normal(size=len(X))
+    return train_test_split(X, labels, target, test_size=0.25, random_state=0)
+
+
+def test_compiled_forest_matches_sklearn_on_holdout():
+    X_train, X_test, labels_train, _, target_train, _ = holdout_split()
+    classifier = RandomForestClassifier(n_estimators=30, random_state=0).fit(X_train, labels_train)
+    regressor = RandomForestRegressor(n_estimators=30, random_state=0).fit(X_train, target_train)
+
+    compiled_classifier = CompiledForest.from_sklearn(classifier)
+    compiled_regressor = CompiledForest.from_sklearn(regressor)
+
+    np.testing.assert_allclose(compiled_classifier.predict_proba(X_test), classifier.predict_proba(X_test))
+    np.testing.assert_array_equal(compiled_classifier.predict(X_test), classifier.predict(X_test))
+    np.testing.assert_allclose(compiled_regressor.predict(X_test), regressor.predict(X_test))
+    np.testing.assert_allclose(compiled_regressor.predict(X_test[:1]), regressor.predict(X_test[:1]))
+    # Row batches that do not divide the input give the same predictions
+    np.testing.assert_allclose(compiled_classifier.predict_proba(X_test, batch_rows=77),
+                               classifier.predict_proba(X_test))
+    np.testing.assert_allclose(compiled_regressor.predict(X_test, batch_rows=77), regressor.predict(X_test))
+
+    # Missing values follow the same branches as in sklearn
+    X_missing = X_test.copy()
+    X_missing[::5, 1] = np.nan
+    np.testing.assert_allclose(compiled_classifier.predict_proba(X_missing), classifier.predict_proba(X_missing))
+
+
+def test_pricing_model_suggests_through_compiled_forest(tmp_path):
+    book = cleaned_book()
+    model = PricingModel(model_path=str(tmp_path / 'pricing_model.pkl'))
+    model.train(book)
+
+    assert model.engine is not None
+    X = book[model.feature_columns]
+    np.testing.assert_allclose(model.suggest_batch(book)['Premium'], model.model.predict(X))
+    assert model.suggest(book.iloc[0].to_dict())['Premium'] == model.suggest_batch(book)['Premium'][0]
+
+
+def test_premium_quantiles_come_from_per_tree_predictions(tmp_path):
+    X_train, X_test, _, _, target_train, _ = holdout_split()
+    regressor = RandomForestRegressor(n_estimators=30, random_state=0).fit(X_train, target_train)
+    per_tree = np.stack([tree.predict(X_test) for tree in regressor.estimators_])
+
+    bands, mean = CompiledForest.from_sklearn(regressor).predict_quantiles(X_test, [0.1, 0.5, 0.9], return_mean=True)
+
+    np.testing.assert_allclose(bands, np.quantile(per_tree, [0.1, 0.5, 0.9], axis=0).T)
+    np.testing.assert_allclose(mean, regressor.predict(X_test))
+
+    book = cleaned_book()
+    model = PricingModel(model_path=str(tmp_path / 'pricing_model.pkl'))
+    model.train(book)
+    priced = model.suggest_batch(book, quantiles=[0.1, 0.9])
+    single = model.suggest(book.iloc[0].to_dict(), quantiles=[0.1, 0.9])
+    assert list(priced.columns) == ['Premium', 'Decision', 'P10', 'P90']
+    assert (priced['P10'] <= priced['P90']).all()
+    assert single['PremiumRange'] == pytest.approx({'P10': priced['P10'][0], 'P90': priced['P90'][0]})
+    assert single['Premium'] == pytest.approx(priced['Premium'][0])
+
+
+def test_path_contributions_add_up_to_predictions(tmp_path):
+    X_train, X_test, labels_train, _, target_train, _ = holdout_split()
+    classifier = RandomForestClassifier(n_estimators=30, random_state=0).fit(X_train, labels_train)
+    regressor = RandomForestRegressor(n_estimators=30, max_depth=6, random_state=0).fit(X_train, target_train)
+
+    bias, contributions = CompiledForest.from_sklearn(classifier).contributions(X_test)
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), classifier.predict_proba(X_test), atol=1e-12)
+    bias, contributions = CompiledForest.from_sklearn(regressor).contributions(X_test)
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), regressor.predict(X_test))
+    # Features the forest never splits on contribute nothing
+    assert np.abs(contributions).mean(axis=0).argmax() == 0
+
+    book = cleaned_book()
+    risk = RiskAnalyzer(model_path=str(tmp_path / 'risk_model.pkl'))
+    risk.train(book)
+    explained = risk.explain_batch(book)
+    predicted = risk.predict_batch(book)
+    assert explained['predicted_risk'].tolist() == predicted['predicted_risk'].tolist()
+    np.testing.assert_allclose(explained['BaseValue'] + explained[risk.feature_columns].sum(axis=1),
+                               explained['probability'], atol=1e-12)
+    single = risk.explain(book.iloc[0].to_dict(), top_n=2)
+    assert len(single['contributions']) == 2
+    assert single['probability'] == pytest.approx(explained['probability'][0])
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pytest
+
+from aiengine import inference_dispatcher
+from aiengine.inference_dispatcher import (InferenceDispatcher, analysis_lookup, analysis_scorer, get_dispatcher,
+                                          pricing_lookup, pricing_scorer, risk_lookup, risk_scorer)
+from aiengine.pricing_model import PricingModel
+from aiengine.model_registry import ModelRegistry
+from aiengine.risk_analyzer import RiskAnalyzer
+from tests.test_models import cleaned_book
+
+
+def test_dispatcher_batches_concurrent_requests():
+    calls = []
+
+    def score(items):
+        calls.append(len(items))
+        time.sleep(0.005)
+        return [item['x'] * 2 for item in items]
+
+    dispatcher = InferenceDispatcher(score, max_batch_size=8, max_wait_ms=20, name='double')
+    results = {}
+    barrier = threading.Barrier(24)
+
+    def request(i):
+        barrier.wait()
+        results[i] = dispatcher.predict({'x': i}, timeout=5)
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(24)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    dispatcher.close()
+
+    assert results == {i: 2 * i for i in range(24)}
+    assert max(calls) <= 8 and len(calls) < 24
+    metrics = dispatcher.metrics()
+    assert metrics['rows'] == 24 and metrics['batches'] == len(calls)
+    assert metrics['largest_batch'] == max(calls) and metrics['avg_model_ms'] > 0
+
+
+def test_dispatcher_propagates_scoring_errors():
+    def score(items):
+        raise ValueError('model unavailable')
+
+    dispatcher = InferenceDispatcher(score, max_wait_ms=0)
+    with pytest.raises(ValueError, match='model unavailable'):
+        dispatcher.predict({'x': 1}, timeout=5)
+    dispatcher.close()
+    assert dispatcher.metrics()['errors'] == 1
+
+
+def test_predict_risk_endpoint_goes_through_dispatcher(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import app.main as main
+
+    book = cleaned_book()
+    risk = RiskAnalyzer(model_path=str(tmp_path / 'risk_model.pkl'))
+    risk.train(book)
+    registry = ModelRegistry({'risk': risk.model_path})
+    dispatcher = InferenceDispatcher(risk_scorer(registry), name='risk')
+    monkeypatch.setattr(main, 'registry', registry)
+    monkeypatch.setattr(main, 'risk_dispatcher', dispatcher)
+
+    record = book[risk.feature_columns].iloc[0].to_dict()
+    body = TestClient(main.app).post('/predict-risk', json=record).json()
+    dispatcher.close()
+
+    assert body['predicted_risk'] == risk.predict(record)
+    assert body['probabilities'] == pytest.approx(risk.predict_proba(record))
+    assert dispatcher.metrics()['rows'] == 1
+
+
+def test_analysis_risk_endpoint_goes_through_dispatcher(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import app.main as main
+
+    book = cleaned_book()
+    risk = RiskAnalyzer(model_path=str(tmp_path / 'risk_model.pkl'))
+    risk.train(book)
+    dispatcher = InferenceDispatcher(risk_scorer(ModelRegistry({'risk': risk.model_path})), name='risk')
+    monkeypatch.setattr(inference_dispatcher, '_dispatchers', {'risk': dispatcher})
+
+    record = book[risk.feature_columns].iloc[0].to_dict()
+    body = TestClient(main.app).post(main.app.url_path_for('analyze_risk'), json=record).json()
+    dispatcher.close()
+
+    assert body == {'risk_category': risk.predict(record)}
+    assert dispatcher.metrics()['rows'] == 1
+
+
+def test_process_dispatchers_take_batching_limits_from_environment(monkeypatch):
+    monkeypatch.setattr(inference_dispatcher, '_dispatchers', {})
+    monkeypatch.setenv('INFERENCE_MAX_BATCH_SIZE', '16')
+    monkeypatch.setenv('INFERENCE_RISK_MAX_WAIT_MS', '0.5')
+
+    risk, pricing = get_dispatcher('risk'), get_dispatcher('pricing')
+
+    assert (risk.max_batch_size, risk.max_wait_ms) == (16, 0.5)
+    assert (pricing.max_batch_size, pricing.max_wait_ms) == (16, inference_dispatcher.DEFAULT_MAX_WAIT_MS)
+    assert get_dispatcher('pricing', max_wait_ms=10) is pricing and pricing.max_wait_ms == 10
+
+    monkeypatch.setenv('INFERENCE_ANALYSIS_MAX_BATCH_SIZE', 'many')
+    with pytest.raises(ValueError, match='INFERENCE_ANALYSIS_MAX_BATCH_SIZE'):
+        get_dispatcher('analysis')
+
+
+def test_cached_predictions_resolve_on_submit_without_queueing(tmp_path):
+    book = cleaned_book()
+    risk = RiskAnalyzer(model_path=str(tmp_path / 'risk_model.pkl'))
+    risk.train(book)
+    pricing = PricingModel(model_path=str(tmp_path / 'pricing_model.pkl'))
+    pricing.train(book)
+    record = book.iloc[0].to_dict()
+
+    for scorer, lookup in ((risk_scorer, risk_lookup), (pricing_scorer, pricing_lookup),
+                           (analysis_scorer, analysis_lookup)):
+        registry = ModelRegistry({'risk': risk.model_path, 'pricing': pricing.model_path})
+        # A lone uncached request waits out the whole batching window...
+        dispatcher = InferenceDispatcher(scorer(registry), max_wait_ms=60000, max_batch_size=2,
+                                         lookup=lookup(registry))
+        first = dispatcher.submit(record)
+        assert not first.done()
+        second = dispatcher.submit(dict(record))
+        assert first.result(timeout=30) == second.result(timeout=30)
+        dispatcher.close()
+
+        # ...a repeated one is answered from the cache before it is queued
+        repeat = dispatcher.submit(dict(record))
+        assert repeat.done() and repeat.result() == first.result()
+        assert dispatcher.metrics()['cache_hits'] == 1 and dispatcher.metrics()['rows'] == 2
@@ -0,0 +1,117 @@
+import json
+import multiprocessing
+
+import joblib
+import numpy as np
+import pytest
+
+from aiengine import model_registry
+from aiengine.model_artifacts import DEFAULT_KEEP_VERSIONS, load_artifact, prune_versions
+from aiengine.model_registry import MODEL_PATHS, ModelRegistry
+from aiengine.pricing_model import PricingModel
+from aiengine.risk_analyzer import RiskAnalyzer
+from tests.test_models import cleaned_book
+
+
+def test_artifact_round_trip_serves_from_memory_mapped_arrays(tmp_path):
+    book = cleaned_book()
+    trained = RiskAnalyzer(model_path=str(tmp_path / 'risk_model.pkl'))
+    trained.train(book)
+    trained.model_path = str(tmp_path / 'risk_model.json')
+    trained.save_model(metadata={'data_hash': 'abc', 'metrics': {'f1_macro': 0.9}})
+
+    loaded = RiskAnalyzer(model_path=str(tmp_path / 'risk_model.json'))
+    loaded.load_model()
+
+    assert loaded.model is None and loaded.is_loaded
+    assert isinstance(np.load(next((tmp_path / 'versions').glob('*/children.npy')), mmap_mode='r'), np.memmap)
+    assert loaded.feature_columns == trained.feature_columns
+    assert loaded.label_mapping == trained.label_mapping
+    assert loaded.metadata == {'data_hash': 'abc', 'metrics': {'f1_macro': 0.9}}
+    assert loaded.get_feature_importance() == pytest.approx(trained.get_feature_importance())
+    np.testing.assert_allclose(loaded.predict_batch(book).drop(columns='predicted_risk'),
+                               trained.model.predict_proba(book[trained.feature_columns]))
+
+
+def test_artifact_load_rejects_tampered_or_mismatched_files(tmp_path):
+    model = PricingModel(model_path=str(tmp_path / 'pricing_model.pkl'))
+    model.train(cleaned_book())
+    model.model_path = str(tmp_path / 'pricing_model.json')
+    model.save_model()
+    manifest = json.loads((tmp_path / 'pricing_model.json').read_text())
+
+    with pytest.raises(ValueError, match='expected a classifier'):
+        load_artifact(str(tmp_path / 'pricing_model.json'), kind='classifier')
+
+    manifest['features'] = manifest['features'][:-1]
+    (tmp_path / 'short.json').write_text(json.dumps(manifest))
+    with pytest.raises(ValueError, match='feature names'):
+        load_artifact(str(tmp_path / 'short.json'))
+
+    values = tmp_path / manifest['arrays_dir'] / 'values.npy'
+    np.save(values, np.load(values) * 2)
+    with pytest.raises(ValueError, match='checksum'):
+        load_artifact(str(tmp_path / 'pricing_model.json'))
+
+
+def test_shipped_artifacts_load_through_registry():
+    registry = ModelRegistry(MODEL_PATHS)
+
+    risk, pricing = registry.get('risk'), registry.get('pricing')
+
+    assert risk.engine is not None and len(risk.feature_columns) == risk.engine.n_features
+    assert pricing.engine is not None and len(pricing.feature_columns) == pricing.engine.n_features
+    assert risk.predict_batch(cleaned_book())['predicted_risk'].notna().all()
+
+
+def test_saves_keep_only_recent_versions_and_the_live_one(tmp_path):
+    model = PricingModel(model_path=str(tmp_path / 'pricing_model.pkl'))
+    model.train(cleaned_book())
+    model.model_path = str(tmp_path / 'pricing_model.json')
+    for _ in range(DEFAULT_KEEP_VERSIONS + 2):
+        model.save_model()
+    live = json.loads((tmp_path / 'pricing_model.json').read_text())['arrays_dir']
+
+    assert len(list((tmp_path / 'versions').iterdir())) == DEFAULT_KEEP_VERSIONS
+
+    prune_versions(str(tmp_path / 'pricing_model.json'), keep=0)
+
+    assert [p.relative_to(tmp_path).as_posix() for p in (tmp_path / 'versions').iterdir()] == [live]
+    assert load_artifact(str(tmp_path / 'pricing_model.json'))[0].n_features == len(model.feature_columns)
+
+
+def test_registry_builds_a_missing_artifact_from_its_pickle(tmp_path, monkeypatch):
+    book = cleaned_book()
+    trained = RiskAnalyzer(model_path=str(tmp_path / 'trained.pkl'))
+    trained.train(book)
+    # Shipped pickles are bare estimators; the features come from the estimator itself
+    joblib.dump(trained.model, tmp_path / 'risk_model.pkl')
+    artifact = str(tmp_path / 'risk_model.json')
+    monkeypatch.setitem(model_registry.LEGACY_PICKLES, artifact, str(tmp_path / 'risk_model.pkl'))
+
+    served = ModelRegistry({'risk': artifact}).get('risk')
+
+    manifest = load_artifact(artifact)[1]
+    assert manifest['metadata']['converted_from'] == 'risk_model.pkl'
+    assert manifest['features'] == list(trained.model.feature_names_in_) == trained.feature_columns
+    np.testing.assert_allclose(served.predict_batch(book).drop(columns='predicted_risk'),
+                               trained.model.predict_proba(book[trained.feature_columns]))
+
+
+def _convert_in_worker(artifact, source):
+    model_registry.LEGACY_PICKLES[artifact] = source
+    return model_registry._load(PricingModel, artifact).engine.n_trees
+
+
+def test_cold_workers_convert_a_shipped_pickle_once(tmp_path):
+    model = PricingModel(model_path=str(tmp_path / 'pricing_model.pkl'))
+    model.train(cleaned_book())
+    model.save_model()
+    artifact = str(tmp_path / 'pricing_model.json')
+
+    with multiprocessing.get_context('spawn').Pool(4) as pool:
+        trees = pool.starmap(_convert_in_worker, [(artifact, model.model_path)] * 4)
+
+    assert trees == [len(model.model.estimators_)] * 4
+    assert len(list((tmp_path / 'versions').iterdir())) == 1
+    assert load_artifact(artifact)[0].n_trees == len(model.model.estimators_)
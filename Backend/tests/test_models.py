@@ -0,0 +1,183 @@
+import os
+
+import pandas as pd
+import pytest
+
+from aiengine.data_cleaning_pipeline import EnhancedDataCleaningPipeline
+from aiengine.model_registry import ModelRegistry
+from aiengine.pricing_model import LEGACY_FEATURES, PricingModel
+from aiengine.risk_analyzer import RiskAnalyzer
+from tests.test_data_cleaning_pipeline import sample_submissions
+
+
+def cleaned_book():
+    book = pd.concat([sample_submissions()] * 5, ignore_index=True)
+    book['SubmissionID'] = [f'B{i}' for i in range(len(book))]
+    return EnhancedDataCleaningPipeline().clean_and_transform_data(book, verbose=False)
+
+
+def test_models_train_on_loss_trend_features(tmp_path):
+    book = cleaned_book()
+
+    pricing = PricingModel(model_path=str(tmp_path / 'pricing_model.pkl'))
+    pricing.train(book)
+    risk = RiskAnalyzer(model_path=str(tmp_path / 'risk_model.pkl'))
+    risk.train(book)
+
+    reloaded = PricingModel(model_path=str(tmp_path / 'pricing_model.pkl'))
+    reloaded.load_model()
+    assert reloaded.feature_columns == LEGACY_FEATURES + ['LossTrendSlope', 'LossVolatility']
+    assert {'LossTrendSlope', 'LossVolatility'} <= set(risk.feature_columns)
+    assert reloaded.suggest(book.iloc[0].to_dict())['Premium'] > 0
+
+
+def test_pricing_model_loads_legacy_bare_estimator():
+    model = PricingModel(model_path='aiengine/models/pricing_model.pkl')
+    model.load_model()
+
+    assert model.feature_columns == LEGACY_FEATURES
+
+
+def test_risk_batch_prediction_matches_single_predictions(tmp_path):
+    book = cleaned_book()
+    risk = RiskAnalyzer(model_path=str(tmp_path / 'risk_model.pkl'))
+    risk.train(book)
+
+    records = book.head(10).to_dict('records')
+    result = risk.predict_batch(records)
+
+    assert result['predicted_risk'].tolist() == [risk.predict(r) for r in records]
+    for record, (_, row) in zip(records, result.iterrows()):
+        assert row.drop('predicted_risk').to_dict() == pytest.approx(risk.predict_proba(record))
+    columnar = {column: book[column].head(10).tolist() for column in risk.feature_columns}
+    assert risk.predict_batch(columnar)['predicted_risk'].tolist() == result['predicted_risk'].tolist()
+
+
+def test_single_and_batch_predictions_agree_on_null_and_string_fields(tmp_path):
+    book = cleaned_book()
+    risk = RiskAnalyzer(model_path=str(tmp_path / 'risk_model.pkl'))
+    risk.train(book)
+    pricing = PricingModel(model_path=str(tmp_path / 'pricing_model.pkl'))
+    pricing.train(book)
+
+    records = []
+    for i, value in enumerate([None, float('nan'), 'n/a', '', '0.5']):
+        for column in ('ClaimRatio', 'SumInsured', 'LossFrequency'):
+            record = book.iloc[i].to_dict()
+            record[column] = value
+            records.append(record)
+
+    risks = risk.predict_batch(records)
+    assert [risk.predict(r) for r in records] == risks['predicted_risk'].tolist()
+    for record, (_, row) in zip(records, risks.iterrows()):
+        assert risk.predict_proba(record) == pytest.approx(row.drop('predicted_risk').to_dict())
+    premiums = pricing.suggest_batch(records)
+    assert [pricing.suggest(r) for r in records] == pytest.approx(premiums.to_dict('records'))
+
+
+def test_batch_risk_endpoint(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import app.main as main
+
+    book = cleaned_book()
+    risk = RiskAnalyzer(model_path=str(tmp_path / 'risk_model.pkl'))
+    risk.train(book)
+    monkeypatch.setattr(main, 'registry', ModelRegistry({'risk': risk.model_path}))
+
+    records = book[risk.feature_columns].head(5).to_dict('records')
+    response = TestClient(main.app).post('/predict-risk/batch', json=records)
+
+    body = response.json()
+    assert body['count'] == 5
+    assert [p['predicted_risk'] for p in body['predictions']] == [risk.predict(r) for r in records]
+
+
+def test_ai_service_scores_book_in_batches(tmp_path):
+    from app.services.ai_service import AIService
+
+    book = cleaned_book()
+    RiskAnalyzer(model_path=str(tmp_path / 'risk_model.pkl')).train(book)
+    PricingModel(model_path=str(tmp_path / 'pricing_model.pkl')).train(book)
+    registry = ModelRegistry({'risk': str(tmp_path / 'risk_model.pkl'),
+                              'pricing': str(tmp_path / 'pricing_model.pkl')})
+    service = AIService(cleaned_data_path=str(tmp_path / 'missing.csv'), registry=registry)
+
+    scored = service.process_submissions(book)
+
+    records = book.to_dict('records')
+    assert scored['RiskCategory'].tolist() == [service.risk_model.predict(r) for r in records]
+    singles = [service.pricing_model.suggest(r) for r in records]
+    assert scored['SuggestedPremium'].tolist() == pytest.approx([s['Premium'] for s in singles])
+    assert scored['PricingDecision'].tolist() == [s['Decision'] for s in singles]
+
+    book.to_csv(tmp_path / 'book.csv', index=False)
+    chunks = list(service.process_submissions_chunked(str(tmp_path / 'book.csv'), chunksize=7))
+    assert len(chunks) == -(-len(book) // 7)
+    assert pd.concat(chunks)['SuggestedPremium'].tolist() == pytest.approx(scored['SuggestedPremium'].tolist())
+
+
+def test_model_registry_shares_and_hot_swaps_models(tmp_path):
+    book = cleaned_book()
+    path = str(tmp_path / 'pricing_model.pkl')
+    PricingModel(model_path=path).train(book)
+    registry = ModelRegistry({'pricing': path}, check_interval=0)
+
+    assert registry.version('pricing') == 0
+    first = registry.get('pricing')
+    assert registry.get('pricing') is first
+    assert registry.version('pricing') == 1
+
+    retrained = PricingModel(model_path=path)
+    retrained.train(book[[c for c in book.columns if c != 'LossVolatility']])
+    os.utime(path, ns=(0, 10 ** 18))
+
+    # The current model keeps serving until the reload has finished
+    assert registry.get('pricing') is first
+    registry.wait('pricing')
+    assert registry.version('pricing') == 2
+    assert 'LossVolatility' not in registry.get('pricing').feature_columns
+
+
+def test_inference_pipeline_scores_both_models_in_one_pass(tmp_path):
+    from aiengine.inference_pipeline import InferencePipeline
+
+    book = cleaned_book()
+    RiskAnalyzer(model_path=str(tmp_path / 'risk_model.pkl')).train(book)
+    PricingModel(model_path=str(tmp_path / 'pricing_model.pkl')).train(book)
+    registry = ModelRegistry({'risk': str(tmp_path / 'risk_model.pkl'),
+                              'pricing': str(tmp_path / 'pricing_model.pkl')})
+    pipeline = InferencePipeline(registry)
+
+    records = book.head(8).to_dict('records')
+    results = pipeline.run(records)
+
+    risk, pricing = registry.get('risk'), registry.get('pricing')
+    for record, result in zip(records, results):
+        suggestion = pricing.suggest(record)
+        assert result['RiskCategory'] == risk.predict(record)
+        assert result['RiskProbabilities'] == pytest.approx(risk.predict_proba(record))
+        assert result['SuggestedPremium'] == pytest.approx(suggestion['Premium'])
+        assert result['Decision'] == suggestion['Decision']
+    assert pipeline.run(records[0]) == results[0]
+    with pytest.raises(ValueError):
+        pipeline.run('not a submission')
+
+
+def test_train_models_searches_and_saves_versioned_artifacts(tmp_path):
+    from aiengine.train_models import main
+
+    cleaned_book().to_csv(tmp_path / 'book.csv', index=False)
+    metadata = main(['--data', str(tmp_path / 'book.csv'), '--models-dir', str(tmp_path),
+                     '--cv', '3', '--n-jobs', '1', '--max-candidates', '2', '--time-budget', '60'])
+
+    risk = RiskAnalyzer(model_path=str(tmp_path / 'risk_model.json'))
+    risk.load_model()
+    assert risk.metadata == metadata['risk']
+    assert risk.metadata['candidates_evaluated'] >= 1
+    assert set(risk.metadata['cv_metrics']) == {'accuracy', 'f1_macro'}
+    pricing = PricingModel(model_path=str(tmp_path / 'pricing_model.json'))
+    pricing.load_model()
+    assert pricing.feature_columns == metadata['pricing']['features']
+    assert set(pricing.metadata['cv_metrics']) == {'mae', 'r2'}
+    assert sorted(os.listdir(tmp_path / 'versions')) == sorted(
+        f"{name}_model-{metadata[name]['version']}" for name in ('risk', 'pricing'))
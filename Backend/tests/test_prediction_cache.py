@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+
+from aiengine.model_registry import ModelRegistry
+from aiengine.prediction_cache import PredictionCache
+from aiengine.risk_analyzer import RiskAnalyzer
+from tests.test_models import cleaned_book
+
+
+def test_prediction_cache_computes_only_uncached_rows():
+    cache = PredictionCache(max_entries=3)
+    computed = []
+
+    def compute(X):
+        computed.append(len(X))
+        return X.sum(axis=1)
+
+    X = np.array([[1.0, 2.0], [3.0, 4.0], [-0.0, 5.0]])
+    np.testing.assert_array_equal(cache.lookup('m', 1, X, compute), [3.0, 7.0, 5.0])
+    np.testing.assert_array_equal(cache.lookup('m', 1, np.array([[0.0, 5.0], [6.0, 1.0]]), compute), [5.0, 7.0])
+    assert computed == [3, 1]
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (1, 4, 1, 3)
+
+    # Another model version never reuses these rows
+    cache.lookup('m', 2, X[:1], compute)
+    assert computed == [3, 1, 1]
+    cache.invalidate('m', keep_version=2)
+    assert len(cache) == 1
+
+
+def test_prediction_cache_peek_needs_every_row_cached():
+    cache = PredictionCache()
+    cache.lookup('m', 1, np.array([[1.0, 2.0]]), lambda X: X.sum(axis=1))
+
+    assert cache.peek('m', 1, np.array([[1.0, 2.0], [3.0, 4.0]])) is None
+    np.testing.assert_array_equal(cache.peek('m', 1, np.array([[1.0, 2.0]])), [3.0])
+    assert cache.peek('m', 2, np.array([[1.0, 2.0]])) is None
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 1)
+
+
+def test_prediction_cache_expires_entries():
+    cache = PredictionCache(ttl_seconds=0)
+    cache.lookup('m', 1, np.ones((1, 2)), lambda X: X[:, 0])
+    cache.lookup('m', 1, np.ones((1, 2)), lambda X: X[:, 0])
+    assert cache.stats()['expirations'] == 1 and cache.stats()['hits'] == 0
+
+
+def test_registry_models_share_cache_until_reload(tmp_path):
+    book = cleaned_book()
+    path = str(tmp_path / 'risk_model.pkl')
+    RiskAnalyzer(model_path=path).train(book)
+    registry = ModelRegistry({'risk': path}, check_interval=0)
+
+    record = book.iloc[0].to_dict()
+    analyzer = registry.get('risk')
+    first = analyzer.predict_proba(record)
+    assert analyzer.predict_proba(record) == first
+    assert analyzer.predict(record) == max(first, key=first.get)
+    assert registry.cache.stats()['hits'] == 2
+
+    os.utime(path, ns=(0, 10 ** 18))
+    registry.get('risk')
+    registry.wait('risk')
+    reloaded = registry.get('risk')
+    assert reloaded.version == 2 and len(registry.cache) == 0
+    assert reloaded.predict_proba(record) == first
@@ -0,0 +1,94 @@
+import os
+
+import pandas as pd
+import pytest
+
+from aiengine.model_registry import ModelRegistry
+from aiengine.retraining import RetrainingManager, _warm_start
+from aiengine.risk_analyzer import RISK_TARGET_MAPPING
+from aiengine.train_models import MODEL_SPECS, train_model, training_matrix
+from tests.test_models import cleaned_book
+
+
+def test_retraining_warm_starts_validates_and_publishes(tmp_path):
+    book = cleaned_book()
+    book.to_csv(tmp_path / 'history.csv', index=False)
+    for name in ('risk', 'pricing'):
+        train_model(name, book, models_dir=str(tmp_path), cv=2, n_jobs=1, max_candidates=1)
+    registry = ModelRegistry({'risk': str(tmp_path / 'risk_model.json'),
+                              'pricing': str(tmp_path / 'pricing_model.json')}, check_interval=0)
+    serving = registry.get('risk')
+    trees = serving.engine.n_trees
+
+    manager = RetrainingManager(history_path=str(tmp_path / 'history.csv'), work_dir=str(tmp_path / 'work'),
+                                models_dir=str(tmp_path), min_new_rows=10, interval_seconds=None)
+    assert manager.record(book.head(5)) == 5
+    assert manager.trigger() is None
+    manager.record(book.head(10).to_dict('records'))
+    outcome = manager.trigger().result(timeout=120)
+
+    assert outcome['new_rows'] == 15
+    assert outcome['models']['risk']['mode'] == 'warm_start'
+    assert outcome['models']['risk']['published'] and outcome['models']['pricing']['published']
+    assert len(pd.read_csv(tmp_path / 'history.csv')) == len(book) + 15
+    assert os.listdir(tmp_path / 'work') == []
+
+    # In-flight callers keep the old model until the swap
+    assert registry.get('risk') is serving
+    registry.wait('risk')
+    assert registry.get('risk').engine.n_trees == trees + 20
+    assert registry.get('risk').metadata['retraining_mode'] == 'warm_start'
+
+    # A candidate that must beat the current model by 200% is never published
+    manager = RetrainingManager(history_path=str(tmp_path / 'history.csv'), work_dir=str(tmp_path / 'work'),
+                                models_dir=str(tmp_path), names=['pricing'], tolerance=-2.0,
+                                warm_start_trees=0, max_candidates=1)
+    manager.record(book.head(10))
+    outcome = manager.trigger(force=True).result(timeout=120)
+    assert not outcome['models']['pricing']['published']
+    manager.stop()
+    assert manager.status()['history'][0]['models']['pricing']['published'] is False
+
+
+def test_scored_batches_are_recorded_with_their_true_targets(tmp_path):
+    from app.services.ai_service import AIService
+
+    book = cleaned_book()
+    book.to_csv(tmp_path / 'cleaned.csv', index=False)
+    seed = (tmp_path / 'cleaned.csv').read_bytes()
+    for name in ('risk', 'pricing'):
+        train_model(name, book, models_dir=str(tmp_path), cv=2, n_jobs=1, max_candidates=1)
+    registry = ModelRegistry({'risk': str(tmp_path / 'risk_model.json'),
+                              'pricing': str(tmp_path / 'pricing_model.json')})
+    manager = RetrainingManager(work_dir=str(tmp_path / 'work'), seed_path=str(tmp_path / 'cleaned.csv'),
+                                models_dir=str(tmp_path), names=['risk'], min_new_rows=len(book) + 1,
+                                interval_seconds=None, max_candidates=1)
+    service = AIService(cleaned_data_path=str(tmp_path / 'missing.csv'), registry=registry, retraining=manager)
+
+    submissions = book.head(20)
+    service.process_submissions(submissions)
+
+    recorded = pd.read_csv(tmp_path / 'work' / 'incoming.csv')
+    assert recorded['RiskCategory'].tolist() == submissions['RiskCategory'].tolist()
+    assert recorded['RiskCategory'].map(RISK_TARGET_MAPPING).notna().all()
+    assert recorded['PastPremium'].tolist() == pytest.approx(submissions['PastPremium'].tolist())
+
+    # History lives in the work directory and starts from the seed, which is left alone
+    outcome = manager.trigger(force=True).result(timeout=120)
+    manager.stop()
+    assert outcome['history_rows'] == len(book) + 20
+    assert len(pd.read_csv(tmp_path / 'work' / 'history.csv')) == len(book) + 20
+    assert (tmp_path / 'cleaned.csv').read_bytes() == seed
+
+
+def test_warm_start_needs_the_artifacts_feature_columns(tmp_path):
+    book = cleaned_book()
+    train_model('risk', book, models_dir=str(tmp_path), cv=2, n_jobs=1, max_candidates=1)
+    path = str(tmp_path / 'risk_model.json')
+    X, y, features = training_matrix(book, 'risk')
+    warm = lambda columns: _warm_start(path, X, y, columns, 5, 400, MODEL_SPECS['risk'])
+
+    # Same number of columns, but not the ones the forest was fitted on
+    assert warm(features[1:] + features[:1]) is None
+    assert warm(features[:-1] + ['CatastropheExposure']) is None
+    assert warm(features) is not None
@@ -0,0 +1,121 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from aiengine.underwriting_rules import UnderwritingRuleEngine
+
+
+def submissions_book():
+    return pd.DataFrame({
+        'Cedant': ['Acme Re', 'Not Found', 'Beta Re'],
+        'Insured': ['Harbor Corp', '', 'Maple Stores'],
+        'Geography': ['Florida, USA', 'Not Found', 'Canada'],
+        'PerilsCovered': ['Earthquake, Flood', 'Not Found', 'Fire'],
+        'Occupation': ['Software office', 'Not Found', 'Retail'],
+        'SumInsured': [5e7, 0.0, 1e6],
+        'PeriodOfInsurance': ['12 months', 'Not Found', '12 months'],
+        'AverageLossRatio': [0.0, 0.0, 0.0],
+        'ClaimRatio': [90.0, 0.0, 20.0],
+        'DataCompleteness': [100.0, 200 / 7, 100.0],
+        'LossHistoryTrend': ['Increasing', 'Unknown', 'Stable'],
+    })
+
+
+def test_default_rules_score_and_decide_book():
+    result = UnderwritingRuleEngine().apply(submissions_book())
+
+    assert result['GeographyRiskMultiplier'].tolist() == [1.3, 1.0, 1.0]
+    assert result['PerilRiskMultiplier'].tolist() == [1.4 * 1.2, 1.0, 1.0]
+    assert result['BusinessRiskMultiplier'].tolist() == [0.8, 1.0, 0.9]
+    assert result['RiskScore'].tolist() == pytest.approx([5.26, 0.8 + 0.4 + 0.6 + (70 - 200 / 7) / 40, 1.5])
+    assert result['RiskRating'].tolist() == ['Moderate Risk', 'Low Risk', 'Low Risk']
+    assert result['RecommendedAction'].tolist() == [
+        'Refer to Senior Underwriter', 'Request More Information', 'Accept']
+    assert result['PricingAdjustment'].tolist() == [25.0, 0.0, 0.0]
+    assert result.loc[0, 'UnderwriterNotes'] == (
+        'Consider 25% pricing increase and additional terms'
+        ' | High claims history - consider exclusions'
+        ' | Increasing loss trend - monitor closely')
+    assert result.loc[1, 'UnderwriterNotes'] == ''
+    assert result['RequiredInformation'].tolist() == [[], [
+        'Ceding company information', 'Insured party details', 'Geographic scope',
+        'Perils and coverage scope', 'Sum insured amount', 'Insurance period'], []]
+
+
+def test_rule_engine_redecides_book_with_changed_threshold(tmp_path):
+    engine = UnderwritingRuleEngine()
+    engine.rules['decisions'][0]['max_score'] = 1.0
+    engine.save(str(tmp_path / 'rules.json'))
+
+    result = UnderwritingRuleEngine.from_file(str(tmp_path / 'rules.json')).apply(submissions_book())
+
+    assert result.loc[2, 'RecommendedAction'] == 'Accept with Conditions'
+    assert result.loc[2, 'PricingAdjustment'] == 15.0
+    assert UnderwritingRuleEngine().rules['decisions'][0]['max_score'] == 3
+
+
+def varied_submissions():
+    """Every combination of keyword hits, loss and claim levels and completeness bands"""
+    rows = itertools.product(
+        ['Florida, USA', 'Texas', 'Canada', 'Not Found'],
+        ['Earthquake, Hurricane', 'Fire'],
+        ['Chemical plant', 'Software office', 'Farming'],
+        [0.0, 2e8],
+        [10.0, 95.0],
+        [30.0, 60.0, 100.0],
+        ['Increasing', 'Stable'],
+    )
+    return pd.DataFrame([{
+        'Cedant': 'Acme Re', 'Insured': 'Harbor Corp', 'Geography': geography, 'PerilsCovered': perils,
+        'Occupation': occupation, 'SumInsured': 1e6, 'PeriodOfInsurance': '12 months' if claims < 90 else 'Not Found',
+        'AverageLossRatio': losses, 'ClaimRatio': claims, 'DataCompleteness': completeness, 'LossHistoryTrend': trend,
+    } for geography, perils, occupation, losses, claims, completeness, trend in rows])
+
+
+def per_row_decisions(processor, book):
+    """Ingestion path: multipliers, score, rating and decision one submission at a time"""
+    rows = []
+    for row in book.to_dict('records'):
+        row['GeographyRiskMultiplier'] = processor.get_geography_risk(row['Geography'])
+        row['PerilRiskMultiplier'] = processor.get_peril_risk(row['PerilsCovered'])
+        row['BusinessRiskMultiplier'] = processor.get_business_risk(row['Occupation'])
+        rows.append(processor.apply_decision_logic(row))
+    return pd.DataFrame(rows)
+
+
+def test_rule_engine_matches_per_row_ingestion(tmp_path):
+    message_parser = pytest.importorskip('app.utils.message_parser')
+    processor = message_parser.IntegratedReinsuranceProcessor(base_dir=str(tmp_path))
+    book = varied_submissions()
+
+    expected = per_row_decisions(processor, book)
+    result = UnderwritingRuleEngine().apply(book)
+
+    columns = ['GeographyRiskMultiplier', 'PerilRiskMultiplier', 'BusinessRiskMultiplier', 'RiskScore',
+               'RiskRating', 'RecommendedAction', 'UnderwriterNotes', 'PricingAdjustment',
+               'RequiredInformation', 'DecisionReason']
+    pd.testing.assert_frame_equal(result[columns], expected[columns], check_dtype=False)
+    assert set(result['RecommendedAction']) == {
+        'Accept', 'Accept with Conditions', 'Refer to Senior Underwriter', 'Decline', 'Request More Information'}
+
+
+def test_edited_rules_change_ingestion_and_rescoring_alike(tmp_path, capsys):
+    message_parser = pytest.importorskip('app.utils.message_parser')
+    engine = UnderwritingRuleEngine()
+    engine.rules['decisions'][0]['max_score'] = 1.0
+    engine.rules['multipliers']['GeographyRiskMultiplier']['rules'][0]['multiplier'] = 1.5
+    engine.save(str(tmp_path / 'rules.json'))
+    processor = message_parser.IntegratedReinsuranceProcessor(base_dir=str(tmp_path),
+                                                              rules_path=str(tmp_path / 'rules.json'))
+    book = varied_submissions()
+
+    expected = per_row_decisions(processor, book)
+    result = processor.rescore_submissions(book)
+
+    assert '(n/a decisions changed)' in capsys.readouterr().out
+    assert processor.get_geography_risk('Florida, USA') == 1.5
+    processor.rescore_submissions(result)
+    assert '(0 decisions changed)' in capsys.readouterr().out
+    assert result['RecommendedAction'].tolist() == expected['RecommendedAction'].tolist()
+    assert result['RiskScore'].tolist() == pytest.approx(expected['RiskScore'].tolist())